@@ -0,0 +1,384 @@
+"""End-to-end document analysis shared by the HTTP routes and background jobs."""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    from .analysis_service import (
+        analyze_document_stream,
+        analyze_prepared_document,
+        prepare_document,
+        reanalyze_keywords,
+    )
+    from . import extraction_cache
+    from .constants import LIBRARY_RANGED_MIN_BYTES, MAX_PDF_PAGES, REANALYSIS_CACHE_SIZE
+    from .document_processing import extract_document, extract_text_pdf_sampled_stream, iter_pdf_pages
+    from .document_store import get_document_store
+    from .library_storage import (
+        LibraryObjectReader,
+        download_library_object,
+        get_s3_client,
+        head_library_object,
+        is_missing_object_error,
+    )
+    from .metrics import attach_stage_profile, profile_stages, record_stage
+    from .search_index import build_search_index
+except ImportError:
+    from analysis_service import (
+        analyze_document_stream,
+        analyze_prepared_document,
+        prepare_document,
+        reanalyze_keywords,
+    )
+    import extraction_cache
+    from constants import LIBRARY_RANGED_MIN_BYTES, MAX_PDF_PAGES, REANALYSIS_CACHE_SIZE
+    from document_processing import extract_document, extract_text_pdf_sampled_stream, iter_pdf_pages
+    from document_store import get_document_store
+    from library_storage import (
+        LibraryObjectReader,
+        download_library_object,
+        get_s3_client,
+        head_library_object,
+        is_missing_object_error,
+    )
+    from metrics import attach_stage_profile, profile_stages, record_stage
+    from search_index import build_search_index
+
+
+EXTRACTION_FAILED_MESSAGE = 'Failed to extract text from the document.'
+REANALYSIS_UNAVAILABLE_MESSAGE = (
+    'This document was analyzed in streaming mode and cannot be re-analyzed; please upload it again.'
+)
+
+_prepared_lock = threading.Lock()
+_prepared_documents = OrderedDict()
+
+
+def store_analyzed_document(filename, text, word_count, analysis_payload, text_metadata):
+    """Persist an analyzed document and index its text for /search."""
+    document_store = get_document_store()
+    doc_id = document_store.add_document(
+        filename,
+        text,
+        word_count,
+        analysis_payload,
+        text_metadata
+    )
+    if text:
+        try:
+            document_store.index_document(doc_id, *build_search_index(text))
+        except Exception as index_error:
+            logging.warning(f"Failed to index document {doc_id} for search: {index_error}")
+    logging.info(f"Stored document {doc_id} with {word_count} words")
+    return doc_id
+
+
+def build_response_payload(analysis_payload, img_data_url, doc_id, text_metadata):
+    response_payload = dict(analysis_payload)
+    response_payload.update({
+        'image': img_data_url,
+        'document_id': doc_id,
+        'pageMap': (text_metadata or {}).get('pages', []),
+        'pageSelection': (text_metadata or {}).get('page_selection'),
+        'extractionEngine': (text_metadata or {}).get('engine')
+    })
+    return response_payload
+
+
+def analyze_pdf_streaming(filename, file_stream, user_keywords, disable_limits=False, progress_callback=None):
+    """
+    Analyze a PDF page by page without materializing the full text.
+
+    Returns the response payload, or None when no text could be extracted so the
+    caller can fall back to the regular extraction chain.
+    """
+    pdf_kwargs = {}
+    analysis_kwargs = {}
+    if disable_limits:
+        pdf_kwargs['page_limit_override'] = None
+        analysis_kwargs['word_limit_override'] = None
+
+    try:
+        pages, page_selection, engine = iter_pdf_pages(file_stream, **pdf_kwargs)
+        if progress_callback:
+            pages = _report_page_progress(pages, page_selection.get('processed_pages') or 0, progress_callback)
+        # Extraction and analysis are interleaved page by page, so they are profiled as one stage.
+        with record_stage('streaming_analysis'):
+            analysis_payload, img_data_url, word_count, page_spans = analyze_document_stream(
+                pages,
+                user_keywords,
+                page_selection,
+                **analysis_kwargs
+            )
+    except ValueError as extraction_error:
+        logging.warning(f"Document validation error: {extraction_error}")
+        raise
+    except Exception as extraction_error:
+        logging.error(f"Streaming analysis error: {extraction_error}")
+        raise ValueError(EXTRACTION_FAILED_MESSAGE) from extraction_error
+
+    if word_count == 0:
+        return None
+
+    text_metadata = {
+        'pages': page_spans,
+        'page_selection': page_selection,
+        'engine': engine
+    }
+    # The full text is never assembled in streaming mode, so /search skips these documents.
+    with record_stage('store'):
+        doc_id = store_analyzed_document(filename, '', word_count, analysis_payload, text_metadata)
+    return build_response_payload(analysis_payload, img_data_url, doc_id, text_metadata)
+
+
+def _report_page_progress(pages, total_pages, progress_callback):
+    for pages_done, page in enumerate(pages, start=1):
+        yield page
+        progress_callback(pages_done, total_pages)
+
+
+def run_analysis(
+    filename,
+    file_stream,
+    user_keywords,
+    disable_limits=False,
+    streaming=False,
+    progress_callback=None,
+    profile=None,
+    remember_prepared=False
+):
+    """
+    Extract, analyze and store one document; return the /analyze response payload.
+
+    profile ("timings" or "memory", see metrics.profile_stages) adds a per-stage
+    breakdown as processingSummary.timings to the response. remember_prepared
+    keeps the tokenized document for /documents/<id>/reanalyze; only the
+    request-serving process sets it, since pool processes can never serve
+    that route. Raises ValueError
+    with a user-facing message for invalid or unreadable documents; any other
+    exception is an internal error.
+    """
+    with profile_stages(profile) as stage_profile:
+        response_payload = _run_analysis(
+            filename,
+            file_stream,
+            user_keywords,
+            disable_limits,
+            streaming,
+            progress_callback,
+            remember_prepared
+        )
+    return attach_stage_profile(response_payload, stage_profile)
+
+
+def _run_analysis(filename, file_stream, user_keywords, disable_limits, streaming, progress_callback, remember_prepared):
+    filename = filename.lower()
+
+    if streaming and filename.endswith('.pdf'):
+        streamed_payload = analyze_pdf_streaming(
+            filename,
+            file_stream,
+            user_keywords,
+            disable_limits,
+            progress_callback
+        )
+        if streamed_payload is not None:
+            return streamed_payload
+        logging.info("Streaming analysis produced no text; retrying with full extraction")
+
+    try:
+        with record_stage('extraction'):
+            text, text_metadata = extract_document(
+                filename,
+                file_stream,
+                disable_limits=disable_limits,
+                progress_callback=progress_callback
+            )
+    except ValueError as extraction_error:
+        logging.warning(f"Document validation error: {extraction_error}")
+        raise
+    except Exception as extraction_error:
+        logging.error(f"Document extraction error: {extraction_error}")
+        raise ValueError(EXTRACTION_FAILED_MESSAGE) from extraction_error
+
+    return analyze_and_store(filename, text, text_metadata, user_keywords, disable_limits, remember_prepared)
+
+
+def analyze_and_store(filename, text, text_metadata, user_keywords, disable_limits=False, remember_prepared=False):
+    """Analyze extracted text, store the document and return the /analyze response payload."""
+    analysis_kwargs = {}
+    if disable_limits:
+        analysis_kwargs['word_limit_override'] = None
+
+    try:
+        prepared = prepare_document(text, text_metadata, **analysis_kwargs)
+        analysis_payload, img_data_url, word_count = analyze_prepared_document(
+            prepared,
+            user_keywords,
+            text_metadata,
+            source_text=text
+        )
+    except ValueError as analysis_error:
+        logging.warning(f"Analysis validation error: {analysis_error}")
+        raise
+
+    with record_stage('store'):
+        doc_id = store_analyzed_document(filename, text, word_count, analysis_payload, text_metadata)
+    if remember_prepared:
+        remember_prepared_document(doc_id, prepared)
+    return build_response_payload(analysis_payload, img_data_url, doc_id, text_metadata)
+
+
+def _extract_library_pdf_ranged(library_key, object_info, page_limit, s3, progress_callback=None):
+    """Extract the sampled pages of a large library PDF through ranged GETs; None means "download it"."""
+    cache_key = None
+    if extraction_cache.is_enabled() and object_info['etag']:
+        # The ETag identifies the object version, so the cache is consulted before any byte is fetched.
+        fingerprint = extraction_cache.fingerprint_bytes(
+            f"{os.environ['OCI_BUCKET']}/{library_key}@{object_info['etag']}".encode('utf-8')
+        )
+        cache_key = extraction_cache.build_cache_key(f"s3-{fingerprint}", page_limit)
+        cached = extraction_cache.get_cached_extraction(cache_key)
+        if cached is not None:
+            logging.info("Library extraction of %s served from cache", library_key)
+            return cached
+
+    reader = LibraryObjectReader(library_key, object_info['size'], s3)
+    try:
+        extracted = extract_text_pdf_sampled_stream(reader, page_limit, progress_callback)
+    except ValueError:
+        raise
+    except Exception as ranged_error:
+        logging.warning(f"Ranged extraction of {library_key} failed; downloading it instead: {ranged_error}")
+        return None
+    logging.info(
+        "Ranged extraction of %s fetched %s of %s bytes in %s requests",
+        library_key,
+        reader.bytes_fetched,
+        object_info['size'],
+        reader.requests
+    )
+    if extracted is not None and cache_key is not None:
+        extraction_cache.store_extraction(cache_key, *extracted)
+    return extracted
+
+
+def analyze_library_object(
+    library_key,
+    user_keywords,
+    disable_limits=False,
+    streaming=False,
+    progress_callback=None,
+    profile=None,
+    remember_prepared=False
+):
+    """
+    Fetch a PDF from the library bucket server-side and analyze it.
+
+    When a page limit applies and the object is at least LIBRARY_RANGED_MIN_BYTES,
+    only the sampled pages are read through ranged GETs (PyPDF2). Otherwise, or
+    if that yields no text, the object is streamed into a spooled temporary file
+    and goes through run_analysis. Returns None when the key does not exist.
+    profile and remember_prepared work as for run_analysis.
+    """
+    with profile_stages(profile) as stage_profile:
+        response_payload = _analyze_library_object(
+            library_key,
+            user_keywords,
+            disable_limits,
+            streaming,
+            progress_callback,
+            remember_prepared
+        )
+    return attach_stage_profile(response_payload, stage_profile)
+
+
+def _analyze_library_object(library_key, user_keywords, disable_limits, streaming, progress_callback, remember_prepared):
+    filename = library_key.split('/')[-1].lower()
+    s3 = get_s3_client()
+    try:
+        object_info = head_library_object(library_key, s3)
+    except Exception as head_error:
+        if is_missing_object_error(head_error):
+            return None
+        raise
+
+    page_limit = None if disable_limits else MAX_PDF_PAGES
+    use_ranged_reads = (
+        not streaming
+        and page_limit
+        and LIBRARY_RANGED_MIN_BYTES is not None
+        and object_info['size'] >= LIBRARY_RANGED_MIN_BYTES
+    )
+    if use_ranged_reads:
+        with record_stage('extraction'):
+            extracted = _extract_library_pdf_ranged(library_key, object_info, page_limit, s3, progress_callback)
+        if extracted is not None:
+            text, text_metadata = extracted
+            return analyze_and_store(filename, text, text_metadata, user_keywords, disable_limits, remember_prepared)
+
+    with record_stage('download'):
+        spool = download_library_object(library_key, s3)
+    with spool as file_stream:
+        return run_analysis(
+            filename,
+            file_stream,
+            user_keywords,
+            disable_limits=disable_limits,
+            streaming=streaming,
+            progress_callback=progress_callback,
+            remember_prepared=remember_prepared
+        )
+
+
+def remember_prepared_document(doc_id, prepared):
+    """Keep the tokenized document in this worker's LRU for keyword-only re-analysis."""
+    if not REANALYSIS_CACHE_SIZE or REANALYSIS_CACHE_SIZE <= 0:
+        return
+    with _prepared_lock:
+        _prepared_documents[doc_id] = prepared
+        _prepared_documents.move_to_end(doc_id)
+        while len(_prepared_documents) > REANALYSIS_CACHE_SIZE:
+            _prepared_documents.popitem(last=False)
+
+
+def _get_prepared_document(doc_id):
+    with _prepared_lock:
+        prepared = _prepared_documents.get(doc_id)
+        if prepared is not None:
+            _prepared_documents.move_to_end(doc_id)
+        return prepared
+
+
+def reanalyze_document(doc_id, user_keywords):
+    """
+    Recompute the keyword-dependent sections of a stored document for new keywords.
+
+    Tokenization is reused from this worker's cache when available; otherwise the
+    stored text is re-prepared with the word limit recorded in its original
+    analysis, so offsets and sampled pages match. Returns None for unknown
+    documents and raises ValueError when the text was never stored.
+    """
+    document = get_document_store().get_document(doc_id)
+    if document is None:
+        return None
+
+    stored_payload = document.get('analysis_result') or {}
+    text_metadata = document.get('metadata')
+    prepared = _get_prepared_document(doc_id)
+    cache_hit = prepared is not None
+    if prepared is None:
+        if not document.get('text'):
+            raise ValueError(REANALYSIS_UNAVAILABLE_MESSAGE)
+        word_budget = (stored_payload.get('processingSummary') or {}).get('wordBudget') or {}
+        prepare_kwargs = {'word_limit_override': word_budget['limit']} if 'limit' in word_budget else {}
+        prepared = prepare_document(document['text'], text_metadata, **prepare_kwargs)
+        remember_prepared_document(doc_id, prepared)
+
+    analysis_payload, img_data_url = reanalyze_keywords(prepared, user_keywords, stored_payload)
+    processing_summary = dict(analysis_payload.get('processingSummary') or {})
+    processing_summary['reanalysis'] = {'tokenizationCached': cache_hit}
+    analysis_payload['processingSummary'] = processing_summary
+    return build_response_payload(analysis_payload, img_data_url, doc_id, text_metadata)
@@ -1,41 +1,84 @@
 """High-level document analysis service."""
 
-import base64
-import io
 import logging
 from collections import Counter
 
-import matplotlib.pyplot as plt
 import re
-from textblob import TextBlob
-from wordcloud import WordCloud
 
 try:
     from .constants import (
         DEFAULT_TREND_KEYWORDS,
+        KEYWORD_SCAN_CHUNK_OVERLAP,
+        KEYWORD_SCAN_CHUNK_SIZE,
+        SENTIMENT_MODE,
+        SENTIMENT_SAMPLE_PAGES,
         STRIP_CHARS,
         get_max_words_analysis,
     )
-    from .keyword_utils import build_snippet, compile_keyword_pattern, tokenize_keyword
-    from .trend_analysis import analyze_trends
+    from .keyword_utils import (
+        build_snippet,
+        build_word_offsets,
+        compile_keyword_pattern,
+        keyword_pattern_body,
+        tokenize_keyword,
+    )
+    from .trend_analysis import TrendAccumulator, analyze_trends
     from .sampling_utils import select_evenly_spaced_indices
+    from .sentiment_sampling import (
+        analyze_sentiment_sampled,
+        analyze_sentiment_samples,
+        clip_sample,
+        sample_chars_per_page,
+    )
+    from .page_index import PageIndex
+    from .token_stats import TokenArray, compute_percentages
+    from .wordcloud_renderer import request_wordcloud
+    from .lazy_imports import import_module
+    from .metrics import count_document_limits, time_stage
 except ImportError:  # Fallback when modules are imported without package context
     from constants import (
         DEFAULT_TREND_KEYWORDS,
+        KEYWORD_SCAN_CHUNK_OVERLAP,
+        KEYWORD_SCAN_CHUNK_SIZE,
+        SENTIMENT_MODE,
+        SENTIMENT_SAMPLE_PAGES,
         STRIP_CHARS,
         get_max_words_analysis,
     )
-    from keyword_utils import build_snippet, compile_keyword_pattern, tokenize_keyword
-    from trend_analysis import analyze_trends
+    from keyword_utils import (
+        build_snippet,
+        build_word_offsets,
+        compile_keyword_pattern,
+        keyword_pattern_body,
+        tokenize_keyword,
+    )
+    from trend_analysis import TrendAccumulator, analyze_trends
     from sampling_utils import select_evenly_spaced_indices
+    from sentiment_sampling import (
+        analyze_sentiment_sampled,
+        analyze_sentiment_samples,
+        clip_sample,
+        sample_chars_per_page,
+    )
+    from page_index import PageIndex
+    from token_stats import TokenArray, compute_percentages
+    from wordcloud_renderer import request_wordcloud
+    from lazy_imports import import_module
+    from metrics import count_document_limits, time_stage
 
 
 _WORD_LIMIT_SENTINEL = object()
 SENTIMENT_CHAR_LIMIT = 20000
-REGEX_CHUNK_SIZE = 250_000
-REGEX_CHUNK_OVERLAP = 1_000
+REGEX_CHUNK_SIZE = KEYWORD_SCAN_CHUNK_SIZE
+REGEX_CHUNK_OVERLAP = KEYWORD_SCAN_CHUNK_OVERLAP
 WORDCLOUD_MAX_TERMS = 400
 WORDCLOUD_MAX_WORDS = 180_000
+KWIC_WINDOW = 20
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+')
+SENTENCE_CARRY_LIMIT = 20_000
+TOKENIZE_CHUNK_SIZE = 1_000_000
+_SUBPART_SEPARATOR_PATTERN = re.compile(r'[-_/\s]')
+_WHITESPACE_PATTERN = re.compile(r'\s')
 
 
 def build_keyword_specs(user_keywords):
@@ -60,6 +103,25 @@ def build_keyword_specs(user_keywords):
     return keyword_specs
 
 
+def iter_lower_tokens(lower_text, chunk_size=TOKENIZE_CHUNK_SIZE):
+    """
+    Yield the same tokens as tokenize_lower_text without splitting the whole text at once.
+
+    Chunks end on a whitespace character, so no word is cut in two and at most
+    one chunk's worth of word strings is alive at a time.
+    """
+    text_length = len(lower_text)
+    start = 0
+    while start < text_length:
+        boundary = _WHITESPACE_PATTERN.search(lower_text, min(text_length, start + chunk_size))
+        end = boundary.start() if boundary else text_length
+        for word in lower_text[start:end].split():
+            token = word.strip(STRIP_CHARS)
+            if token:
+                yield token
+        start = end + 1
+
+
 def tokenize_lower_text(lower_text):
     return [
         token
@@ -152,88 +214,97 @@ def reduce_text_to_word_limit(text, metadata, word_limit, original_word_count):
 
 
 def prepare_text_for_analysis(text, metadata, word_limit):
+    """
+    Apply the word budget and tokenize the text that flows into the analysis.
+
+    Returns (processed_text, processed_lower, tokens, budget_info) where tokens
+    is a TokenArray over the lowercased, punctuation-stripped words.
+    """
     base_text = text or ""
     lower_text_full = base_text.lower()
-    words_full = tokenize_lower_text(lower_text_full)
-    original_word_count = len(words_full)
+    tokens_full = TokenArray.from_tokens(iter_lower_tokens(lower_text_full))
+    original_word_count = len(tokens_full)
     processed_text = base_text
     processed_lower = lower_text_full
-    processed_words = words_full
+    processed_tokens = tokens_full
     sampled_pages = []
     truncated = False
 
     if word_limit is not None and word_limit > 0 and original_word_count > word_limit:
-        truncated_text, sampled_pages = reduce_text_to_word_limit(
-            base_text,
-            metadata,
-            word_limit,
-            original_word_count
-        )
-        processed_text = truncated_text
-        processed_lower = processed_text.lower()
-        processed_words = tokenize_lower_text(processed_lower)
+        with time_stage('word_budget'):
+            truncated_text, sampled_pages = reduce_text_to_word_limit(
+                base_text,
+                metadata,
+                word_limit,
+                original_word_count
+            )
+            processed_text = truncated_text
+            processed_lower = processed_text.lower()
+            processed_tokens = TokenArray.from_tokens(iter_lower_tokens(processed_lower))
         truncated = True
         logging.info(
             "Applied word budget: reduced from %s to %s words (limit %s)",
             original_word_count,
-            len(processed_words),
+            len(processed_tokens),
             word_limit
         )
 
     budget_info = {
         "limit": word_limit,
         "original_word_count": original_word_count,
-        "processed_word_count": len(processed_words),
+        "processed_word_count": len(processed_tokens),
         "truncated": truncated,
         "sampled_pages": sampled_pages,
         "mode": "disabled" if word_limit is None or (isinstance(word_limit, int) and word_limit <= 0) else "limited"
     }
 
-    return processed_text, processed_lower, processed_words, budget_info
+    return processed_text, processed_lower, processed_tokens, budget_info
 
 
 def generate_wordcloud(freq):
-    nonzero_freq = {k: v for k, v in freq.items() if v > 0}
-    if not nonzero_freq:
-        return None
-
-    wc = WordCloud(width=800, height=400, background_color='white')
-    wc.generate_from_frequencies(nonzero_freq)
-    img_io = io.BytesIO()
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wc, interpolation='bilinear')
-    plt.axis('off')
-    plt.tight_layout(pad=0)
-    plt.savefig(img_io, format='PNG')
-    plt.close()
-    img_io.seek(0)
-    img_base64 = base64.b64encode(img_io.getvalue()).decode('utf-8')
-    return f"data:image/png;base64,{img_base64}"
+    """Schedule background rendering and return the /wordcloud/<hash>.png URL (or None)."""
+    return request_wordcloud(freq)
 
 
 def iter_pattern_matches(pattern, text, chunk_size=REGEX_CHUNK_SIZE, overlap=REGEX_CHUNK_OVERLAP):
     """
     Yield (start, end, group_name) offsets for regex matches while scanning the text in chunks.
+
+    Each window is scanned in place with finditer(text, pos, endpos), so no
+    substring is copied and lookbehinds still see the text before pos. Only
+    matches starting before the last ``overlap`` characters of a window are
+    accepted: a truncated endpos can make a (?!\\w) lookahead succeed falsely,
+    so matches near the window end are left to the next window, which resumes
+    after the last accepted match. Every match is reported exactly once and
+    the result equals an unchunked scan as long as ``overlap`` exceeds the
+    longest possible match.
     """
     if not pattern or not text:
         return
 
     text_length = len(text)
-    if text_length <= chunk_size:
+    safe_overlap = max(1, overlap or 0)
+    if not chunk_size or chunk_size <= 0 or text_length <= chunk_size:
         for match in pattern.finditer(text):
             yield match.start(), match.end(), match.lastgroup
         return
 
-    start = 0
-    safe_overlap = max(0, overlap)
-    while start < text_length:
-        end = min(text_length, start + chunk_size)
-        chunk = text[start:end]
-        for match in pattern.finditer(chunk):
-            yield start + match.start(), start + match.end(), match.lastgroup
+    chunk_size = max(chunk_size, 2 * safe_overlap)
+    pos = 0
+    while True:
+        end = pos + chunk_size
         if end >= text_length:
-            break
-        start = max(0, end - safe_overlap)
+            for match in pattern.finditer(text, pos):
+                yield match.start(), match.end(), match.lastgroup
+            return
+        accept_before = end - safe_overlap
+        next_pos = accept_before
+        for match in pattern.finditer(text, pos, end):
+            if match.start() >= accept_before:
+                break
+            yield match.start(), match.end(), match.lastgroup
+            next_pos = max(next_pos, match.end())
+        pos = next_pos
 
 
 def build_combined_keyword_regex(keyword_specs):
@@ -242,25 +313,32 @@ def build_combined_keyword_regex(keyword_specs):
     Returns (pattern, group_name->label map).
     """
     parts = []
+    first_chars = set()
     group_to_label = {}
     for idx, spec in enumerate(keyword_specs):
         tokens = spec['tokens']
         if not tokens:
             continue
-        pattern = compile_keyword_pattern(tokens)
-        if not pattern:
-            continue
         group_name = f"kw{idx}"
-        parts.append(f"(?P<{group_name}>{pattern.pattern})")
+        parts.append(f"(?P<{group_name}>{keyword_pattern_body(tokens)})")
+        first_chars.add(tokens[0][0])
         group_to_label[group_name] = spec['label']
 
     if not parts:
         return None, {}
 
-    combined = "|".join(parts)
+    # Every alternative starts with the same word boundary, so it is checked once,
+    # and the first-character lookahead lets the engine skip most positions
+    # without trying each alternative.
+    first_char_class = "".join(re.escape(char) for char in sorted(first_chars))
+    combined = rf"(?=[{first_char_class}])(?<!\w)(?:{'|'.join(parts)})"
     return re.compile(combined, re.IGNORECASE), group_to_label
 
 
+def fits_sentiment_limit(text):
+    return not SENTIMENT_CHAR_LIMIT or len(text or '') <= SENTIMENT_CHAR_LIMIT
+
+
 def analyze_sentiment_safe(text):
     """
     Run TextBlob sentiment analysis on a bounded slice to avoid OOM on very large documents.
@@ -275,7 +353,7 @@ def analyze_sentiment_safe(text):
         sampled = True
 
     try:
-        blob = TextBlob(sample_text)
+        blob = import_module("textblob").TextBlob(sample_text)
         sentiment = {
             'polarity': blob.sentiment.polarity,
             'subjectivity': blob.sentiment.subjectivity
@@ -293,68 +371,79 @@ def analyze_sentiment_safe(text):
         }
 
 
-def analyze_document(text, user_keywords, text_metadata=None, word_limit_override=_WORD_LIMIT_SENTINEL):
+def analyze_document_sentiment(prepared, text_metadata=None, source_text=None):
+    """
+    Sentiment for a prepared document according to SENTIMENT_MODE.
+
+    A processed text within SENTIMENT_CHAR_LIMIT is scored whole in one call in
+    either mode. Longer texts are handled per mode: "prefix" scores the first
+    SENTIMENT_CHAR_LIMIT characters; "pages" (the default) spreads the same
+    character budget over evenly spaced pages of source_text, the unbudgeted
+    text the page spans refer to. Without source_text the processed text is
+    sampled, by page only when the word budget left it untouched.
+    """
+    if SENTIMENT_MODE == 'prefix' or fits_sentiment_limit(prepared.processed_text):
+        return analyze_sentiment_safe(prepared.processed_text)
+    pages = text_metadata.get('pages') if isinstance(text_metadata, dict) else None
+    if source_text is None:
+        source_text = prepared.processed_text
+        if prepared.budget_info.get('truncated'):
+            pages = None
+    return analyze_sentiment_sampled(source_text, pages, SENTIMENT_CHAR_LIMIT)
+
+
+class PreparedDocument:
+    """
+    Keyword-independent state of one analysis: budgeted text, tokens and lookups.
+
+    Kept per worker so a re-analysis with different keywords can skip
+    tokenization (see analysis_pipeline.reanalyze_document).
+    """
+
+    __slots__ = ('processed_text', 'text_lower', 'tokens', 'budget_info', 'word_offsets', 'page_lookup')
+
+    def __init__(self, processed_text, text_lower, tokens, budget_info, word_offsets, page_lookup):
+        self.processed_text = processed_text
+        self.text_lower = text_lower
+        self.tokens = tokens
+        self.budget_info = budget_info
+        self.word_offsets = word_offsets
+        self.page_lookup = page_lookup
+
+
+def resolve_word_limit(word_limit_override=_WORD_LIMIT_SENTINEL):
     if word_limit_override is _WORD_LIMIT_SENTINEL:
-        word_limit = get_max_words_analysis()
-    else:
-        word_limit = word_limit_override
-    processed_text, text_lower, words, budget_info = prepare_text_for_analysis(
-        text,
-        text_metadata,
-        word_limit
-    )
-    total_words = len(words)
+        return get_max_words_analysis()
+    return word_limit_override
 
-    keyword_specs = build_keyword_specs(user_keywords)
 
-    token_index = {}
+def prepare_document(text, text_metadata=None, word_limit_override=_WORD_LIMIT_SENTINEL):
+    with time_stage('prepare'):
+        processed_text, text_lower, tokens, budget_info = prepare_text_for_analysis(
+            text,
+            text_metadata,
+            resolve_word_limit(word_limit_override)
+        )
+        return PreparedDocument(
+            processed_text,
+            text_lower,
+            tokens,
+            budget_info,
+            build_word_offsets(processed_text),
+            PageIndex.from_metadata(text_metadata)
+        )
 
-    def add_token(token, index):
-        if not token:
-            return
-        token_index.setdefault(token, []).append(index)
 
-    for idx, word in enumerate(words):
-        tokens = {word}
-        for part in re.split(r'[-_/\s]+', word):
-            part = part.strip()
-            if part:
-                tokens.add(part)
-        for token in tokens:
-            add_token(token, idx)
+def analyze_keywords(prepared, user_keywords):
+    """Compute the keyword-dependent sections: frequencies, densities, kwic and collocations."""
+    processed_text = prepared.processed_text
+    word_offsets = prepared.word_offsets
+    page_lookup = prepared.page_lookup
 
-    word_pattern = re.compile(r'\b\w[\w\-_/]*\b')
-    word_spans = list(word_pattern.finditer(processed_text))
+    keyword_specs = build_keyword_specs(user_keywords)
 
     freq = {spec['label']: 0 for spec in keyword_specs}
     kwic_results = {spec['label']: [] for spec in keyword_specs}
-    collocations = {}
-    window = 20
-
-    page_map = []
-    if text_metadata and isinstance(text_metadata, dict):
-        pages = text_metadata.get('pages') or []
-        if isinstance(pages, list):
-            page_map = [
-                {
-                    'number': page.get('number'),
-                    'start': page.get('start', 0),
-                    'end': page.get('end', 0)
-                }
-                for page in pages
-                if page and 'number' in page
-            ]
-
-    def find_page_for_offset(offset):
-        if not page_map:
-            return None
-        for page in page_map:
-            start = page.get('start', 0)
-            end = page.get('end', start)
-            if start <= offset < end:
-                return page.get('number')
-        # If offset is at or beyond the last recorded end, assume last page
-        return page_map[-1].get('number')
 
     combined_pattern, group_to_label = build_combined_keyword_regex(keyword_specs)
 
@@ -365,87 +454,183 @@ def analyze_document(text, user_keywords, text_metadata=None, word_limit_overrid
         contexts = kwic_results[label]
         if len(contexts) >= 5:
             return
-        snippet = build_snippet(processed_text, match_start, match_end, word_spans, window=window)
+        snippet = build_snippet(processed_text, match_start, match_end, word_offsets, window=KWIC_WINDOW)
         if not snippet:
             return
         contexts.append({
             'snippet': snippet,
-            'page': find_page_for_offset(match_start),
+            'page': page_lookup.page_for_offset(match_start),
             'start': match_start,
             'end': match_end,
             'match_text': processed_text[match_start:match_end].strip()
         })
 
-    if combined_pattern:
-        for match_start, match_end, group_name in iter_pattern_matches(combined_pattern, text_lower):
-            label = group_to_label.get(group_name)
-            if label:
-                record_match(label, match_start, match_end)
-    else:
-        for spec in keyword_specs:
-            label = spec['label']
-            pattern = compile_keyword_pattern(spec['tokens'])
-            if not pattern:
-                continue
-            for match_start, match_end, _ in iter_pattern_matches(pattern, text_lower):
-                record_match(label, match_start, match_end)
+    with time_stage('keyword_matching'):
+        if combined_pattern:
+            for match_start, match_end, group_name in iter_pattern_matches(combined_pattern, prepared.text_lower):
+                label = group_to_label.get(group_name)
+                if label:
+                    record_match(label, match_start, match_end)
+        else:
+            for spec in keyword_specs:
+                label = spec['label']
+                pattern = compile_keyword_pattern(spec['tokens'])
+                if not pattern:
+                    continue
+                for match_start, match_end, _ in iter_pattern_matches(pattern, prepared.text_lower):
+                    record_match(label, match_start, match_end)
+
+    with time_stage('collocations'):
+        collocations = compute_collocations(prepared.tokens, keyword_specs)
+
+    return {
+        'frequencies': freq,
+        'densities': compute_densities(freq, len(prepared.tokens)),
+        'kwic': kwic_results,
+        'collocations': collocations
+    }
+
+
+def analyze_prepared_document(prepared, user_keywords, text_metadata=None, source_text=None):
+    """
+    Run the full analysis on a PreparedDocument; returns (payload, wordcloud_image, total_words).
+
+    source_text is the extracted text before the word budget; it is only read
+    to sample pages for sentiment.
+    """
+    processed_text = prepared.processed_text
+    budget_info = prepared.budget_info
+    total_words = len(prepared.tokens)
+
+    keyword_sections = analyze_keywords(prepared, user_keywords)
+    freq = keyword_sections['frequencies']
+
+    with time_stage('sentiment'):
+        sentiment, sentiment_sampling = analyze_document_sentiment(prepared, text_metadata, source_text)
+
+    with time_stage('trends'):
+        sentences = re.split(SENTENCE_SPLIT_PATTERN, processed_text)
+        trend_results, trend_insights = analyze_trends(sentences)
+
+    num_sentences = len([s for s in sentences if s.strip()])
+    num_syllables = prepared.tokens.syllable_estimate()
+    readability = compute_readability(total_words, num_sentences, num_syllables)
+
+    with time_stage('wordcloud'):
+        wordcloud_image = render_wordcloud_if_feasible(freq, budget_info.get('processed_word_count', 0))
+
+    page_selection_meta = (text_metadata or {}).get('page_selection') if text_metadata else None
+    count_document_limits(page_selection_meta, budget_info)
+    processing_summary = build_processing_summary(budget_info, page_selection_meta, sentiment_sampling)
 
+    analysis_payload = dict(keyword_sections)
+    analysis_payload.update({
+        'sentiment': sentiment,
+        'readability': readability,
+        'trends': trend_results,
+        'trendInsights': trend_insights,
+        'processingSummary': processing_summary
+    })
+
+    return analysis_payload, wordcloud_image, total_words
+
+
+def analyze_document(text, user_keywords, text_metadata=None, word_limit_override=_WORD_LIMIT_SENTINEL):
+    prepared = prepare_document(text, text_metadata, word_limit_override)
+    return analyze_prepared_document(prepared, user_keywords, text_metadata, source_text=text)
+
+
+def reanalyze_keywords(prepared, user_keywords, stored_payload):
+    """
+    Recompute only the keyword-dependent sections on top of a stored analysis payload.
+
+    Sentiment, readability and trends do not depend on the keyword list and are
+    taken from stored_payload unchanged. Returns (payload, wordcloud_image).
+    """
+    analysis_payload = dict(stored_payload or {})
+    analysis_payload.update(analyze_keywords(prepared, user_keywords))
+    wordcloud_image = render_wordcloud_if_feasible(
+        analysis_payload['frequencies'],
+        prepared.budget_info.get('processed_word_count', 0)
+    )
+    return analysis_payload, wordcloud_image
+
+
+def find_vocabulary_ids(vocabulary, wanted_tokens):
+    """
+    Map each wanted token to the ids of vocabulary words equal to it or containing it as a -_/ part.
+
+    Only words that contain a separator are expanded, so the cost is one set
+    lookup per vocabulary entry for plain words.
+    """
+    ids_by_token = {token: [] for token in wanted_tokens}
+    if not ids_by_token:
+        return ids_by_token
+    for vocabulary_id, word in enumerate(vocabulary):
+        if word in ids_by_token:
+            ids_by_token[word].append(vocabulary_id)
+        if _SUBPART_SEPARATOR_PATTERN.search(word):
+            for token in expand_word_tokens(word):
+                if token != word and token in ids_by_token:
+                    ids_by_token[token].append(vocabulary_id)
+    return ids_by_token
+
+
+def compute_collocations(tokens, keyword_specs):
+    """Top left/right neighbours of every single-token keyword; multi-token keywords get empty lists."""
+    ids_by_token = find_vocabulary_ids(
+        tokens.vocabulary,
+        {spec['tokens'][0] for spec in keyword_specs if len(spec['tokens']) == 1}
+    )
+    collocations = {}
     for spec in keyword_specs:
         label = spec['label']
-        tokens = spec['tokens']
-        if len(tokens) == 1:
-            token = tokens[0]
-            indices = token_index.get(token, [])
-            left_neighbors, right_neighbors = [], []
-            for i in indices:
-                if i > 0:
-                    left_neighbors.append(words[i - 1])
-                if i < len(words) - 1:
-                    right_neighbors.append(words[i + 1])
+        if len(spec['tokens']) == 1:
+            positions = tokens.positions_of(ids_by_token[spec['tokens'][0]])
             collocations[label] = {
-                "left": Counter(left_neighbors).most_common(3),
-                "right": Counter(right_neighbors).most_common(3)
+                "left": tokens.neighbor_counts(positions, -1),
+                "right": tokens.neighbor_counts(positions, 1)
             }
         else:
             collocations[label] = {"left": [], "right": []}
+    return collocations
 
-    density = {
-        label: round((freq[label] / total_words) * 100, 2) if total_words > 0 else 0
-        for label in freq
-    }
 
-    sentiment, sentiment_sampling = analyze_sentiment_safe(processed_text)
+def compute_densities(freq, total_words):
+    return dict(zip(freq, compute_percentages(list(freq.values()), total_words)))
 
-    sentences = re.split(r'(?<=[.!?])\s+', processed_text)
-    num_sentences = len([s for s in sentences if s.strip()])
-    num_syllables = sum(len(w) // 3 for w in words)
+
+def compute_readability(total_words, num_sentences, num_syllables):
     asl = total_words / max(1, num_sentences)
     asw = num_syllables / max(1, total_words)
     flesch_score = round(206.835 - 1.015 * asl - 84.6 * asw, 2)
 
-    readability = {
+    return {
         'flesch_reading_ease': flesch_score,
         'total_words': total_words,
         'total_sentences': num_sentences
     }
 
-    trend_results, trend_insights = analyze_trends(sentences)
 
+def render_wordcloud_if_feasible(freq, processed_word_count):
     nonzero_terms = sum(1 for value in freq.values() if value > 0)
     can_render_wordcloud = (
         nonzero_terms > 0
         and nonzero_terms <= WORDCLOUD_MAX_TERMS
-        and budget_info.get('processed_word_count', 0) <= WORDCLOUD_MAX_WORDS
+        and (processed_word_count or 0) <= WORDCLOUD_MAX_WORDS
     )
-    wordcloud_image = generate_wordcloud(freq) if can_render_wordcloud else None
-    if not can_render_wordcloud and nonzero_terms > 0:
+    if can_render_wordcloud:
+        return generate_wordcloud(freq)
+    if nonzero_terms > 0:
         logging.info(
             "Skipping word cloud generation (terms=%s, processed_words=%s)",
             nonzero_terms,
-            budget_info.get('processed_word_count')
+            processed_word_count
         )
+    return None
 
-    page_selection_meta = (text_metadata or {}).get('page_selection') if text_metadata else None
+
+def build_processing_summary(budget_info, page_selection_meta, sentiment_sampling):
     page_sampling_summary = None
     if isinstance(page_selection_meta, dict) and page_selection_meta:
         page_sampling_summary = {
@@ -459,7 +644,7 @@ def analyze_document(text, user_keywords, text_metadata=None, word_limit_overrid
 
     sampled_pages = budget_info.get('sampled_pages') or []
     max_sampled_pages = sampled_pages[:50] if isinstance(sampled_pages, list) else []
-    processing_summary = {
+    return {
         'wordBudget': {
             'limit': budget_info.get('limit'),
             'originalWords': budget_info.get('original_word_count'),
@@ -472,16 +657,248 @@ def analyze_document(text, user_keywords, text_metadata=None, word_limit_overrid
         'sentimentSampling': sentiment_sampling
     }
 
-    analysis_payload = {
-        'frequencies': freq,
-        'densities': density,
-        'kwic': kwic_results,
-        'collocations': collocations,
-        'sentiment': sentiment,
-        'readability': readability,
-        'trends': trend_results,
-        'trendInsights': trend_insights,
-        'processingSummary': processing_summary
-    }
 
-    return analysis_payload, wordcloud_image, total_words
+def expand_word_tokens(word):
+    """Return the word itself plus its -_/ separated parts (used for collocations)."""
+    tokens = {word}
+    for part in re.split(r'[-_/\s]+', word):
+        part = part.strip()
+        if part:
+            tokens.add(part)
+    return tokens
+
+
+class StreamingDocumentAnalyzer:
+    """
+    Accumulate the analysis page by page so only one page of text is held at once.
+
+    Keyword counts, KWIC snippets, collocations, sentence-level trend status and
+    readability counters are updated incrementally in add_page(); finalize()
+    returns the same (payload, wordcloud_image, total_words) tuple as
+    analyze_document. Keyword matches spanning a page break are not counted and
+    KWIC snippets are clipped at page boundaries.
+    """
+
+    def __init__(self, user_keywords, page_selection=None, word_limit_override=_WORD_LIMIT_SENTINEL):
+        if word_limit_override is _WORD_LIMIT_SENTINEL:
+            self.word_limit = get_max_words_analysis()
+        else:
+            self.word_limit = word_limit_override
+        self.page_selection = page_selection
+
+        processed_pages = (page_selection or {}).get('processed_pages') or 0
+        self.words_per_page = None
+        if self.word_limit is not None and self.word_limit > 0 and processed_pages > 0:
+            self.words_per_page = max(1, -(-self.word_limit // processed_pages))
+
+        self.keyword_specs = build_keyword_specs(user_keywords)
+        self.combined_pattern, self.group_to_label = build_combined_keyword_regex(self.keyword_specs)
+        self.freq = {spec['label']: 0 for spec in self.keyword_specs}
+        self.kwic_results = {spec['label']: [] for spec in self.keyword_specs}
+
+        self.labels_by_token = {}
+        for spec in self.keyword_specs:
+            if len(spec['tokens']) == 1:
+                self.labels_by_token.setdefault(spec['tokens'][0], []).append(spec['label'])
+        self.left_neighbors = {label: Counter() for labels in self.labels_by_token.values() for label in labels}
+        self.right_neighbors = {label: Counter() for label in self.left_neighbors}
+        self.previous_word = None
+        self.pending_right = []
+
+        self.trend_accumulator = TrendAccumulator()
+        self.sentence_carry = ''
+        self.num_sentences = 0
+        self.num_syllables = 0
+        self.original_word_count = 0
+        self.total_words = 0
+        self.truncated = False
+        self.sentiment_parts = []
+        self.sentiment_chars = 0
+        # The leading SENTIMENT_CHAR_LIMIT characters are always kept, so a text
+        # within the limit is scored whole. Page-sampled sentiment for longer
+        # texts needs the page count up front; without it the prefix is scored.
+        self.sentiment_positions = None
+        if SENTIMENT_MODE != 'prefix' and processed_pages > 1:
+            self.sentiment_positions = set(select_evenly_spaced_indices(processed_pages, SENTIMENT_SAMPLE_PAGES))
+        self.sentiment_samples = []
+        self.page_spans = []
+        self.offset = 0
+
+    def add_page(self, page_number, page_text):
+        page_text = page_text or ''
+        if self.sentiment_positions is not None and len(self.page_spans) in self.sentiment_positions:
+            sample = clip_sample(page_text, sample_chars_per_page(SENTIMENT_CHAR_LIMIT))
+            if sample:
+                self.sentiment_samples.append((page_number, sample))
+        if self.page_spans:
+            self.offset += 1  # newline separator between pages
+
+        page_words = page_text.split()
+        self.original_word_count += len(page_words)
+        if self.words_per_page is not None and len(page_words) > self.words_per_page:
+            page_text = " ".join(page_words[:self.words_per_page])
+            self.truncated = True
+        del page_words
+
+        self.page_spans.append({
+            'number': page_number,
+            'start': self.offset,
+            'end': self.offset + len(page_text)
+        })
+
+        page_lower = page_text.lower()
+        words = tokenize_lower_text(page_lower)
+        self.total_words += len(words)
+        self.num_syllables += sum(len(w) // 3 for w in words)
+
+        self._scan_keywords(page_number, page_text, page_lower)
+        self._update_collocations(words)
+        self._update_sentences(page_text)
+
+        if not SENTIMENT_CHAR_LIMIT or self.sentiment_chars <= SENTIMENT_CHAR_LIMIT:
+            sentiment_piece = ("\n" if self.sentiment_parts else "") + page_text
+            if SENTIMENT_CHAR_LIMIT:
+                # Keep one extra character so analyze_sentiment_safe reports sampling correctly.
+                sentiment_piece = sentiment_piece[:SENTIMENT_CHAR_LIMIT + 1 - self.sentiment_chars]
+            self.sentiment_parts.append(sentiment_piece)
+            self.sentiment_chars += len(sentiment_piece)
+
+        self.offset += len(page_text)
+
+    def _scan_keywords(self, page_number, page_text, page_lower):
+        if self.combined_pattern:
+            matches = (
+                (self.group_to_label.get(group_name), match_start, match_end)
+                for match_start, match_end, group_name in iter_pattern_matches(self.combined_pattern, page_lower)
+            )
+        else:
+            matches = (
+                (spec['label'], match_start, match_end)
+                for spec in self.keyword_specs
+                for match_start, match_end, _ in iter_pattern_matches(
+                    compile_keyword_pattern(spec['tokens']), page_lower
+                )
+            )
+
+        word_offsets = None
+        for label, match_start, match_end in matches:
+            if not label or label not in self.freq:
+                continue
+            self.freq[label] += 1
+            contexts = self.kwic_results[label]
+            if len(contexts) >= 5:
+                continue
+            if word_offsets is None:
+                word_offsets = build_word_offsets(page_text)
+            snippet = build_snippet(page_text, match_start, match_end, word_offsets, window=KWIC_WINDOW)
+            if not snippet:
+                continue
+            contexts.append({
+                'snippet': snippet,
+                'page': page_number,
+                'start': self.offset + match_start,
+                'end': self.offset + match_end,
+                'match_text': page_text[match_start:match_end].strip()
+            })
+
+    def _update_collocations(self, words):
+        if not self.labels_by_token:
+            if words:
+                self.previous_word = words[-1]
+            return
+
+        for word in words:
+            for label in self.pending_right:
+                self.right_neighbors[label][word] += 1
+            self.pending_right = []
+            for token in expand_word_tokens(word):
+                for label in self.labels_by_token.get(token, ()):
+                    if self.previous_word is not None:
+                        self.left_neighbors[label][self.previous_word] += 1
+                    self.pending_right.append(label)
+            self.previous_word = word
+
+    def _update_sentences(self, page_text):
+        chunk = f"{self.sentence_carry}\n{page_text}" if len(self.page_spans) > 1 else page_text
+        sentences = re.split(SENTENCE_SPLIT_PATTERN, chunk)
+        self.sentence_carry = sentences.pop() if sentences else ''
+        if len(self.sentence_carry) > SENTENCE_CARRY_LIMIT:
+            sentences.append(self.sentence_carry)
+            self.sentence_carry = ''
+        self._consume_sentences(sentences)
+
+    def _consume_sentences(self, sentences):
+        self.num_sentences += sum(1 for sentence in sentences if sentence.strip())
+        self.trend_accumulator.add_sentences(sentences)
+
+    def finalize(self):
+        self._consume_sentences([self.sentence_carry])
+        self.sentence_carry = ''
+
+        collocations = {}
+        for spec in self.keyword_specs:
+            label = spec['label']
+            if label in self.left_neighbors:
+                collocations[label] = {
+                    "left": self.left_neighbors[label].most_common(3),
+                    "right": self.right_neighbors[label].most_common(3)
+                }
+            else:
+                collocations[label] = {"left": [], "right": []}
+
+        with time_stage('sentiment'):
+            over_limit = SENTIMENT_CHAR_LIMIT and self.sentiment_chars > SENTIMENT_CHAR_LIMIT
+            if self.sentiment_positions is not None and over_limit:
+                sentiment, sentiment_sampling = analyze_sentiment_samples(
+                    self.sentiment_samples,
+                    len(self.page_spans),
+                    SENTIMENT_CHAR_LIMIT
+                )
+            else:
+                sentiment, sentiment_sampling = analyze_sentiment_safe("".join(self.sentiment_parts))
+        trend_results, trend_insights = self.trend_accumulator.results()
+
+        budget_info = {
+            "limit": self.word_limit,
+            "original_word_count": self.original_word_count,
+            "processed_word_count": self.total_words,
+            "truncated": self.truncated,
+            "sampled_pages": [],
+            "mode": "disabled" if self.word_limit is None or self.word_limit <= 0 else "limited"
+        }
+        count_document_limits(self.page_selection, budget_info)
+        processing_summary = build_processing_summary(budget_info, self.page_selection, sentiment_sampling)
+        processing_summary['streaming'] = True
+
+        analysis_payload = {
+            'frequencies': self.freq,
+            'densities': compute_densities(self.freq, self.total_words),
+            'kwic': self.kwic_results,
+            'collocations': collocations,
+            'sentiment': sentiment,
+            'readability': compute_readability(self.total_words, self.num_sentences, self.num_syllables),
+            'trends': trend_results,
+            'trendInsights': trend_insights,
+            'processingSummary': processing_summary
+        }
+        with time_stage('wordcloud'):
+            wordcloud_image = render_wordcloud_if_feasible(self.freq, self.total_words)
+        return analysis_payload, wordcloud_image, self.total_words
+
+
+def analyze_document_stream(pages, user_keywords, page_selection=None, word_limit_override=_WORD_LIMIT_SENTINEL):
+    """
+    Analyze an iterable of (page_number, page_text) pairs without joining them.
+
+    Returns (analysis_payload, wordcloud_image, total_words, page_spans) where
+    page_spans describe the processed text as if the pages were newline-joined.
+    """
+    analyzer = StreamingDocumentAnalyzer(
+        user_keywords,
+        page_selection=page_selection,
+        word_limit_override=word_limit_override
+    )
+    for page_number, page_text in pages:
+        analyzer.add_page(page_number, page_text)
+    analysis_payload, wordcloud_image, total_words = analyzer.finalize()
+    return analysis_payload, wordcloud_image, total_words, analyzer.page_spans
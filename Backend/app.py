@@ -1,55 +1,45 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+import json
 import logging
 import os
-import re
-
-import boto3
-from botocore.config import Config
-from urllib.parse import quote
 
 try:  # Prefer package-relative imports when available
-    from .analysis_service import analyze_document
-    from .document_processing import (
-        allowed_file,
-        extract_text_docx,
-        extract_text_pdf,
-        extract_text_txt,
-    )
+    from .analysis_pipeline import analyze_library_object, reanalyze_document, run_analysis
+    from .batch_analysis import iter_batch_results, spool_upload
+    from .document_processing import allowed_file
     from .constants import (
+        ASYNC_ANALYSIS_MIN_BYTES,
+        BATCH_MAX_DOCUMENTS,
         get_max_words_analysis,
         get_default_max_words_analysis,
         set_max_words_analysis,
     )
+    from .document_store import get_document_store, parse_document_id
+    from .job_queue import enqueue_analysis_job, get_job
+    from .page_index import PageIndex
+    from .search_index import search_keyword
+    from .wordcloud_renderer import get_wordcloud_image_path
+    from .library_storage import get_library_listing, get_missing_library_env, is_library_pdf
+    from .metrics import parse_profile_mode, render_metrics
 except ImportError:  # Fallback for environments running from the backend folder root
-    from analysis_service import analyze_document
-    from document_processing import (
-        allowed_file,
-        extract_text_docx,
-        extract_text_pdf,
-        extract_text_txt,
-    )
+    from analysis_pipeline import analyze_library_object, reanalyze_document, run_analysis
+    from batch_analysis import iter_batch_results, spool_upload
+    from document_processing import allowed_file
     from constants import (
+        ASYNC_ANALYSIS_MIN_BYTES,
+        BATCH_MAX_DOCUMENTS,
         get_max_words_analysis,
         get_default_max_words_analysis,
         set_max_words_analysis,
     )
-
-# S3-compatible OCI API helper (Oracle Object Storage)
-def get_s3_client():
-    region = os.environ["OCI_REGION"]
-    namespace = os.environ["OCI_NAMESPACE"]
-    access_key = os.environ["OCI_S3_ACCESS_KEY"]
-    secret_key = os.environ["OCI_S3_SECRET_KEY"]
-    endpoint = f"https://{namespace}.compat.objectstorage.{region}.oraclecloud.com"
-    return boto3.client(
-        "s3",
-        region_name=region,
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        endpoint_url=endpoint,
-        config=Config(signature_version="s3v4")
-    )
+    from document_store import get_document_store, parse_document_id
+    from job_queue import enqueue_analysis_job, get_job
+    from page_index import PageIndex
+    from search_index import search_keyword
+    from wordcloud_renderer import get_wordcloud_image_path
+    from library_storage import get_library_listing, get_missing_library_env, is_library_pdf
+    from metrics import parse_profile_mode, render_metrics
 
 
 # Initialize Flask
@@ -77,8 +67,8 @@ CORS(app,
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
-# In-memory storage for uploaded documents (use database in production)
-uploaded_documents = {}
+# Uploaded documents live in a store shared across workers (SQLite unless DOCUMENT_STORE=memory)
+document_store = get_document_store()
 
 
 @app.route('/health')
@@ -86,27 +76,61 @@ def health_check():
     return jsonify({
         "status": "OK", 
         "message": "Buzzword Analyzer API running",
-        "documents_uploaded": len(uploaded_documents)
+        "documents_uploaded": document_store.count()
     }), 200
 
 
+@app.route('/metrics')
+def metrics():
+    rendered = render_metrics()
+    if rendered is None:
+        return jsonify({'error': 'Metrics are unavailable: prometheus_client is not installed'}), 501
+    body, content_type = rendered
+    return Response(body, mimetype=content_type)
+
+
 @app.route('/documents', methods=['GET'])
 def list_documents():
     """List uploaded documents"""
-    documents = []
-    for doc_id, doc_data in uploaded_documents.items():
-        words_list = doc_data.get('words')
-        stored_word_count = doc_data.get('word_count')
-        if stored_word_count is None and isinstance(words_list, list):
-            stored_word_count = len(words_list)
-        documents.append({
-            'id': doc_id,
-            'filename': doc_data['filename'],
-            'word_count': stored_word_count or 0
-        })
+    documents = [
+        {
+            'id': summary['id'],
+            'filename': summary['filename'],
+            'word_count': summary['word_count'] or 0
+        }
+        for summary in document_store.list_documents()
+    ]
     return jsonify({'documents': documents})
 
 
+@app.route('/documents/<doc_id>/reanalyze', methods=['POST'])
+def reanalyze(doc_id):
+    """
+    Re-run only the keyword-dependent analysis of an uploaded document.
+
+    Accepts the same comma-separated ``buzzwords`` field as /analyze, either as
+    form data or JSON. Sentiment, readability and trends are reused.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        raw_keywords = data.get('buzzwords', request.form.get('buzzwords', ''))
+        if isinstance(raw_keywords, list):
+            raw_keywords = ','.join(str(keyword) for keyword in raw_keywords)
+        user_keywords = [w.strip() for w in str(raw_keywords).split(',') if w.strip()]
+
+        try:
+            response_payload = reanalyze_document(doc_id, user_keywords)
+        except ValueError as validation_error:
+            return jsonify({'error': str(validation_error)}), 409
+        if response_payload is None:
+            return jsonify({'error': 'Document not found'}), 404
+        return jsonify(response_payload)
+
+    except Exception as e:
+        logging.error(f"Re-analysis failed: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     try:
@@ -123,87 +147,177 @@ def analyze():
         raw_keywords = request.form.get('buzzwords', '')
         user_keywords = [w.strip() for w in raw_keywords.split(',') if w.strip()]
         disable_limits = str(request.form.get('wordBudgetMode', '')).strip().lower() == 'disabled'
+        streaming_mode = str(request.form.get('analysisMode', '')).strip().lower() == 'streaming'
+        async_requested = str(request.form.get('async', '')).strip().lower() in {'1', 'true', 'yes'}
+        profile_mode = parse_profile_mode(request.form.get('profile'))
+
+        if async_requested:
+            file_bytes = file.read()
+            if ASYNC_ANALYSIS_MIN_BYTES is None or len(file_bytes) >= ASYNC_ANALYSIS_MIN_BYTES:
+                job_id = enqueue_analysis_job(
+                    filename,
+                    file_bytes,
+                    user_keywords,
+                    disable_limits=disable_limits,
+                    streaming=streaming_mode,
+                    profile=profile_mode
+                )
+                return jsonify({
+                    'job_id': job_id,
+                    'status': 'queued',
+                    'status_url': f"/jobs/{job_id}"
+                }), 202
+            # Small uploads keep the synchronous fast path.
+            file.seek(0)
 
         try:
-            text_metadata = None
-
-            def build_default_metadata(extracted_text):
-                return {
-                    'pages': [{
-                        'number': 1,
-                        'start': 0,
-                        'end': len(extracted_text or '')
-                    }],
-                    'page_selection': {
-                        'total_pages': 1,
-                        'processed_pages': 1,
-                        'limit': None,
-                        'sampled': False,
-                        'strategy': 'all'
-                    }
-                }
-
-            if filename.endswith('.pdf'):
-                pdf_kwargs = {'return_metadata': True}
-                if disable_limits:
-                    pdf_kwargs['page_limit_override'] = None
-                text, text_metadata = extract_text_pdf(file, **pdf_kwargs)
-            elif filename.endswith('.docx'):
-                text = extract_text_docx(file)
-                text_metadata = build_default_metadata(text)
-            elif filename.endswith('.txt'):
-                text = extract_text_txt(file)
-                text_metadata = build_default_metadata(text)
-            else:
-                return jsonify({'error': 'Unsupported file type'}), 400
-        except ValueError as extraction_error:
-            logging.warning(f"Document validation error: {extraction_error}")
-            return jsonify({'error': str(extraction_error)}), 400
-        except Exception as extraction_error:
-            logging.error(f"Document extraction error: {extraction_error}")
-            return jsonify({'error': 'Failed to extract text from the document.'}), 400
-
-        analysis_kwargs = {}
-        if disable_limits:
-            analysis_kwargs['word_limit_override'] = None
+            response_payload = run_analysis(
+                filename,
+                file,
+                user_keywords,
+                disable_limits=disable_limits,
+                streaming=streaming_mode,
+                profile=profile_mode,
+                remember_prepared=True
+            )
+        except ValueError as validation_error:
+            return jsonify({'error': str(validation_error)}), 400
+
+        return jsonify(response_payload)
+
+    except Exception as e:
+        logging.error(f"Analysis failed: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/analyze-library', methods=['POST'])
+def analyze_library():
+    """
+    Analyze a PDF from the library bucket without a client round trip.
+
+    Expects JSON (or form data) with ``key`` as listed by /library plus the
+    optional /analyze fields ``buzzwords``, ``wordBudgetMode``, ``analysisMode`` and ``profile``.
+    """
+    try:
+        data = request.get_json(silent=True) or request.form
+        library_key = str(data.get('key', '')).strip()
+        if not library_key:
+            return jsonify({'error': 'No library key provided'}), 400
+        if not is_library_pdf(library_key):
+            return jsonify({'error': 'Unsupported file type'}), 400
+        if get_missing_library_env():
+            return jsonify({'error': 'Library storage is not configured.'}), 400
+
+        raw_keywords = data.get('buzzwords', '')
+        user_keywords = [w.strip() for w in str(raw_keywords).split(',') if w.strip()]
+        disable_limits = str(data.get('wordBudgetMode', '')).strip().lower() == 'disabled'
+        streaming_mode = str(data.get('analysisMode', '')).strip().lower() == 'streaming'
 
         try:
-            analysis_payload, img_data_url, word_count = analyze_document(
-                text,
+            response_payload = analyze_library_object(
+                library_key,
                 user_keywords,
-                text_metadata,
-                **analysis_kwargs
+                disable_limits=disable_limits,
+                streaming=streaming_mode,
+                profile=parse_profile_mode(data.get('profile')),
+                remember_prepared=True
             )
-        except ValueError as analysis_error:
-            logging.warning(f"Analysis validation error: {analysis_error}")
-            return jsonify({'error': str(analysis_error)}), 400
-
-        # Store document content for search functionality
-        doc_id = f"doc_{len(uploaded_documents) + 1}"
-        uploaded_documents[doc_id] = {
-            'filename': filename,
-            'text': text,
-            'word_count': word_count,
-            'analysis_result': analysis_payload,
-            'metadata': text_metadata
-        }
-        logging.info(f"Stored document {doc_id} with {word_count} words")
+        except ValueError as validation_error:
+            return jsonify({'error': str(validation_error)}), 400
+        if response_payload is None:
+            return jsonify({'error': 'Library document not found'}), 404
+        return jsonify(response_payload)
+
+    except Exception as e:
+        logging.error(f"Library analysis failed: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
 
-        response_payload = dict(analysis_payload)
-        response_payload.update({
-            'image': img_data_url,
-            'document_id': doc_id,
-            'pageMap': (text_metadata or {}).get('pages', []),
-            'pageSelection': (text_metadata or {}).get('page_selection')
-        })
 
-        return jsonify(response_payload)
+def _parse_key_list(raw_value):
+    if isinstance(raw_value, list):
+        return [str(value).strip() for value in raw_value if str(value).strip()]
+    raw_value = str(raw_value or '').strip()
+    if raw_value.startswith('['):
+        try:
+            return _parse_key_list(json.loads(raw_value))
+        except ValueError:
+            pass
+    return [value.strip() for value in raw_value.split(',') if value.strip()]
+
+
+@app.route('/analyze-batch', methods=['POST'])
+def analyze_batch():
+    """
+    Analyze many documents concurrently and stream results as NDJSON.
+
+    Accepts multipart ``files`` and/or ``libraryKeys`` (keys from /library, as a
+    JSON list or comma-separated), plus the /analyze ``buzzwords`` and
+    ``wordBudgetMode`` fields. One line is emitted per finished document,
+    followed by a corpus summary line.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        raw_keywords = data.get('buzzwords', request.form.get('buzzwords', ''))
+        user_keywords = [w.strip() for w in str(raw_keywords).split(',') if w.strip()]
+        word_budget_mode = data.get('wordBudgetMode', request.form.get('wordBudgetMode', ''))
+        disable_limits = str(word_budget_mode).strip().lower() == 'disabled'
+
+        uploads = [file for file in request.files.getlist('files') + request.files.getlist('file') if file.filename]
+        library_keys = _parse_key_list(data.get('libraryKeys', request.form.get('libraryKeys', '')))
+
+        if not uploads and not library_keys:
+            return jsonify({'error': 'No files or library keys provided'}), 400
+        if BATCH_MAX_DOCUMENTS and len(uploads) + len(library_keys) > BATCH_MAX_DOCUMENTS:
+            return jsonify({'error': f'A batch may contain at most {BATCH_MAX_DOCUMENTS} documents'}), 400
+
+        unsupported = [file.filename for file in uploads if not allowed_file(file.filename.lower())]
+        unsupported += [key for key in library_keys if not is_library_pdf(key)]
+        if unsupported:
+            return jsonify({'error': 'Unsupported file type', 'documents': unsupported}), 400
+        if library_keys and get_missing_library_env():
+            return jsonify({'error': 'Library storage is not configured.'}), 400
+
+        items = [
+            {'filename': file.filename.lower(), 'spool_path': spool_upload(file.filename, file)}
+            for file in uploads
+        ]
+        items += [{'library_key': key} for key in library_keys]
+        logging.info("Batch analysis of %s documents", len(items))
+
+        return Response(
+            stream_with_context(iter_batch_results(items, user_keywords, disable_limits=disable_limits)),
+            mimetype='application/x-ndjson'
+        )
 
     except Exception as e:
-        logging.error(f"Analysis failed: {e}")
+        logging.error(f"Batch analysis failed: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll a background analysis job started via /analyze with async=true."""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job), 200
+
+
+@app.route('/wordcloud/<key>.png', methods=['GET'])
+def wordcloud_image(key):
+    """Serve a cached word cloud, rendering it now if the background job has not finished."""
+    try:
+        image_path = get_wordcloud_image_path(key)
+    except Exception as render_error:
+        logging.error(f"Word cloud rendering failed: {render_error}")
+        return jsonify({'error': 'Failed to render word cloud'}), 500
+    if not image_path:
+        return jsonify({'error': 'Unknown word cloud'}), 404
+    response = send_file(image_path, mimetype='image/png', max_age=86400)
+    response.headers['Cache-Control'] = 'public, max-age=86400, immutable'
+    return response
+
+
 @app.route('/search', methods=['POST'])
 def search():
     """
@@ -227,46 +341,41 @@ def search():
         kwic_results = []
         
         try:
-            if uploaded_documents:
-                logging.info(f"Searching within {len(uploaded_documents)} uploaded documents")
+            if document_store.count():
                 keywords_list = [k.strip().lower() for k in keywords.split(',') if k.strip()]
                 if not keywords_list:
                     keywords_list = [keywords.lower()]
-                
-                for doc_id, doc_data in uploaded_documents.items():
+
+                # Posting-list lookups replace the per-request scan over every stored document.
+                hits_by_keyword = {keyword: search_keyword(document_store, keyword) for keyword in keywords_list}
+                matched_doc_ids = sorted(
+                    {doc_id for hits in hits_by_keyword.values() for doc_id in hits},
+                    key=parse_document_id
+                )
+                logging.info(f"Index matched {len(matched_doc_ids)} uploaded documents")
+
+                for doc_id in matched_doc_ids:
                     try:
-                        text = doc_data.get('text', '')
-                        stored_word_count = doc_data.get('word_count')
-                        if stored_word_count is None:
-                            words_list = doc_data.get('words', [])
-                            stored_word_count = len(words_list) if isinstance(words_list, list) else 0
-
-                        if not text or stored_word_count == 0:
-                            logging.warning(f"Document {doc_id} has no text or words")
-                            continue
-                        
-                        # Find sentences containing keywords
-                        sentences = re.split(r'(?<=[.!?])\s+', text)
-                        
+                        page_lookup = None
                         for keyword in keywords_list:
-                            # Find matches in text
-                            matches = []
-                            for sentence in sentences:
-                                if sentence and keyword in sentence.lower():
-                                    matches.append(sentence.strip())
-                            
-                            if matches:
-                                search_results.extend(matches[:3])  # Limit to 3 per keyword
-                                
-                                # Create KWIC results - simplified version
-                                kwic_results.append({
-                                    'keyword': keyword,
-                                    'context': f"Found '{keyword}' in document {doc_id}"
-                                })
-                                
-                                if len(kwic_results) >= 5:  # Limit KWIC results
-                                    break
-                            
+                            hits = hits_by_keyword[keyword].get(doc_id)
+                            if not hits:
+                                continue
+
+                            search_results.extend(sentence for _, _, sentence in hits[:3])  # Limit to 3 per keyword
+
+                            if page_lookup is None:
+                                page_lookup = PageIndex.from_metadata(document_store.get_metadata(doc_id))
+                            kwic_results.append({
+                                'keyword': keyword,
+                                'context': f"Found '{keyword}' in document {doc_id}",
+                                'document_id': doc_id,
+                                'page': page_lookup.page_for_offset(hits[0][1])
+                            })
+
+                            if len(kwic_results) >= 5:  # Limit KWIC results
+                                break
+
                             if len(search_results) >= 10:  # Limit total results
                                 break
                     except Exception as doc_error:
@@ -289,22 +398,21 @@ def search():
             'blockchain': ['Blockchain in logistics', 'Container tracking with blockchain', 'Decentralized supply chains'],
             'analytics': ['Big data in logistics', 'Predictive analytics for containers', 'Data-driven port operations']
         }
-        
-        # Generate contextual results based on keywords
-        search_results = []
-        kwic_results = []
-        
-        keywords_lower = keywords.lower()
-        for category, examples in containerlogistics_terms.items():
-            if category in keywords_lower or any(word in keywords_lower for word in category.split()):
-                search_results.extend(examples)
-                # Create KWIC-style results
-                for example in examples[:2]:  # Limit to 2 per category
-                    kwic_results.append({
-                        'keyword': category,
-                        'context': f"...in the context of {example.lower()}, recent developments show..."
-                    })
-        
+
+            # Generate contextual results based on keywords
+            kwic_results = []
+
+            keywords_lower = keywords.lower()
+            for category, examples in containerlogistics_terms.items():
+                if category in keywords_lower or any(word in keywords_lower for word in category.split()):
+                    search_results.extend(examples)
+                    # Create KWIC-style results
+                    for example in examples[:2]:  # Limit to 2 per category
+                        kwic_results.append({
+                            'keyword': category,
+                            'context': f"...in the context of {example.lower()}, recent developments show..."
+                        })
+
             # If no specific matches from containerlogistics terms, provide general results
             if not search_results:
                 search_results = [
@@ -434,16 +542,15 @@ if __name__ == '__main__':
 
 @app.route('/library', methods=['GET'])
 def library():
+    """
+    List library PDFs from a per-worker cache.
+
+    Optional ``offset``/``limit`` query parameters page through the sorted
+    listing (without them every item is returned). Responses carry an ETag, and
+    a matching If-None-Match yields 304.
+    """
     try:
-        required_env = [
-            "OCI_BUCKET",
-            "PAR_BASE_URL",
-            "OCI_REGION",
-            "OCI_NAMESPACE",
-            "OCI_S3_ACCESS_KEY",
-            "OCI_S3_SECRET_KEY"
-        ]
-        missing = [var for var in required_env if not os.environ.get(var)]
+        missing = get_missing_library_env()
         if missing:
             logging.warning("Library requested but missing environment variables: %s", missing)
             return jsonify({
@@ -451,42 +558,37 @@ def library():
                 "warning": "Library storage is not configured."
             })
 
-        bucket = os.environ["OCI_BUCKET"]
-        par_base = os.environ["PAR_BASE_URL"].rstrip('/')
         prefix = request.args.get('prefix', '')  # optional: folder/prefix
-        s3 = get_s3_client()
-
-        objects = []
-        kwargs = {
-            "Bucket": bucket,
-            "Prefix": prefix
-        }
-
-        while True:
-            resp = s3.list_objects_v2(**kwargs)
-            for item in resp.get("Contents", []):
-                key = item["Key"]
-                if not key.lower().endswith(".pdf"):
-                    continue
-                # Build URL via bucket PAR
-                url = f"{par_base}/{quote(key)}"
-                objects.append({
-                    "key": key,
-                    "name": key.split('/')[-1],
-                    "size": item.get("Size", 0),
-                    "last_modified": item.get("LastModified").isoformat() if item.get("LastModified") else None,
-                    "url": url
-                })
-
-            if resp.get("IsTruncated"):
-                kwargs["ContinuationToken"] = resp.get("NextContinuationToken")
-            else:
-                break
-
-        # Optionally sort by name (or last_modified)
-        objects.sort(key=lambda x: x["name"].lower())
+        try:
+            offset = max(0, int(request.args.get('offset', 0)))
+            limit = request.args.get('limit')
+            limit = max(1, int(limit)) if limit not in (None, '') else None
+        except ValueError:
+            return jsonify({"error": "offset and limit must be integers"}), 400
+
+        listing = get_library_listing(prefix)
+        etag = f"{listing['etag']}-{offset}-{limit if limit is not None else 'all'}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        objects = listing['items']
+        page = objects[offset:offset + limit] if limit is not None else objects[offset:]
+        payload = {"items": page}
+        if limit is not None or offset:
+            next_offset = offset + len(page)
+            payload.update({
+                "total": len(objects),
+                "offset": offset,
+                "limit": limit,
+                "next_offset": next_offset if next_offset < len(objects) else None
+            })
 
-        return jsonify({"items": objects})
+        response = jsonify(payload)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         logging.exception("Failed to list bucket contents")
         return jsonify({"error": "Failed to list library"}), 500
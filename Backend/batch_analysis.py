@@ -0,0 +1,206 @@
+"""Concurrent analysis of many documents for /analyze-batch."""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    from .analysis_pipeline import analyze_library_object, run_analysis
+    from .constants import BATCH_ANALYSIS_WORKERS, JOB_SPOOL_DIR
+    from .trend_analysis import TREND_STATUS_ORDER, build_trend_summary
+except ImportError:
+    from analysis_pipeline import analyze_library_object, run_analysis
+    from constants import BATCH_ANALYSIS_WORKERS, JOB_SPOOL_DIR
+    from trend_analysis import TREND_STATUS_ORDER, build_trend_summary
+
+
+_executor_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+
+
+def _get_executor():
+    # One pool per gunicorn worker; a forked child must not reuse its parent's pool.
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(max_workers=BATCH_ANALYSIS_WORKERS or 1)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _discard_executor(executor):
+    # A pool whose child died (e.g. OOM-killed) rejects all further work; the next batch builds a new one.
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _remove_spool(item):
+    if item.get('spool_path'):
+        try:
+            os.remove(item['spool_path'])
+        except OSError:
+            pass
+
+
+def spool_upload(filename, file_stream):
+    """Write an upload to the spool directory so pool workers read it from disk."""
+    os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+    spool_path = os.path.join(JOB_SPOOL_DIR, f"batch-{uuid.uuid4().hex}{os.path.splitext(filename)[1].lower()}")
+    with open(spool_path, 'wb') as spool_file:
+        while True:
+            chunk = file_stream.read(1024 * 1024)
+            if not chunk:
+                break
+            spool_file.write(chunk)
+    return spool_path
+
+
+def _item_result(item):
+    library_key = item.get('library_key')
+    result = {'filename': item.get('filename') or (library_key or '').split('/')[-1]}
+    if library_key:
+        result['library_key'] = library_key
+    return result
+
+
+def build_failed_item_result(item, error):
+    result = _item_result(item)
+    result.update({'status': 'failed', 'error': error})
+    return result
+
+
+def analyze_batch_item(item, user_keywords, disable_limits=False):
+    """
+    Process-pool entry point for one document.
+
+    ``item`` is {'filename': ..., 'spool_path': ...} for uploads or
+    {'library_key': ...} for objects in the library bucket. Errors are returned
+    in the result so one bad document does not abort the batch.
+    """
+    result = _item_result(item)
+    try:
+        if item.get('library_key'):
+            payload = analyze_library_object(item['library_key'], user_keywords, disable_limits=disable_limits)
+            if payload is None:
+                raise ValueError('Library object not found')
+        else:
+            with open(item['spool_path'], 'rb') as file_stream:
+                payload = run_analysis(
+                    result['filename'],
+                    file_stream,
+                    user_keywords,
+                    disable_limits=disable_limits
+                )
+    except ValueError as validation_error:
+        return build_failed_item_result(item, str(validation_error))
+    except Exception:
+        logging.exception("Batch analysis failed for %s", result['filename'])
+        return build_failed_item_result(item, 'Internal server error')
+    finally:
+        _remove_spool(item)
+    result.update({'result': payload, 'status': 'done'})
+    return result
+
+
+class CorpusAggregate:
+    """Corpus-level keyword frequencies and trend status counts across a batch."""
+
+    def __init__(self):
+        self.documents = 0
+        self.failed = 0
+        self.total_words = 0
+        self.frequencies = {}
+        self.trends = {}
+
+    def add(self, item_result):
+        payload = item_result.get('result')
+        if item_result.get('status') != 'done' or not payload:
+            self.failed += 1
+            return
+        self.documents += 1
+        word_budget = (payload.get('processingSummary') or {}).get('wordBudget') or {}
+        self.total_words += word_budget.get('processedWords') or 0
+        for label, count in (payload.get('frequencies') or {}).items():
+            self.frequencies[label] = self.frequencies.get(label, 0) + count
+        for trend_entry in payload.get('trends') or []:
+            aggregate = self.trends.setdefault(trend_entry['trend'], {
+                'count': 0,
+                'documents': 0,
+                'status_counts': {status: 0 for status in TREND_STATUS_ORDER}
+            })
+            aggregate['count'] += trend_entry.get('count', 0)
+            aggregate['documents'] += 1
+            for status, count in (trend_entry.get('status_counts') or {}).items():
+                aggregate['status_counts'][status] = aggregate['status_counts'].get(status, 0) + count
+
+    def results(self):
+        trends = [
+            {
+                'trend': trend,
+                'count': aggregate['count'],
+                'documents': aggregate['documents'],
+                'status_counts': aggregate['status_counts'],
+                'summary': build_trend_summary(trend, aggregate['status_counts'])
+            }
+            for trend, aggregate in sorted(self.trends.items(), key=lambda entry: -entry[1]['count'])
+        ]
+        return {
+            'documents': self.documents,
+            'failed': self.failed,
+            'totalWords': self.total_words,
+            'frequencies': self.frequencies,
+            'trends': trends
+        }
+
+
+def iter_batch_results(items, user_keywords, disable_limits=False):
+    """
+    Fan the items out over the process pool and yield NDJSON lines as documents finish.
+
+    Each document produces a {"type": "document", ...} line; the last line is
+    {"type": "summary", "corpus": ...} with the aggregate over successful documents.
+    """
+    executor = _get_executor()
+    try:
+        futures = {
+            executor.submit(analyze_batch_item, item, user_keywords, disable_limits): item
+            for item in items
+        }
+    except BrokenProcessPool:
+        # Broken by an earlier batch before this worker noticed; retry once on a fresh pool.
+        _discard_executor(executor)
+        executor = _get_executor()
+        futures = {
+            executor.submit(analyze_batch_item, item, user_keywords, disable_limits): item
+            for item in items
+        }
+    aggregate = CorpusAggregate()
+    try:
+        for index, future in enumerate(as_completed(futures), start=1):
+            try:
+                item_result = future.result()
+            except Exception as pool_error:
+                item = futures[future]
+                logging.error("Batch worker failed for %s: %s", item.get('filename') or item.get('library_key'), pool_error)
+                if isinstance(pool_error, BrokenProcessPool):
+                    _discard_executor(executor)
+                _remove_spool(item)
+                item_result = build_failed_item_result(item, 'Analysis worker stopped unexpectedly')
+            aggregate.add(item_result)
+            line = {'type': 'document', 'completed': index, 'total': len(futures)}
+            line.update(item_result)
+            yield json.dumps(line) + "\n"
+    finally:
+        # A disconnected client should not leave queued documents or spooled uploads behind.
+        for future, item in futures.items():
+            if future.cancel():
+                _remove_spool(item)
+    yield json.dumps({'type': 'summary', 'corpus': aggregate.results()}) + "\n"
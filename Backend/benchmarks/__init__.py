@@ -0,0 +1 @@
+"""Micro- and pipeline benchmarks for the analysis backend (run with ``python -m benchmarks.<name>``)."""
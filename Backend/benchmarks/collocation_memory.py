@@ -0,0 +1,148 @@
+"""Compare peak RSS of the collocation stage: whole-document token_index vs keyword-driven lookup."""
+
+import argparse
+import hashlib
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+
+try:
+    from ..analysis_service import (
+        build_keyword_specs,
+        compute_collocations,
+        expand_word_tokens,
+        prepare_text_for_analysis,
+        tokenize_lower_text,
+    )
+except ImportError:
+    from analysis_service import (
+        build_keyword_specs,
+        compute_collocations,
+        expand_word_tokens,
+        prepare_text_for_analysis,
+        tokenize_lower_text,
+    )
+
+
+VARIANTS = ('legacy', 'keyword')
+KEYWORDS = ["cloud", "robotics", "data", "platform", "machine learning"]
+
+
+def build_document(word_count, vocabulary_size, seed):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(vocabulary_size)]
+    vocabulary += [f"{a}-{b}" for a, b in zip(vocabulary[:500], vocabulary[500:1000])]
+    vocabulary += ["cloud", "robotics", "data", "platform", "cloud/edge", "data-driven"]
+    words = rng.choices(vocabulary, k=word_count)
+    for idx in range(0, word_count, 17):
+        words[idx] += "."
+    return " ".join(words)
+
+
+def legacy_collocations(text, keyword_specs):
+    """Reference implementation: a position list for every word and sub-part in the document."""
+    words = tokenize_lower_text(text.lower())
+    token_index = {}
+    for idx, word in enumerate(words):
+        for token in expand_word_tokens(word):
+            if token:
+                token_index.setdefault(token, []).append(idx)
+
+    collocations = {}
+    for spec in keyword_specs:
+        label = spec['label']
+        if len(spec['tokens']) == 1:
+            left_neighbors, right_neighbors = [], []
+            for i in token_index.get(spec['tokens'][0], []):
+                if i > 0:
+                    left_neighbors.append(words[i - 1])
+                if i < len(words) - 1:
+                    right_neighbors.append(words[i + 1])
+            collocations[label] = {
+                "left": Counter(left_neighbors).most_common(3),
+                "right": Counter(right_neighbors).most_common(3)
+            }
+        else:
+            collocations[label] = {"left": [], "right": []}
+    return collocations
+
+
+def keyword_collocations(text, keyword_specs):
+    _, _, tokens, _ = prepare_text_for_analysis(text, None, None)
+    return compute_collocations(tokens, keyword_specs)
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_variant(variant, args):
+    text = build_document(args.words, args.vocabulary, args.seed)
+    keyword_specs = build_keyword_specs(KEYWORDS)
+    baseline = peak_rss_bytes()
+    started = time.perf_counter()
+    if variant == 'legacy':
+        collocations = legacy_collocations(text, keyword_specs)
+    else:
+        collocations = keyword_collocations(text, keyword_specs)
+    elapsed = time.perf_counter() - started
+    digest = hashlib.sha256(json.dumps(collocations, sort_keys=True).encode('utf-8')).hexdigest()
+    return {
+        'variant': variant,
+        'seconds': round(elapsed, 3),
+        'baseline_rss_mb': round(baseline / 2**20, 1),
+        'peak_rss_mb': round(peak_rss_bytes() / 2**20, 1),
+        'collocations_sha256': digest
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=1_000_000)
+    parser.add_argument('--vocabulary', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=5)
+    parser.add_argument('--variant', choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args)))
+        return
+
+    # Peak RSS never decreases within a process, so each variant runs in a fresh interpreter.
+    results = []
+    for variant in VARIANTS:
+        completed = subprocess.run(
+            [
+                sys.executable, '-m', __spec__.name,
+                '--variant', variant,
+                '--words', str(args.words),
+                '--vocabulary', str(args.vocabulary),
+                '--seed', str(args.seed)
+            ],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    legacy, keyword = results
+    if legacy['collocations_sha256'] != keyword['collocations_sha256']:
+        raise SystemExit("Collocation output differs between the legacy and keyword-driven paths")
+
+    print(f"words={args.words} vocabulary={args.vocabulary}")
+    for result in results:
+        growth = result['peak_rss_mb'] - result['baseline_rss_mb']
+        print(
+            f"{result['variant']:<8}: {result['seconds']:6.2f}s  "
+            f"peak RSS {result['peak_rss_mb']:8.1f} MB (+{growth:.1f} MB over the input text)"
+        )
+
+
+if __name__ == '__main__':
+    main()
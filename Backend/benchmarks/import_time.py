@@ -0,0 +1,82 @@
+"""Measure cold-start import time of the Flask app in fresh interpreters."""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure_once(module, warm_up):
+    statement = f"import {module}"
+    if warm_up:
+        statement = f"import lazy_imports; lazy_imports.warm_up(); {statement}"
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        last_line = (completed.stderr.strip().splitlines() or ["unknown error"])[-1]
+        raise RuntimeError(f"'{statement}' failed: {last_line}")
+
+    top_level = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) <= 1:
+            top_level[match.group(4)] = int(match.group(2))
+    return elapsed, top_level
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--warm-up', action='store_true', help='also preload lazy_imports.HEAVY_MODULES')
+    parser.add_argument('--output', help='write JSON results to this path (for CI tracking)')
+    args = parser.parse_args()
+
+    wall_times = []
+    cumulative = {}
+    for _ in range(args.runs):
+        elapsed, top_level = measure_once(args.module, args.warm_up)
+        wall_times.append(elapsed)
+        for name, micros in top_level.items():
+            cumulative.setdefault(name, []).append(micros)
+
+    slowest = sorted(
+        ((name, statistics.median(values) / 1_000_000) for name, values in cumulative.items()),
+        key=lambda item: item[1],
+        reverse=True
+    )[:15]
+    result = {
+        'module': args.module,
+        'warm_up': args.warm_up,
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'wall_seconds': {
+            'median': round(statistics.median(wall_times), 4),
+            'min': round(min(wall_times), 4),
+            'max': round(max(wall_times), 4)
+        },
+        'slowest_imports_seconds': {name: round(seconds, 4) for name, seconds in slowest}
+    }
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(result, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Compare in-place chunked keyword scanning with slicing chunks: legacy duplicates, time and memory."""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+try:
+    from ..analysis_service import build_combined_keyword_regex, build_keyword_specs, iter_pattern_matches
+except ImportError:
+    from analysis_service import build_combined_keyword_regex, build_keyword_specs, iter_pattern_matches
+
+
+KEYWORDS = ["cloud computing", "AI", "machine-learning", "digital twin", "robotics", "data"]
+FILLER = (
+    "the port operator reported steady volumes and invested in new cranes while the "
+    "terminal expanded its yard capacity and renegotiated contracts with shipping lines"
+).split()
+VARIANTS = ["cloud computing", "Cloud  Computing", "cloud-computing", "ai", "AI.", "xai", "aix",
+            "machine learning", "machine_learning", "digital twin", "digital-twins", "robotics", "data/driven"]
+CHUNK_SIZES = (40, 64, 97, 128, 333, 1024, 4096)
+OVERLAP = 32
+
+
+def legacy_iter_pattern_matches(pattern, text, chunk_size, overlap):
+    """Previous implementation: sliced chunks, matches inside the overlap reported twice."""
+    start = 0
+    text_length = len(text)
+    while start < text_length:
+        end = min(text_length, start + chunk_size)
+        chunk = text[start:end]
+        for match in pattern.finditer(chunk):
+            yield start + match.start(), start + match.end(), match.lastgroup
+        if end >= text_length:
+            break
+        start = max(0, end - overlap)
+
+
+def build_corpus(words, seed):
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(VARIANTS) if rng.random() < 0.08 else rng.choice(FILLER))
+        parts.append(rng.choice([" ", " ", " ", "\n", ", ", ". "]))
+    return "".join(parts).lower()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--words', type=int, default=400, help='words per test document')
+    parser.add_argument('--large-words', type=int, default=2_000_000, help='words in the timing document')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    pattern, _ = build_combined_keyword_regex(build_keyword_specs(KEYWORDS))
+
+    # Equivalence of iter_pattern_matches with an unchunked scan is covered by tests/test_keyword_scan.py.
+    checked = 0
+    legacy_mismatches = 0
+    for document_index in range(args.documents):
+        text = build_corpus(args.words, args.seed + document_index)
+        expected = [(m.start(), m.end(), m.lastgroup) for m in pattern.finditer(text)]
+        for chunk_size in CHUNK_SIZES:
+            legacy = list(legacy_iter_pattern_matches(pattern, text, chunk_size, OVERLAP))
+            legacy_mismatches += legacy != expected
+            checked += 1
+    print(f"sliced-chunk implementation differed from an unchunked scan in {legacy_mismatches} "
+          f"of {checked} document/chunk-size combinations")
+
+    text = build_corpus(args.large_words, args.seed)
+    print(f"timing document: {len(text):,} characters")
+    for label, scan in (
+        ("sliced chunks", lambda: legacy_iter_pattern_matches(pattern, text, 250_000, 1_000)),
+        ("in-place finditer", lambda: iter_pattern_matches(pattern, text, chunk_size=250_000, overlap=1_000)),
+    ):
+        started = time.perf_counter()
+        matches = sum(1 for _ in scan())
+        elapsed = time.perf_counter() - started
+        # Timed and traced separately: tracemalloc slows allocation-heavy loops unevenly.
+        tracemalloc.start()
+        sum(1 for _ in scan())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<18}: {elapsed:6.2f}s  matches={matches:,}  peak extra memory={peak / 2**20:6.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Compare the legacy linear page lookup against the bisect-based PageIndex."""
+
+import argparse
+import random
+import timeit
+
+try:
+    from ..page_index import PageIndex
+except ImportError:
+    from page_index import PageIndex
+
+
+def linear_page_for_offset(page_map, offset):
+    """Reference implementation previously inlined in analyze_document."""
+    if not page_map:
+        return None
+    for page in page_map:
+        start = page.get('start', 0)
+        end = page.get('end', start)
+        if start <= offset < end:
+            return page.get('number')
+    return page_map[-1].get('number')
+
+
+def build_page_map(page_count, chars_per_page):
+    pages = []
+    offset = 0
+    for number in range(1, page_count + 1):
+        length = random.randint(chars_per_page // 2, chars_per_page * 2)
+        if number % 17 == 0:
+            length = 0  # blank pages occur in scanned reports
+        pages.append({'number': number, 'start': offset, 'end': offset + length})
+        offset += length + 1
+    return pages, offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--chars-per-page', type=int, default=3000)
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    page_map, text_length = build_page_map(args.pages, args.chars_per_page)
+    offsets = [random.randrange(text_length + 10) for _ in range(args.lookups)]
+    index = PageIndex(page_map)
+
+    mismatches = sum(
+        1 for offset in offsets
+        if linear_page_for_offset(page_map, offset) != index.page_for_offset(offset)
+    )
+    if mismatches:
+        raise SystemExit(f"PageIndex disagrees with the linear lookup for {mismatches} offsets")
+
+    linear = min(timeit.repeat(
+        lambda: [linear_page_for_offset(page_map, offset) for offset in offsets],
+        number=1,
+        repeat=3
+    ))
+    build = min(timeit.repeat(lambda: PageIndex(page_map), number=1, repeat=3))
+    bisect = min(timeit.repeat(
+        lambda: [index.page_for_offset(offset) for offset in offsets],
+        number=1,
+        repeat=3
+    ))
+
+    print(f"pages={args.pages} lookups={args.lookups}")
+    print(f"linear scan : {linear * 1000:9.2f} ms")
+    print(f"bisect index: {bisect * 1000:9.2f} ms (+{build * 1000:.2f} ms build)")
+    print(f"speedup     : {linear / max(bisect + build, 1e-9):9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+"""Time extraction and analysis stages over a synthetic PDF/DOCX/TXT corpus and track results across commits.
+
+Each case is generated deterministically from --seed, so two runs on different
+commits see the same bytes. Per stage, the median wall time over --repeat runs
+and the tracemalloc peak of one separate traced run are recorded, together
+with a SHA-256 of the analysis payload. ``--compare baseline.json`` prints
+the speed-up per stage and fails when any payload hash differs from the
+baseline.
+
+    cd Backend
+    python -m benchmarks.pipeline --output before.json       # on the old commit
+    python -m benchmarks.pipeline --compare before.json      # on the new commit
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import zipfile
+from xml.sax.saxutils import escape
+
+try:
+    from ..analysis_service import analyze_document, analyze_prepared_document, prepare_document
+    from ..constants import MAX_PDF_PAGES, PDF_OPTIMIZE_THRESHOLD_BYTES, get_max_words_analysis
+    from ..document_processing import (
+        extract_document,
+        extract_text_pdf_bytes,
+        extract_text_pypdf2,
+        optimize_pdf_bytes,
+    )
+except ImportError:
+    from analysis_service import analyze_document, analyze_prepared_document, prepare_document
+    from constants import MAX_PDF_PAGES, PDF_OPTIMIZE_THRESHOLD_BYTES, get_max_words_analysis
+    from document_processing import (
+        extract_document,
+        extract_text_pdf_bytes,
+        extract_text_pypdf2,
+        optimize_pdf_bytes,
+    )
+
+
+FORMATS = ('pdf', 'docx', 'txt')
+DENSITIES = {'sparse': 0.002, 'dense': 0.03}
+KEYWORDS = ["Cloud Computing", "Artificial Intelligence", "Blockchain", "Digital Twin", "Robotics", "IoT"]
+SIGNALS = ["we use", "is deployed", "is evaluating", "pilots", "no longer", "stopped", "plans"]
+FILLER = (
+    "the port operator reported steady volumes and invested in new cranes while the terminal "
+    "expanded its yard capacity and renegotiated contracts with shipping lines across the region "
+    "revenue increased slightly although energy costs and labour shortages weighed on margins"
+).split()
+WORDS_PER_LINE = 12
+LINES_PER_PAGE = 45
+IMAGE_SIDE = 600  # 600x600 RGB, about 1 MB of uncompressed samples per page
+
+
+def build_page_texts(page_count, density, seed):
+    """Deterministic page texts with keywords (and trend status phrases) at the given rate."""
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(page_count):
+        lines = []
+        for _ in range(LINES_PER_PAGE):
+            words = []
+            while len(words) < WORDS_PER_LINE:
+                if rng.random() < density:
+                    words.extend(f"{rng.choice(SIGNALS)} {rng.choice(KEYWORDS)}".split())
+                else:
+                    words.append(rng.choice(FILLER))
+            line = " ".join(words[:WORDS_PER_LINE])
+            lines.append(line + ("." if rng.random() < 0.3 else ""))
+        pages.append(lines)
+    return pages
+
+
+def _pdf_literal(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(pages, image_seed=None):
+    """
+    Minimal uncompressed PDF with one Helvetica text stream per page.
+
+    With image_seed, every page also draws its own incompressible RGB image so
+    the file exceeds PDF_OPTIMIZE_THRESHOLD_BYTES, the size at which
+    optimize_pdf_bytes rewrites it before a pdfminer fallback.
+    """
+    rng = random.Random(image_seed)
+    objects = []  # index + 1 is the object number
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    page_tree = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_refs = []
+    for lines in pages:
+        operations = ["BT /F1 10 Tf 12 TL 40 800 Td"]
+        operations.extend(f"({_pdf_literal(line)}) '" for line in lines)
+        operations.append("ET")
+        resources = f"/Font << /F1 {font} 0 R >>"
+        if image_seed is not None:
+            samples = rng.randbytes(IMAGE_SIDE * IMAGE_SIDE * 3)
+            image = add(
+                f"<< /Type /XObject /Subtype /Image /Width {IMAGE_SIDE} /Height {IMAGE_SIDE} "
+                f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Length {len(samples)} >>\nstream\n".encode('latin-1')
+                + samples + b"\nendstream"
+            )
+            resources += f" /XObject << /Im1 {image} 0 R >>"
+            operations.append("q 200 0 0 200 350 40 cm /Im1 Do Q")
+        content = "\n".join(operations).encode('latin-1', errors='replace')
+        content_ref = add(f"<< /Length {len(content)} >>\nstream\n".encode('latin-1') + content + b"\nendstream")
+        page_refs.append(add(
+            f"<< /Type /Page /Parent {page_tree} 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << {resources} >> /Contents {content_ref} 0 R >>".encode('latin-1')
+        ))
+
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {page_tree} 0 R >>".encode('latin-1')
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs)
+    objects[page_tree - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_refs)} >>".encode('latin-1')
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n".encode('latin-1') + body + b"\nendobj\n")
+    xref_offset = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1'))
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode('latin-1'))
+    output.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode('latin-1')
+    )
+    return output.getvalue()
+
+
+def build_docx(pages):
+    """Minimal WordprocessingML package: one paragraph per line, a page break between pages."""
+    paragraphs = []
+    for page_index, lines in enumerate(pages):
+        if page_index:
+            paragraphs.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        paragraphs.extend(f'<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>' for line in lines)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(paragraphs)}</w:body></w:document>'
+    )
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        package.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/>'
+            '</Relationships>'
+        ))
+        package.writestr('word/document.xml', document)
+    return output.getvalue()
+
+
+def build_txt(pages):
+    return "\n\f\n".join("\n".join(lines) for lines in pages).encode('utf-8')
+
+
+def build_cases(args):
+    cases = []
+    for file_format in args.formats:
+        for page_count in args.pages:
+            for density_name in args.densities:
+                cases.append({
+                    'name': f"{file_format}-{page_count}p-{density_name}",
+                    'format': file_format,
+                    'pages': page_count,
+                    'density': density_name,
+                    'images': False
+                })
+    if 'pdf' in args.formats and args.image_pages:
+        cases.append({
+            'name': f"pdf-{args.image_pages}p-images",
+            'format': 'pdf',
+            'pages': args.image_pages,
+            'density': 'sparse',
+            'images': True
+        })
+    return cases
+
+
+def generate_file(case, seed):
+    pages = build_page_texts(case['pages'], DENSITIES[case['density']], seed)
+    if case['format'] == 'pdf':
+        return build_pdf(pages, image_seed=seed if case['images'] else None)
+    if case['format'] == 'docx':
+        return build_docx(pages)
+    return build_txt(pages)
+
+
+def payload_digest(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def measure(stage, repeat):
+    """Median wall time over repeat runs, then tracemalloc peak of one extra run."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = stage()
+        timings.append(time.perf_counter() - started)
+    # Traced separately: tracemalloc slows allocation-heavy code unevenly.
+    tracemalloc.start()
+    try:
+        stage()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {
+        'seconds': round(statistics.median(timings), 4),
+        'min_seconds': round(min(timings), 4),
+        'peak_mb': round(peak / 2**20, 2)
+    }
+
+
+def extract(case, file_bytes):
+    if case['format'] == 'pdf':
+        # The chain behind extract_text_pdf, without the on-disk extraction cache.
+        return extract_text_pdf_bytes(file_bytes, MAX_PDF_PAGES)
+    return extract_document(f"benchmark.{case['format']}", io.BytesIO(file_bytes))
+
+
+def run_case(case, args):
+    file_bytes = generate_file(case, args.seed)
+    result = dict(case, bytes=len(file_bytes), stages={})
+    stages = result['stages']
+
+    if case['images']:
+        if len(file_bytes) < PDF_OPTIMIZE_THRESHOLD_BYTES:
+            result['note'] = 'below PDF_OPTIMIZE_THRESHOLD_BYTES; optimize_pdf_bytes returns the input'
+        optimized, stages['optimize_pdf'] = measure(lambda: optimize_pdf_bytes(file_bytes), args.repeat)
+        result['optimized_bytes'] = len(optimized)
+        # PyPDF2 reads these pages with their images skipped, whichever engine extract picks.
+        _, stages['extract_pypdf2'] = measure(lambda: extract_text_pypdf2(file_bytes, MAX_PDF_PAGES), args.repeat)
+
+    (text, metadata), stages['extract'] = measure(lambda: extract(case, file_bytes), args.repeat)
+    prepared, stages['prepare'] = measure(lambda: prepare_document(text, metadata), args.repeat)
+    (payload, _, total_words), stages['analyze'] = measure(
+        lambda: analyze_prepared_document(prepared, KEYWORDS, metadata, source_text=text),
+        args.repeat
+    )
+    (full_payload, _, _), stages['analyze_document'] = measure(
+        lambda: analyze_document(text, KEYWORDS, metadata),
+        args.repeat
+    )
+
+    result['characters'] = len(text)
+    result['words'] = total_words
+    result['payload_sha256'] = payload_digest(payload)
+    if payload_digest(full_payload) != result['payload_sha256']:
+        result['mismatch'] = 'analyze_document and prepare_document + analyze_prepared_document disagree'
+    return result
+
+
+def current_commit():
+    try:
+        completed = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)
+        return completed.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Print per-stage speed-ups against a baseline run; return the names of cases whose payload changed."""
+    baseline_cases = {case['name']: case for case in baseline.get('cases', [])}
+    changed = []
+    print(f"\ncompared with {baseline.get('commit') or 'baseline'}:")
+    for case in results['cases']:
+        previous = baseline_cases.get(case['name'])
+        if not previous or 'stages' not in previous or 'stages' not in case:
+            continue
+        ratios = []
+        for stage, timing in case['stages'].items():
+            old = previous['stages'].get(stage)
+            if old and timing['seconds']:
+                ratios.append(f"{stage} x{old['seconds'] / timing['seconds']:.2f}")
+        same = previous.get('payload_sha256') == case.get('payload_sha256')
+        if not same:
+            changed.append(case['name'])
+        print(f"  {case['name']:<22} {'payload identical' if same else 'PAYLOAD CHANGED':<17} {'  '.join(ratios)}")
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--pages', nargs='+', type=int, default=[10, 100, 1000])
+    parser.add_argument('--densities', nargs='+', choices=sorted(DENSITIES), default=sorted(DENSITIES))
+    parser.add_argument('--image-pages', type=int, default=10, help='pages in the image-heavy PDF (0 skips it)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=21)
+    parser.add_argument('--output', help='write JSON results to this path')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    # PyPDF2 warns for every image it cannot treat as a form; failures show up as skipped cases.
+    logging.disable(logging.ERROR)
+    # Load TextBlob and friends so the first case is not charged for imports.
+    analyze_document("Warm up the analysis pipeline.", KEYWORDS)
+
+    results = {
+        'commit': current_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'limits': {'max_pdf_pages': MAX_PDF_PAGES, 'max_words_analysis': get_max_words_analysis()},
+        'cases': []
+    }
+    for case in build_cases(args):
+        try:
+            result = run_case(case, args)
+        except ImportError as missing:
+            # e.g. python-docx not installed; keep the rest of the run comparable.
+            result = dict(case, skipped=str(missing))
+        results['cases'].append(result)
+        if 'skipped' in result:
+            print(f"{case['name']:<22} skipped: {result['skipped']}")
+            continue
+        timings = "  ".join(
+            f"{stage} {timing['seconds']:.3f}s/{timing['peak_mb']:.0f}MB"
+            for stage, timing in result['stages'].items()
+        )
+        print(f"{case['name']:<22} {result['bytes'] / 2**20:7.2f} MB  words={result['words']:<8,} {timings}")
+        if result.get('mismatch'):
+            print(f"  !! {result['mismatch']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+
+    failures = [case['name'] for case in results['cases'] if case.get('mismatch')]
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            failures += compare(results, json.load(handle))
+    if failures:
+        raise SystemExit(f"Analysis payload differs for: {', '.join(failures)}")
+
+
+if __name__ == '__main__':
+    main()
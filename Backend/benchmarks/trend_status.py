@@ -0,0 +1,77 @@
+"""Benchmark classify_trend_status against the previous per-pattern re.search loop."""
+
+import argparse
+import random
+import re
+import timeit
+
+try:
+    from ..constants import TREND_STATUS_PATTERNS
+    from ..trend_analysis import classify_trend_status, normalize_to_ascii
+except ImportError:
+    from constants import TREND_STATUS_PATTERNS
+    from trend_analysis import classify_trend_status, normalize_to_ascii
+
+
+FILLER = (
+    "the group reported revenue growth across all segments while container volumes "
+    "recovered in the second half and the board approved the dividend proposal"
+).split()
+SIGNALS = [
+    "we use", "is deployed", "has been implemented", "pilots", "is evaluating",
+    "plans", "no longer", "stopped", "wird eingesetzt", "prüft", "nicht mehr", "abgelöst",
+]
+TRENDS = ["artificial intelligence", "blockchain", "digital twin", "robotics", "cloud computing"]
+
+
+def legacy_classify_trend_status(sentence):
+    """Reference implementation prior to precompiling the status patterns."""
+    lowered = sentence.lower()
+    normalized = normalize_to_ascii(lowered)
+    candidates = {lowered, normalized}
+
+    for status, patterns in TREND_STATUS_PATTERNS.items():
+        for pattern in patterns:
+            for candidate in candidates:
+                if re.search(pattern, candidate):
+                    return status
+    return 'unspecified'
+
+
+def build_sentences(count, seed):
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(count):
+        words = rng.sample(FILLER, rng.randint(8, len(FILLER)))
+        words.insert(rng.randrange(len(words)), rng.choice(TRENDS))
+        if rng.random() < 0.6:
+            words.insert(rng.randrange(len(words)), rng.choice(SIGNALS))
+        sentences.append(" ".join(words).capitalize() + ".")
+    return sentences
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sentences', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    sentences = build_sentences(args.sentences, args.seed)
+    mismatches = [
+        sentence for sentence in sentences
+        if legacy_classify_trend_status(sentence) != classify_trend_status(sentence)
+    ]
+    if mismatches:
+        raise SystemExit(f"Classifier output changed for {len(mismatches)} sentences, e.g. {mismatches[0]!r}")
+
+    legacy = min(timeit.repeat(lambda: [legacy_classify_trend_status(s) for s in sentences], number=1, repeat=3))
+    compiled = min(timeit.repeat(lambda: [classify_trend_status(s) for s in sentences], number=1, repeat=3))
+
+    print(f"sentences={len(sentences)}")
+    print(f"per-pattern re.search: {len(sentences) / legacy:10.0f} sentences/s")
+    print(f"precompiled          : {len(sentences) / compiled:10.0f} sentences/s")
+    print(f"speedup              : {legacy / compiled:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
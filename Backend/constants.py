@@ -1,6 +1,7 @@
 """Shared constants for the backend analysis pipeline."""
 
 import os
+import tempfile
 
 
 def _get_int_env(name, default):
@@ -75,6 +76,49 @@ MAX_WORDS_ANALYSIS = get_max_words_analysis()
 PDF_OPTIMIZE_THRESHOLD_BYTES = 8 * 1024 * 1024  # 8 MB
 PDF_PDFMINER_MAX_BYTES = 4 * 1024 * 1024  # Don't send very large PDFs to pdfminer
 PDF_PDFMINER_MAX_PAGES = 80
+PDF_EXTRACTION_WORKERS = _get_int_env('PDF_EXTRACTION_WORKERS', None)  # None/1 keeps extraction sequential
+PDF_PARALLEL_MIN_PAGES = _get_int_env('PDF_PARALLEL_MIN_PAGES', 40)
+PDF_ENGINE_SELECTION = os.environ.get('PDF_ENGINE_SELECTION', 'adaptive').strip().lower()  # "adaptive" or "chain"
+PDF_ENGINE_PROBE_PAGES = _get_int_env('PDF_ENGINE_PROBE_PAGES', 2)
+PDF_ENGINE_CACHE_SIZE = _get_int_env('PDF_ENGINE_CACHE_SIZE', 512)  # Engine decisions kept per worker
+EXTRACTION_CACHE_DIR = os.environ.get('EXTRACTION_CACHE_DIR') or os.path.join(
+    tempfile.gettempdir(), 'trendalyze-extraction-cache'
+)
+EXTRACTION_CACHE_MAX_BYTES = _get_int_env('EXTRACTION_CACHE_MAX_BYTES', 256 * 1024 * 1024)  # None disables the cache
+WORDCLOUD_CACHE_DIR = os.environ.get('WORDCLOUD_CACHE_DIR') or os.path.join(
+    tempfile.gettempdir(), 'trendalyze-wordclouds'
+)
+WORDCLOUD_CACHE_MAX_BYTES = _get_int_env('WORDCLOUD_CACHE_MAX_BYTES', 64 * 1024 * 1024)  # None leaves it unbounded
+ASYNC_ANALYSIS_MIN_BYTES = _get_int_env('ASYNC_ANALYSIS_MIN_BYTES', 2 * 1024 * 1024)  # Smaller uploads stay synchronous
+ANALYSIS_JOB_WORKERS = _get_int_env('ANALYSIS_JOB_WORKERS', 1)
+JOB_STALE_SECONDS = _get_int_env('JOB_STALE_SECONDS', 900)
+JOB_QUEUE_PATH = os.environ.get('JOB_QUEUE_PATH') or os.path.join(
+    tempfile.gettempdir(), 'trendalyze-jobs.sqlite3'
+)
+JOB_SPOOL_DIR = os.environ.get('JOB_SPOOL_DIR') or os.path.join(
+    tempfile.gettempdir(), 'trendalyze-job-spool'
+)
+DOCUMENT_STORE_BACKEND = os.environ.get('DOCUMENT_STORE', 'sqlite')  # "sqlite" or "memory"
+DOCUMENT_STORE_PATH = os.environ.get('DOCUMENT_STORE_PATH') or os.path.join(
+    tempfile.gettempdir(), 'trendalyze-documents.sqlite3'
+)
+REANALYSIS_CACHE_SIZE = _get_int_env('REANALYSIS_CACHE_SIZE', 8)  # Tokenized documents kept per worker
+KEYWORD_SCAN_CHUNK_SIZE = _get_int_env('KEYWORD_SCAN_CHUNK_SIZE', 250_000)  # None/<=0 scans in one pass
+KEYWORD_SCAN_CHUNK_OVERLAP = _get_int_env('KEYWORD_SCAN_CHUNK_OVERLAP', 1_000)  # Must exceed the longest keyword match
+BATCH_ANALYSIS_WORKERS = _get_int_env('BATCH_ANALYSIS_WORKERS', 2)  # Per gunicorn worker; each is a full analyzer
+BATCH_MAX_DOCUMENTS = _get_int_env('BATCH_MAX_DOCUMENTS', 200)
+LIBRARY_RANGED_MIN_BYTES = _get_int_env('LIBRARY_RANGED_MIN_BYTES', 8 * 1024 * 1024)  # None disables ranged reads
+LIBRARY_RANGE_BLOCK_SIZE = _get_int_env('LIBRARY_RANGE_BLOCK_SIZE', 256 * 1024)
+LIBRARY_SPOOL_MAX_BYTES = 32 * 1024 * 1024  # Full downloads larger than this spill to a temp file
+LIBRARY_S3_MAX_POOL_CONNECTIONS = _get_int_env('LIBRARY_S3_MAX_POOL_CONNECTIONS', 10)
+LIBRARY_LISTING_TTL_SECONDS = _get_int_env('LIBRARY_LISTING_TTL_SECONDS', 60)  # None/<=0 disables the listing cache
+LIBRARY_LISTING_STALE_SECONDS = _get_int_env('LIBRARY_LISTING_STALE_SECONDS', 600)  # Serve stale while refreshing
+LIBRARY_LISTING_CACHE_SIZE = _get_int_env('LIBRARY_LISTING_CACHE_SIZE', 32)  # Prefixes cached per worker
+SENTIMENT_MODE = os.environ.get('SENTIMENT_MODE', 'pages').strip().lower()  # "pages" or "prefix", for texts over the limit
+SENTIMENT_SAMPLE_PAGES = _get_int_env('SENTIMENT_SAMPLE_PAGES', 12)
+SENTIMENT_TIME_BUDGET_SECONDS = _get_int_env('SENTIMENT_TIME_BUDGET_SECONDS', 5)  # None waits for every page
+SENTIMENT_WORKERS = _get_int_env('SENTIMENT_WORKERS', 2)
+SENTIMENT_MAX_SAMPLE_CHARS = _get_int_env('SENTIMENT_MAX_SAMPLE_CHARS', 4000)  # Bounds one TextBlob call
 
 DEFAULT_TREND_KEYWORDS = [
     "Artificial Intelligence",
@@ -1,44 +1,86 @@
 """Document ingestion and text extraction utilities."""
 
+from bisect import bisect_left
+from collections import OrderedDict
 import io
 import logging
+import multiprocessing
 import os
-
-from PyPDF2 import PdfReader, PdfWriter
-
-try:
-    from pdfminer.high_level import extract_text as pdfminer_extract_text
-except ImportError:  # pdfminer is optional but preferred for complex PDFs
-    pdfminer_extract_text = None
-
-try:
-    import fitz  # PyMuPDF
-except ImportError:
-    fitz = None
-
-from docx import Document
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 try:
     from .constants import (
         ALLOWED_EXTENSIONS,
+        JOB_SPOOL_DIR,
         MAX_PDF_PAGES,
+        PDF_ENGINE_CACHE_SIZE,
+        PDF_ENGINE_PROBE_PAGES,
+        PDF_ENGINE_SELECTION,
+        PDF_EXTRACTION_WORKERS,
+        PDF_PARALLEL_MIN_PAGES,
         PDF_OPTIMIZE_THRESHOLD_BYTES,
         PDF_PDFMINER_MAX_BYTES,
         PDF_PDFMINER_MAX_PAGES,
     )
     from .sampling_utils import select_evenly_spaced_indices
+    from . import extraction_cache
+    from .lazy_imports import import_module, import_optional
+    from .metrics import count_pdfminer_skip, observe_extraction
 except ImportError:
     from constants import (
         ALLOWED_EXTENSIONS,
+        JOB_SPOOL_DIR,
         MAX_PDF_PAGES,
+        PDF_ENGINE_CACHE_SIZE,
+        PDF_ENGINE_PROBE_PAGES,
+        PDF_ENGINE_SELECTION,
+        PDF_EXTRACTION_WORKERS,
+        PDF_PARALLEL_MIN_PAGES,
         PDF_OPTIMIZE_THRESHOLD_BYTES,
         PDF_PDFMINER_MAX_BYTES,
         PDF_PDFMINER_MAX_PAGES,
     )
     from sampling_utils import select_evenly_spaced_indices
+    import extraction_cache
+    from lazy_imports import import_module, import_optional
+    from metrics import count_pdfminer_skip, observe_extraction
 
 
 _PAGE_LIMIT_SENTINEL = object()
+_INHERITABLE_PAGE_ATTRIBUTES = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+_PROBE_WORD_PATTERN = re.compile(r"[^\W\d_]{2,}")
+_IMAGE_SUBTYPE_PATTERN = re.compile(rb"/Subtype\s*/Image\b")
+_FORM_SUBTYPE_PATTERN = re.compile(rb"/Subtype\s*/Form\b")
+OBJECT_HEADER_PEEK_BYTES = 1024  # Enough for an XObject dictionary up to its "stream" keyword
+PROBE_GOOD_WORDS_PER_PAGE = 40  # A probe yield this good stops slower engines from being probed
+PROBE_NEAR_BEST_RATIO = 0.8  # Engines within this share of the best word yield compete on speed
+
+_engine_choice_lock = threading.Lock()
+_engine_choices = OrderedDict()
+
+_executor_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+
+
+def load_fitz():
+    """Return the PyMuPDF module, or None when it is not installed."""
+    return import_optional("fitz")
+
+
+def load_pdfminer_extract_text():
+    """pdfminer is optional but preferred for complex PDFs."""
+    pdfminer_high_level = import_optional("pdfminer.high_level")
+    return pdfminer_high_level.extract_text if pdfminer_high_level else None
+
+
+def load_pypdf2():
+    return import_module("PyPDF2")
 
 
 def build_page_selection(total_pages, page_limit):
@@ -89,8 +131,9 @@ def optimize_pdf_bytes(file_bytes):
 
     try:
         pdf_io = io.BytesIO(file_bytes)
-        reader = PdfReader(pdf_io, strict=False)
-        writer = PdfWriter()
+        pypdf2 = load_pypdf2()
+        reader = pypdf2.PdfReader(pdf_io, strict=False)
+        writer = pypdf2.PdfWriter()
 
         images_removed = 0
         for page in reader.pages:
@@ -148,8 +191,254 @@ def optimize_pdf_bytes(file_bytes):
     return file_bytes
 
 
-def extract_text_pymupdf(file_bytes, reason_label="preferred", page_limit=None):
+def open_pypdf2_reader(file_bytes):
+    """Open a PyPDF2 reader over in-memory bytes, decrypting empty-password PDFs."""
+    return open_pypdf2_stream(io.BytesIO(file_bytes))
+
+
+def open_pypdf2_stream(stream):
+    """Open a PyPDF2 reader over any seekable binary stream, decrypting empty-password PDFs."""
+    reader = load_pypdf2().PdfReader(stream, strict=False)
+
+    if reader.is_encrypted:
+        try:
+            decrypt_result = reader.decrypt("")
+            if decrypt_result == 0:
+                decrypt_result = reader.decrypt(None)
+            if decrypt_result == 0:
+                logging.error("Encrypted PDF requires a password")
+                raise ValueError("PDF is encrypted and requires a password")
+            logging.info("Encrypted PDF decrypted with an empty password")
+        except Exception as decrypt_error:
+            logging.error(f"Failed to decrypt PDF: {decrypt_error}")
+            raise ValueError("Failed to decrypt encrypted PDF")
+
+    return reader
+
+
+def read_page_texts_pymupdf(doc, page_indices, progress_callback=None):
+    page_texts = []
+    for page_index in page_indices:
+        page_texts.append(doc.load_page(page_index).get_text("text") or "")
+        if progress_callback:
+            progress_callback(len(page_texts), len(page_indices))
+    return page_texts
+
+
+def peek_xobject_subtype(reader, reference):
+    """
+    Return "/Image", "/Form" or None for an indirect XObject without loading its stream.
+
+    Resolving an image through PyPDF2 reads its whole stream into memory just
+    to look at /Subtype. Stream objects are never stored in object streams, so
+    the dictionary can be read straight from the object's offset in the file.
+    """
+    offset = reader.xref.get(reference.generation, {}).get(reference.idnum)
+    stream = getattr(reader, "stream", None)
+    if offset is None or stream is None:
+        return None
+    position = stream.tell()
+    try:
+        stream.seek(offset)
+        header = stream.read(OBJECT_HEADER_PEEK_BYTES)
+    finally:
+        stream.seek(position)
+    header, found, _ = header.partition(b"stream")
+    if not found or not header.lstrip().startswith(b"%d %d obj" % (reference.idnum, reference.generation)):
+        return None
+    if _IMAGE_SUBTYPE_PATTERN.search(header):
+        return "/Image"
+    if _FORM_SUBTYPE_PATTERN.search(header):
+        return "/Form"
+    return None
+
+
+def skip_image_xobjects(reader, resources, visited=None):
+    """
+    Replace image XObjects in a resources dictionary with stream-less placeholders.
+
+    PyPDF2's text extraction only checks /Subtype before skipping an image, so
+    the placeholder keeps it from loading the image data. Form XObjects are
+    followed because their own resources may hold the images. Returns the
+    number of images skipped. The reader's objects are changed in place, which
+    replaces the PdfWriter round trip optimize_pdf_bytes used to make.
+    """
+    generic = load_pypdf2().generic
+    visited = set() if visited is None else visited
+    try:
+        xobjects = resources.get_object().get("/XObject")
+        xobjects = xobjects.get_object() if xobjects is not None else None
+    except Exception:
+        return 0
+    if not isinstance(xobjects, dict) or id(xobjects) in visited:
+        return 0
+    visited.add(id(xobjects))
+
+    skipped = 0
+    for name, candidate in list(xobjects.items()):
+        if not isinstance(candidate, generic.IndirectObject):
+            continue
+        subtype = peek_xobject_subtype(reader, candidate)
+        if subtype == "/Image":
+            xobjects[name] = generic.DictionaryObject({
+                generic.NameObject("/Subtype"): generic.NameObject("/Image")
+            })
+            skipped += 1
+        elif subtype == "/Form":
+            form_resources = candidate.get_object().get("/Resources")
+            if form_resources is not None:
+                skipped += skip_image_xobjects(reader, form_resources, visited)
+    return skipped
+
+
+def read_page_texts_pypdf2(reader, page_indices, progress_callback=None, pages=None):
+    pages = reader.pages if pages is None else pages
+    page_texts = []
+    visited = set()
+    for page_index in page_indices:
+        page_text = ''
+        try:
+            page = pages[page_index]
+            resources = page.get("/Resources")
+            if resources is not None:
+                skip_image_xobjects(reader, resources, visited)
+            page_text = page.extract_text() or ''
+        except Exception as page_error:
+            logging.error(f"PDF page {page_index+1} extraction failed: {page_error}")
+        page_texts.append(page_text)
+        if progress_callback:
+            progress_callback(len(page_texts), len(page_indices))
+    return page_texts
+
+
+def assemble_page_texts(selected_indices, page_texts):
+    """
+    Join per-page texts with newlines and record each page's character span.
+
+    Returns (text, page_spans); spans match the offsets of the joined text.
+    """
+    text_buffer = io.StringIO()
+    page_spans = []
+    last_position = len(selected_indices) - 1
+    for logical_idx, (page_index, page_text) in enumerate(zip(selected_indices, page_texts)):
+        start_pos = text_buffer.tell()
+        if page_text:
+            text_buffer.write(page_text)
+        end_pos = text_buffer.tell()
+        page_spans.append({
+            "number": page_index + 1,
+            "start": start_pos,
+            "end": end_pos
+        })
+        if logical_idx < last_position:
+            text_buffer.write("\n")
+    return text_buffer.getvalue(), page_spans
+
+
+def should_extract_in_parallel(page_count):
+    return (
+        PDF_EXTRACTION_WORKERS is not None
+        and PDF_EXTRACTION_WORKERS > 1
+        and page_count >= (PDF_PARALLEL_MIN_PAGES or 0)
+        # Job and batch pool workers already run one document per process.
+        and multiprocessing.parent_process() is None
+    )
+
+
+def _get_executor():
+    # One pool per gunicorn worker; a forked child must not reuse its parent's pool.
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(max_workers=PDF_EXTRACTION_WORKERS or 1)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _discard_executor(executor):
+    # A pool whose child died rejects all further work; the next document builds a new one.
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_page_shard(engine, spool_path, page_indices):
+    """Process-pool entry point: open the spooled document and read one shard of pages."""
+    if engine == "pymupdf":
+        doc = load_fitz().open(spool_path, filetype="pdf")
+        try:
+            return read_page_texts_pymupdf(doc, page_indices)
+        finally:
+            doc.close()
+    with open(spool_path, 'rb') as spool_file:
+        return read_page_texts_pypdf2(open_pypdf2_stream(spool_file), page_indices)
+
+
+def extract_page_texts_parallel(engine, file_bytes, selected_indices, workers=None, progress_callback=None):
+    """
+    Extract the selected pages across the per-process extraction pool.
+
+    The document is written once to JOB_SPOOL_DIR and every worker opens it
+    from there, so the bytes are not pickled per shard. Pages are split into
+    contiguous shards (one per worker) and the results are concatenated in the
+    original order. Returns None when the pool fails so the caller can fall
+    back to sequential extraction.
+    """
+    worker_count = min(workers or PDF_EXTRACTION_WORKERS or 1, len(selected_indices))
+    if worker_count <= 1:
+        return None
+
+    shard_size = -(-len(selected_indices) // worker_count)
+    shards = [
+        selected_indices[offset:offset + shard_size]
+        for offset in range(0, len(selected_indices), shard_size)
+    ]
+    shard_results = []
+    pages_done = 0
+    spool_path = None
+    executor = None
+    try:
+        os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+        spool_path = os.path.join(JOB_SPOOL_DIR, f"extract-{uuid.uuid4().hex}.pdf")
+        with open(spool_path, 'wb') as spool_file:
+            spool_file.write(file_bytes)
+        executor = _get_executor()
+        for shard_texts in executor.map(
+            _extract_page_shard,
+            [engine] * len(shards),
+            [spool_path] * len(shards),
+            shards
+        ):
+            shard_results.append(shard_texts)
+            pages_done += len(shard_texts)
+            if progress_callback:
+                progress_callback(pages_done, len(selected_indices))
+    except Exception as pool_error:
+        if executor is not None and isinstance(pool_error, BrokenProcessPool):
+            _discard_executor(executor)
+        logging.warning("Parallel %s extraction failed, falling back to sequential: %s", engine, pool_error)
+        return None
+    finally:
+        if spool_path:
+            try:
+                os.remove(spool_path)
+            except OSError:
+                pass
+
+    logging.info(
+        "Parallel %s extraction processed %s pages across %s workers",
+        engine,
+        len(selected_indices),
+        len(shards)
+    )
+    return [page_text for shard in shard_results for page_text in shard]
+
+
+def extract_text_pymupdf(file_bytes, reason_label="preferred", page_limit=None, progress_callback=None):
     """Extract text using PyMuPDF for complex PDFs."""
+    fitz = load_fitz()
     if not fitz or not isinstance(file_bytes, (bytes, bytearray)):
         return None, None, None, {
             "total_pages": 0,
@@ -171,23 +460,17 @@ def extract_text_pymupdf(file_bytes, reason_label="preferred", page_limit=None):
                 selection_summary.get("total_pages"),
                 selection_summary.get("limit")
             )
-        text_buffer = io.StringIO()
-        page_spans = []
-        for page_index in selected_indices:
-            page = doc.load_page(page_index)
-            page_text = page.get_text("text") or ""
-            start_pos = text_buffer.tell()
-            if page_text:
-                text_buffer.write(page_text)
-            end_pos = text_buffer.tell()
-            page_spans.append({
-                "number": page_index + 1,
-                "start": start_pos,
-                "end": end_pos
-            })
-            if page_index != selected_indices[-1]:
-                text_buffer.write("\n")
-        extracted = text_buffer.getvalue()
+        page_texts = None
+        if should_extract_in_parallel(len(selected_indices)):
+            page_texts = extract_page_texts_parallel(
+                "pymupdf",
+                file_bytes,
+                selected_indices,
+                progress_callback=progress_callback
+            )
+        if page_texts is None:
+            page_texts = read_page_texts_pymupdf(doc, selected_indices, progress_callback)
+        extracted, page_spans = assemble_page_texts(selected_indices, page_texts)
         if extracted:
             logging.info(
                 "PyMuPDF extraction (%s) succeeded on %s pages",
@@ -211,7 +494,18 @@ def extract_text_pymupdf(file_bytes, reason_label="preferred", page_limit=None):
             doc.close()
 
 
-def extract_text_pdf(file_stream, return_metadata=False, page_limit_override=_PAGE_LIMIT_SENTINEL):
+def extract_text_pdf(
+    file_stream,
+    return_metadata=False,
+    page_limit_override=_PAGE_LIMIT_SENTINEL,
+    progress_callback=None
+):
+    """
+    Extract text from a PDF upload, consulting the on-disk extraction cache first.
+
+    progress_callback, when given, is called as (pages_done, pages_total)
+    while pages are extracted.
+    """
     try:
         try:
             file_stream.seek(0, os.SEEK_END)
@@ -226,148 +520,501 @@ def extract_text_pdf(file_stream, return_metadata=False, page_limit_override=_PA
         if isinstance(file_bytes, str):
             file_bytes = file_bytes.encode('utf-8')
 
-        original_file_bytes = file_bytes
-
-        pymupdf_text = None
-        pymupdf_pages = None
-        pymupdf_page_spans = None
         page_limit = MAX_PDF_PAGES if page_limit_override is _PAGE_LIMIT_SENTINEL else page_limit_override
 
-        if fitz:
-            (
-                pymupdf_text,
-                pymupdf_pages,
-                pymupdf_page_spans,
-                pymupdf_selection
-            ) = extract_text_pymupdf(
-                original_file_bytes,
-                reason_label="initial",
-                page_limit=page_limit
-            )
-            if pymupdf_text:
-                metadata_payload = {
-                    "pages": pymupdf_page_spans or [],
-                    "page_selection": pymupdf_selection
-                }
+        started = time.perf_counter()
+        cache_key = None
+        fingerprint = None
+        if extraction_cache.is_enabled():
+            fingerprint = extraction_cache.fingerprint_bytes(file_bytes)
+            cache_key = extraction_cache.build_cache_key(fingerprint, page_limit)
+            cached = extraction_cache.get_cached_extraction(cache_key)
+            if cached is not None:
+                logging.info("PDF extraction served from cache (%s)", cache_key)
+                observe_extraction("cache", started)
+                text, metadata_payload = cached
+                if progress_callback:
+                    processed_pages = len((metadata_payload or {}).get("pages") or [])
+                    progress_callback(processed_pages, processed_pages)
                 if return_metadata:
-                    return pymupdf_text, metadata_payload
-                return pymupdf_text
+                    return text, metadata_payload
+                return text
 
-        file_bytes = optimize_pdf_bytes(file_bytes)
+        text, metadata_payload = extract_text_pdf_bytes(file_bytes, page_limit, progress_callback, fingerprint)
+        if cache_key is not None and text and text.strip():
+            extraction_cache.store_extraction(cache_key, text, metadata_payload)
 
-        from io import BytesIO
-        pdf_io = BytesIO(file_bytes)
-        reader = PdfReader(pdf_io, strict=False)
+        if return_metadata:
+            return text, metadata_payload
+        return text
+    except Exception as e:
+        logging.error(f"PDF extraction failed: {e}")
+        raise
 
-        if reader.is_encrypted:
-            try:
-                decrypt_result = reader.decrypt("")
-                if decrypt_result == 0:
-                    decrypt_result = reader.decrypt(None)
-                if decrypt_result == 0:
-                    logging.error("Encrypted PDF requires a password")
-                    raise ValueError("PDF is encrypted and requires a password")
-                logging.info("Encrypted PDF decrypted with an empty password")
-            except Exception as decrypt_error:
-                logging.error(f"Failed to decrypt PDF: {decrypt_error}")
-                raise ValueError("Failed to decrypt encrypted PDF")
-
-        page_count = len(reader.pages)
-        selected_indices, selection_summary = build_page_selection(page_count, page_limit)
-        if selection_summary.get("sampled"):
-            logging.info(
-                "Processing %s of %s pages due to configured limit %s",
-                selection_summary.get("processed_pages"),
-                selection_summary.get("total_pages"),
-                selection_summary.get("limit")
-            )
-        text_buffer = io.StringIO()
-        page_spans = []
-        for logical_idx, page_index in enumerate(selected_indices):
-            page = reader.pages[page_index]
-            start_pos = text_buffer.tell()
-            page_text = ''
+
+def pdfminer_allowed(file_bytes, page_count):
+    """pdfminer is slow and memory hungry, so only small PDFs are sent to it."""
+    return len(file_bytes) <= PDF_PDFMINER_MAX_BYTES and page_count <= PDF_PDFMINER_MAX_PAGES
+
+
+def available_pdf_engines(file_bytes, page_count):
+    """Installed engines allowed for this PDF, fastest first."""
+    engines = []
+    if load_fitz():
+        engines.append("pymupdf")
+    engines.append("pypdf2")
+    if load_pdfminer_extract_text() and pdfminer_allowed(file_bytes, page_count):
+        engines.append("pdfminer")
+    return engines
+
+
+def count_pdf_bytes_pages(file_bytes):
+    fitz = load_fitz()
+    if fitz:
+        try:
+            doc = fitz.open(stream=file_bytes, filetype="pdf")
+        except Exception as pymupdf_error:
+            logging.warning(f"PyMuPDF could not open PDF to count pages: {pymupdf_error}")
+        else:
             try:
-                page_text = page.extract_text() or ''
-            except Exception as page_error:
-                logging.error(f"PDF page {page_index+1} extraction failed: {page_error}")
-            if page_text:
-                text_buffer.write(page_text)
-            end_pos = text_buffer.tell()
-            page_spans.append({
-                "number": page_index + 1,
-                "start": start_pos,
-                "end": end_pos
-            })
-            if logical_idx < len(selected_indices) - 1:
-                text_buffer.write('\n')
-        text = text_buffer.getvalue()
-        if text and text.strip():
-            if return_metadata:
-                return text, {
-                    "pages": page_spans,
-                    "page_selection": selection_summary
-                }
-            return text
-
-        logging.info("PyPDF2 returned little/no text; attempting pdfminer fallback")
-
-        allow_pdfminer = (
-            pdfminer_extract_text is not None
-            and len(file_bytes) <= PDF_PDFMINER_MAX_BYTES
-            and page_count <= PDF_PDFMINER_MAX_PAGES
+                return doc.page_count
+            finally:
+                doc.close()
+    return count_pdf_pages(open_pypdf2_reader(file_bytes))
+
+
+def read_page_texts_pdfminer(file_bytes, page_indices):
+    """Text of the given pages in one pdfminer pass; pdfminer ends every page with a form feed."""
+    text = load_pdfminer_extract_text()(io.BytesIO(file_bytes), password="", page_numbers=page_indices) or ""
+    page_texts = text.split("\f")
+    return (page_texts + [""] * len(page_indices))[:len(page_indices)]
+
+
+def read_probe_texts(engine, file_bytes, page_indices):
+    if engine == "pymupdf":
+        doc = load_fitz().open(stream=file_bytes, filetype="pdf")
+        try:
+            return read_page_texts_pymupdf(doc, page_indices)
+        finally:
+            doc.close()
+    if engine == "pypdf2":
+        reader = open_pypdf2_reader(file_bytes)
+        return read_page_texts_pypdf2(reader, page_indices, pages=get_pypdf2_pages(reader, page_indices))
+    return read_page_texts_pdfminer(file_bytes, page_indices)
+
+
+def select_probe_pages(page_count, probe_pages=None):
+    """Evenly spaced interior pages; covers and back pages are often images only."""
+    probe_pages = max(1, probe_pages or PDF_ENGINE_PROBE_PAGES or 1)
+    if page_count <= probe_pages + 2:
+        return select_evenly_spaced_indices(page_count, probe_pages)
+    return select_evenly_spaced_indices(page_count, probe_pages + 2)[1:-1]
+
+
+def probe_pdf_engines(file_bytes, page_count, page_indices):
+    """
+    Extract page_indices with each available engine; returns {engine: {'words', 'seconds'[, 'error']}}.
+
+    Engines are tried fastest first, and probing stops at the first engine
+    whose yield reaches PROBE_GOOD_WORDS_PER_PAGE. pdfminer is neither probed
+    nor chosen for PDFs over PDF_PDFMINER_MAX_BYTES or PDF_PDFMINER_MAX_PAGES.
+    """
+    results = {}
+    for engine in available_pdf_engines(file_bytes, page_count):
+        started = time.perf_counter()
+        result = {'words': 0}
+        try:
+            page_texts = read_probe_texts(engine, file_bytes, page_indices)
+            result['words'] = sum(len(_PROBE_WORD_PATTERN.findall(page_text)) for page_text in page_texts)
+        except Exception as probe_error:
+            result['error'] = str(probe_error)
+        result['seconds'] = round(time.perf_counter() - started, 4)
+        results[engine] = result
+        if result['words'] >= PROBE_GOOD_WORDS_PER_PAGE * len(page_indices):
+            break
+    return results
+
+
+def choose_pdf_engine(probe_results):
+    """The fastest engine whose probe yield is within PROBE_NEAR_BEST_RATIO of the best, or None."""
+    best_words = max((result['words'] for result in probe_results.values()), default=0)
+    if best_words <= 0:
+        return None
+    candidates = [
+        (result['seconds'], engine)
+        for engine, result in probe_results.items()
+        if result['words'] >= best_words * PROBE_NEAR_BEST_RATIO
+    ]
+    return min(candidates)[1]
+
+
+def select_pdf_engine(file_bytes, fingerprint=None):
+    """
+    Probe a few pages per engine and return the decision for this PDF.
+
+    Returns {'engine', 'page_count', 'probe_pages', 'probe', 'cached'}, where
+    engine is None when no engine found text in the probe, or None when the
+    page count cannot be read. Decisions are kept per worker in an LRU of
+    PDF_ENGINE_CACHE_SIZE entries keyed by the document fingerprint.
+    """
+    fingerprint = fingerprint or extraction_cache.fingerprint_bytes(file_bytes)
+    with _engine_choice_lock:
+        cached = _engine_choices.get(fingerprint)
+        if cached is not None:
+            _engine_choices.move_to_end(fingerprint)
+            return dict(cached, cached=True)
+
+    try:
+        page_count = count_pdf_bytes_pages(file_bytes)
+    except ValueError:
+        raise
+    except Exception as count_error:
+        logging.warning(f"Could not count PDF pages for engine selection: {count_error}")
+        return None
+    if not page_count:
+        return None
+
+    probe_indices = select_probe_pages(page_count)
+    probe_results = probe_pdf_engines(file_bytes, page_count, probe_indices)
+    decision = {
+        'engine': choose_pdf_engine(probe_results),
+        'page_count': page_count,
+        'probe_pages': [page_index + 1 for page_index in probe_indices],
+        'probe': probe_results
+    }
+    logging.info("Selected PDF engine %s from probe %s", decision['engine'], probe_results)
+
+    if PDF_ENGINE_CACHE_SIZE and PDF_ENGINE_CACHE_SIZE > 0:
+        with _engine_choice_lock:
+            _engine_choices[fingerprint] = decision
+            while len(_engine_choices) > PDF_ENGINE_CACHE_SIZE:
+                _engine_choices.popitem(last=False)
+    return dict(decision, cached=False)
+
+
+def extract_text_pypdf2(file_bytes, page_limit, progress_callback=None):
+    """
+    PyPDF2 extraction of the selected pages; returns (text, metadata, page_count).
+
+    Image XObjects on the selected pages are skipped while reading (see
+    skip_image_xobjects), so heavy PDFs are not rewritten first.
+    """
+    reader = open_pypdf2_reader(file_bytes)
+
+    page_count = len(reader.pages)
+    selected_indices, selection_summary = build_page_selection(page_count, page_limit)
+    if selection_summary.get("sampled"):
+        logging.info(
+            "Processing %s of %s pages due to configured limit %s",
+            selection_summary.get("processed_pages"),
+            selection_summary.get("total_pages"),
+            selection_summary.get("limit")
+        )
+    page_texts = None
+    if should_extract_in_parallel(len(selected_indices)):
+        page_texts = extract_page_texts_parallel(
+            "pypdf2",
+            file_bytes,
+            selected_indices,
+            progress_callback=progress_callback
         )
+    if page_texts is None:
+        page_texts = read_page_texts_pypdf2(reader, selected_indices, progress_callback)
+    text, page_spans = assemble_page_texts(selected_indices, page_texts)
+    return text, {
+        "pages": page_spans,
+        "page_selection": selection_summary
+    }, page_count
 
-        if allow_pdfminer:
-            try:
-                miner_text = pdfminer_extract_text(io.BytesIO(file_bytes), password="")
-                if miner_text and miner_text.strip():
-                    logging.info("pdfminer extraction successful")
-                    if return_metadata:
-                        return miner_text, {
-                            "pages": page_spans,
-                            "page_selection": selection_summary
-                        }
-                    return miner_text
-                logging.warning("pdfminer extraction yielded empty text")
-                result_text = miner_text or text
-                if return_metadata:
-                    return result_text, {
-                        "pages": page_spans,
-                        "page_selection": selection_summary
-                    }
-                return result_text
-            except Exception as miner_error:
-                logging.error(f"pdfminer extraction failed: {miner_error}")
-                if return_metadata:
-                    return text, {
-                        "pages": page_spans,
-                        "page_selection": selection_summary
-                    }
-                return text
 
-        if not pdfminer_extract_text:
-            logging.warning("pdfminer.six not installed; cannot improve extraction result")
-        elif not allow_pdfminer:
-            logging.info(
-                "Skipped pdfminer fallback due to size/page constraints (size=%s bytes, pages=%s)",
-                len(file_bytes),
-                page_count
+def extract_text_pdfminer_pages(file_bytes, page_count, page_limit, progress_callback=None):
+    """pdfminer extraction of the selected pages with page spans (callers check pdfminer_allowed)."""
+    selected_indices, selection_summary = build_page_selection(page_count, page_limit)
+    page_texts = read_page_texts_pdfminer(file_bytes, selected_indices)
+    if progress_callback:
+        progress_callback(len(selected_indices), len(selected_indices))
+    text, page_spans = assemble_page_texts(selected_indices, page_texts)
+    return text, {
+        "pages": page_spans,
+        "page_selection": selection_summary
+    }
+
+
+def extract_with_engine(engine, file_bytes, page_limit, page_count, progress_callback=None):
+    """Run one engine over the selected pages; returns (text, metadata) or None without text."""
+    try:
+        if engine == "pymupdf":
+            text, _page_count, page_spans, selection_summary = extract_text_pymupdf(
+                file_bytes,
+                reason_label="selected",
+                page_limit=page_limit,
+                progress_callback=progress_callback
             )
-        if return_metadata:
-            return text, {
-                "pages": page_spans,
-                "page_selection": selection_summary
-            }
-        return text
-    except Exception as e:
-        logging.error(f"PDF extraction failed: {e}")
+            metadata_payload = {"pages": page_spans or [], "page_selection": selection_summary}
+        elif engine == "pypdf2":
+            text, metadata_payload, _page_count = extract_text_pypdf2(
+                file_bytes,
+                page_limit,
+                progress_callback
+            )
+        else:
+            text, metadata_payload = extract_text_pdfminer_pages(
+                file_bytes,
+                page_count,
+                page_limit,
+                progress_callback
+            )
+    except ValueError:
         raise
+    except Exception as engine_error:
+        logging.warning(f"{engine} extraction failed: {engine_error}")
+        return None
+    if not text or not text.strip():
+        return None
+    return text, metadata_payload
+
+
+def extract_text_pdf_bytes(file_bytes, page_limit, progress_callback=None, fingerprint=None):
+    """
+    Extract a PDF with the engine chosen for it and return (text, metadata).
+
+    With PDF_ENGINE_SELECTION=adaptive (the default) select_pdf_engine picks
+    one engine from a probe of a few pages and only that engine reads the
+    document. When the probe finds no text anywhere, or the chosen engine
+    finds none in the full run, the PyMuPDF -> PyPDF2 -> pdfminer chain runs.
+    metadata['engine'] names the engine that produced the text.
+    """
+    started = time.perf_counter()
+    selection = None
+    if PDF_ENGINE_SELECTION == "adaptive":
+        selection = select_pdf_engine(file_bytes, fingerprint)
+        engine = (selection or {}).get('engine')
+        if engine:
+            extracted = extract_with_engine(engine, file_bytes, page_limit, selection['page_count'], progress_callback)
+            if extracted is not None:
+                text, metadata_payload = extracted
+                metadata_payload["engine"] = engine
+                metadata_payload["engine_selection"] = selection
+                observe_extraction(engine, started)
+                return text, metadata_payload
+            logging.info("%s returned no text for the full document; running the extraction chain", engine)
+
+    text, metadata_payload, engine = extract_text_pdf_chain(file_bytes, page_limit, progress_callback)
+    metadata_payload["engine"] = engine
+    if selection is not None:
+        metadata_payload["engine_selection"] = selection
+    observe_extraction(engine or "none", started)
+    return text, metadata_payload
+
+
+def extract_text_pdf_chain(file_bytes, page_limit, progress_callback=None):
+    """Run the PyMuPDF -> PyPDF2 -> pdfminer chain and return (text, metadata, engine or None)."""
+    original_file_bytes = file_bytes
+
+    if load_fitz():
+        (
+            pymupdf_text,
+            _pymupdf_pages,
+            pymupdf_page_spans,
+            pymupdf_selection
+        ) = extract_text_pymupdf(
+            original_file_bytes,
+            reason_label="initial",
+            page_limit=page_limit,
+            progress_callback=progress_callback
+        )
+        if pymupdf_text:
+            return pymupdf_text, {
+                "pages": pymupdf_page_spans or [],
+                "page_selection": pymupdf_selection
+            }, "pymupdf"
+
+    text, metadata_payload, page_count = extract_text_pypdf2(file_bytes, page_limit, progress_callback)
+    if text and text.strip():
+        return text, metadata_payload, "pypdf2"
+
+    logging.info("PyPDF2 returned little/no text; attempting pdfminer fallback")
+
+    pdfminer_extract_text = load_pdfminer_extract_text()
+    if (
+        pdfminer_extract_text is not None
+        and len(file_bytes) > PDF_PDFMINER_MAX_BYTES
+        and page_count <= PDF_PDFMINER_MAX_PAGES
+    ):
+        # Only here is the image-stripped copy worth writing: it may fit pdfminer's size limit.
+        file_bytes = optimize_pdf_bytes(file_bytes)
+    allow_pdfminer = pdfminer_extract_text is not None and pdfminer_allowed(file_bytes, page_count)
+
+    if allow_pdfminer:
+        try:
+            miner_text = pdfminer_extract_text(io.BytesIO(file_bytes), password="")
+            if miner_text and miner_text.strip():
+                logging.info("pdfminer extraction successful")
+                return miner_text, metadata_payload, "pdfminer"
+            logging.warning("pdfminer extraction yielded empty text")
+            return miner_text or text, metadata_payload, None
+        except Exception as miner_error:
+            logging.error(f"pdfminer extraction failed: {miner_error}")
+            return text, metadata_payload, None
+
+    if not pdfminer_extract_text:
+        logging.warning("pdfminer.six not installed; cannot improve extraction result")
+        count_pdfminer_skip("not_installed")
+    elif not allow_pdfminer:
+        count_pdfminer_skip("too_large" if len(file_bytes) > PDF_PDFMINER_MAX_BYTES else "too_many_pages")
+        logging.info(
+            "Skipped pdfminer fallback due to size/page constraints (size=%s bytes, pages=%s)",
+            len(file_bytes),
+            page_count
+        )
+    return text, metadata_payload, None
+
+
+def count_pdf_pages(reader):
+    """Page count from the page tree root's /Count, without loading any page."""
+    return int(reader.trailer["/Root"].get_object()["/Pages"].get_object()["/Count"])
+
+
+def get_pypdf2_pages(reader, page_indices):
+    """
+    Return {page_index: PageObject} resolving only the page-tree nodes on the way to page_indices.
+
+    reader.pages flattens the whole tree and so reads every page dictionary,
+    which over a ranged reader downloads most of the file. /Count is used to
+    skip subtrees; kids of a node whose /Count equals its number of kids are
+    taken to be pages and only resolved when selected. Falls back to
+    reader.pages if the tree does not match that layout.
+    """
+    pypdf2 = load_pypdf2()
+    wanted = sorted(set(page_indices))
+    pages = {}
+
+    def visit(node, first_index, inherit):
+        inherit = dict(inherit)
+        for attr in _INHERITABLE_PAGE_ATTRIBUTES:
+            if attr in node:
+                inherit[attr] = node[attr]
+        kids = node.get("/Kids") or []
+        flat = int(node.get("/Count", -1)) == len(kids)
+        index = first_index
+        for kid_ref in kids:
+            kid = None
+            span = 1
+            if not flat:
+                kid = kid_ref.get_object()
+                if kid.get("/Type", "/Pages") == "/Pages":
+                    span = int(kid.get("/Count", 0))
+            position = bisect_left(wanted, index)
+            if position < len(wanted) and wanted[position] < index + span:
+                kid = kid if kid is not None else kid_ref.get_object()
+                if kid.get("/Type", "/Pages") == "/Pages":
+                    if flat:
+                        raise ValueError("page tree node counted as a page")
+                    visit(kid, index, inherit)
+                else:
+                    for attr, value in inherit.items():
+                        if attr not in kid:
+                            kid[pypdf2.generic.NameObject(attr)] = value
+                    indirect_reference = kid_ref if isinstance(kid_ref, pypdf2.generic.IndirectObject) else None
+                    page = pypdf2.PageObject(reader, indirect_reference)
+                    page.update(kid)
+                    pages[index] = page
+            index += span
+
+    try:
+        visit(reader.trailer["/Root"].get_object()["/Pages"].get_object(), 0, {})
+        if len(pages) == len(wanted):
+            return pages
+        logging.info("Page tree walk found %s of %s pages; flattening instead", len(pages), len(wanted))
+    except Exception as tree_error:
+        logging.info(f"Page tree walk failed ({tree_error}); flattening instead")
+    return {page_index: reader.pages[page_index] for page_index in wanted}
+
+
+def extract_text_pdf_sampled_stream(stream, page_limit, progress_callback=None):
+    """
+    Extract only the selected pages of a PDF from a seekable stream with PyPDF2.
+
+    Meant for remote objects behind a ranged reader: only the cross-reference
+    data and the selected pages are read. Returns (text, metadata), or None when
+    the page limit would not skip any pages (a full download is then cheaper)
+    or no text was found, so callers can fall back to extract_text_pdf.
+    """
+    if page_limit is None or page_limit <= 0:
+        return None
+
+    started = time.perf_counter()
+    reader = open_pypdf2_stream(stream)
+    page_count = count_pdf_pages(reader)
+    if page_count <= page_limit:
+        return None
+
+    selected_indices, selection_summary = build_page_selection(page_count, page_limit)
+    logging.info(
+        "Processing %s of %s pages due to configured limit %s (ranged reads)",
+        selection_summary.get("processed_pages"),
+        selection_summary.get("total_pages"),
+        selection_summary.get("limit")
+    )
+    pages = get_pypdf2_pages(reader, selected_indices)
+    page_texts = read_page_texts_pypdf2(reader, selected_indices, progress_callback, pages=pages)
+    text, page_spans = assemble_page_texts(selected_indices, page_texts)
+    if not text or not text.strip():
+        return None
+    observe_extraction("pypdf2", started)
+    return text, {
+        "pages": page_spans,
+        "page_selection": selection_summary,
+        "engine": "pypdf2"
+    }
+
+
+def iter_pdf_pages(file_stream, page_limit_override=_PAGE_LIMIT_SENTINEL):
+    """
+    Open a PDF and return (page_iterator, selection_summary, engine) for streaming analysis.
+
+    The iterator yields (page_number, page_text) one selected page at a time so
+    callers never hold the full document text. engine is "pymupdf" when
+    PyMuPDF is available and opens the file, otherwise "pypdf2".
+    """
+    file_stream.seek(0)
+    file_bytes = file_stream.read()
+    if isinstance(file_bytes, str):
+        file_bytes = file_bytes.encode('utf-8')
+
+    page_limit = MAX_PDF_PAGES if page_limit_override is _PAGE_LIMIT_SENTINEL else page_limit_override
+
+    fitz = load_fitz()
+    if fitz:
+        try:
+            doc = fitz.open(stream=file_bytes, filetype="pdf")
+        except Exception as pymupdf_error:
+            logging.warning(f"PyMuPDF streaming open failed: {pymupdf_error}")
+        else:
+            selected_indices, selection_summary = build_page_selection(doc.page_count, page_limit)
+
+            def iterate_pymupdf_pages():
+                try:
+                    for page_index in selected_indices:
+                        yield page_index + 1, doc.load_page(page_index).get_text("text") or ""
+                finally:
+                    doc.close()
+
+            return iterate_pymupdf_pages(), selection_summary, "pymupdf"
+
+    reader = open_pypdf2_reader(file_bytes)
+    selected_indices, selection_summary = build_page_selection(len(reader.pages), page_limit)
+
+    def iterate_pypdf2_pages():
+        for page_index in selected_indices:
+            yield page_index + 1, read_page_texts_pypdf2(reader, [page_index])[0]
+
+    return iterate_pypdf2_pages(), selection_summary, "pypdf2"
 
 
 def extract_text_docx(file_stream):
     try:
-        doc = Document(file_stream)
+        doc = import_module("docx").Document(file_stream)
         return '\n'.join([p.text for p in doc.paragraphs if p.text.strip()])
     except Exception as e:
         logging.error(f"DOCX extraction failed: {e}")
@@ -380,3 +1027,49 @@ def extract_text_txt(file_stream):
     except Exception as e:
         logging.error(f"TXT extraction failed: {e}")
         raise
+
+
+def build_default_metadata(extracted_text, engine=None):
+    """Single-page metadata for formats without page structure (DOCX, TXT)."""
+    return {
+        'engine': engine,
+        'pages': [{
+            'number': 1,
+            'start': 0,
+            'end': len(extracted_text or '')
+        }],
+        'page_selection': {
+            'total_pages': 1,
+            'processed_pages': 1,
+            'limit': None,
+            'sampled': False,
+            'strategy': 'all'
+        }
+    }
+
+
+def extract_document(filename, file_stream, disable_limits=False, progress_callback=None):
+    """
+    Dispatch extraction by file extension and return (text, metadata).
+
+    Raises ValueError for unsupported types and validation problems.
+    """
+    lowered = filename.lower()
+    if lowered.endswith('.pdf'):
+        pdf_kwargs = {'return_metadata': True, 'progress_callback': progress_callback}
+        if disable_limits:
+            pdf_kwargs['page_limit_override'] = None
+        return extract_text_pdf(file_stream, **pdf_kwargs)
+    started = time.perf_counter()
+    if lowered.endswith('.docx'):
+        text = extract_text_docx(file_stream)
+        engine = "python-docx"
+    elif lowered.endswith('.txt'):
+        text = extract_text_txt(file_stream)
+        engine = "txt"
+    else:
+        raise ValueError('Unsupported file type')
+    observe_extraction(engine, started)
+    if progress_callback:
+        progress_callback(1, 1)
+    return text, build_default_metadata(text, engine)
@@ -0,0 +1,438 @@
+"""Storage backends for uploaded documents and their analysis results."""
+
+from abc import ABC, abstractmethod
+from array import array
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    from .constants import DOCUMENT_STORE_BACKEND, DOCUMENT_STORE_PATH
+except ImportError:
+    from constants import DOCUMENT_STORE_BACKEND, DOCUMENT_STORE_PATH
+
+
+TEXT_BLOCK_CHARS = 64 * 1024  # Document text is compressed in blocks of this many characters
+SQLITE_MAX_BATCH = 500  # Stay well below SQLite's bound-parameter limit
+
+
+def format_document_id(numeric_id):
+    return f"doc_{numeric_id}"
+
+
+def parse_document_id(doc_id):
+    """Return the numeric row id for a "doc_<n>" identifier, or None when malformed."""
+    if not isinstance(doc_id, str) or not doc_id.startswith("doc_"):
+        return None
+    try:
+        return int(doc_id[4:])
+    except ValueError:
+        return None
+
+
+class DocumentStore(ABC):
+    """
+    Interface shared by the storage backends.
+
+    Summaries (id, filename, word_count) are cheap to list; text, metadata and
+    analysis results are only loaded when a caller asks for a single document.
+    """
+
+    @abstractmethod
+    def add_document(self, filename, text, word_count, analysis_result, metadata):
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_documents(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_text(self, doc_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_document(self, doc_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_metadata(self, doc_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def index_document(self, doc_id, sentences, postings):
+        """
+        Persist the output of search_index.build_search_index for a document.
+
+        Only each sentence's offset and length are kept; get_sentences slices
+        them out of the stored text instead of storing the text twice.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_postings(self, token):
+        """Yield (doc_id, positions) where positions is a flat (sentence_id, offset) array."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_sentences(self, doc_id, sentence_ids):
+        """Return [(sentence_id, sentence_text), ...] for the requested ids."""
+        raise NotImplementedError
+
+
+def slice_sentence(text, start_offset, length):
+    return text[start_offset:start_offset + length]
+
+
+def text_blocks_for_span(start_offset, length):
+    """Return the range of TEXT_BLOCK_CHARS blocks covering a sentence span."""
+    end_offset = start_offset + max(length, 1) - 1
+    return range(start_offset // TEXT_BLOCK_CHARS, end_offset // TEXT_BLOCK_CHARS + 1)
+
+
+class InMemoryDocumentStore(DocumentStore):
+    """Process-local store, useful for tests and single-worker development servers."""
+
+    def __init__(self):
+        self._documents = {}
+        self._sentences = {}
+        self._postings = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def add_document(self, filename, text, word_count, analysis_result, metadata):
+        with self._lock:
+            doc_id = format_document_id(self._next_id)
+            self._next_id += 1
+            self._documents[doc_id] = {
+                'id': doc_id,
+                'filename': filename,
+                'text': text or '',
+                'word_count': word_count or 0,
+                'analysis_result': analysis_result,
+                'metadata': metadata
+            }
+        return doc_id
+
+    def count(self):
+        return len(self._documents)
+
+    def list_documents(self):
+        return [
+            {
+                'id': doc['id'],
+                'filename': doc['filename'],
+                'word_count': doc['word_count']
+            }
+            for doc in list(self._documents.values())
+        ]
+
+    def get_text(self, doc_id):
+        doc = self._documents.get(doc_id)
+        return doc['text'] if doc else None
+
+    def get_document(self, doc_id):
+        doc = self._documents.get(doc_id)
+        return dict(doc) if doc else None
+
+    def get_metadata(self, doc_id):
+        doc = self._documents.get(doc_id)
+        return doc['metadata'] if doc else None
+
+    def index_document(self, doc_id, sentences, postings):
+        with self._lock:
+            self._sentences[doc_id] = {sentence_id: (start, len(text)) for sentence_id, start, text in sentences}
+            for token, positions in postings.items():
+                self._postings.setdefault(token, {})[doc_id] = positions
+
+    def get_postings(self, token):
+        return list(self._postings.get(token, {}).items())
+
+    def get_sentences(self, doc_id, sentence_ids):
+        doc_sentences = self._sentences.get(doc_id, {})
+        doc = self._documents.get(doc_id)
+        text = doc['text'] if doc else ''
+        return [
+            (sentence_id, slice_sentence(text, *doc_sentences[sentence_id]))
+            for sentence_id in sentence_ids
+            if sentence_id in doc_sentences
+        ]
+
+
+class SQLiteDocumentStore(DocumentStore):
+    """
+    SQLite-backed store shared by all gunicorn workers on the host.
+
+    The ``documents`` table is a lightweight index; bodies (JSON metadata and
+    compressed analysis) live in ``document_bodies`` and are only read for
+    single-document lookups. The text is stored as zlib-compressed blocks of
+    TEXT_BLOCK_CHARS characters in ``document_text_blocks``, so get_sentences
+    decompresses only the blocks holding the requested sentences.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    filename TEXT NOT NULL,
+                    word_count INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS document_bodies (
+                    document_id INTEGER PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+                    metadata TEXT,
+                    analysis_result BLOB
+                );
+                CREATE TABLE IF NOT EXISTS document_text_blocks (
+                    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+                    block_index INTEGER NOT NULL,
+                    text BLOB NOT NULL,
+                    PRIMARY KEY (document_id, block_index)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS sentence_spans (
+                    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+                    sentence_id INTEGER NOT NULL,
+                    start_offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    PRIMARY KEY (document_id, sentence_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS postings (
+                    token TEXT NOT NULL,
+                    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+                    positions BLOB NOT NULL,
+                    PRIMARY KEY (token, document_id)
+                ) WITHOUT ROWID;
+                """
+            )
+
+    def _connect(self):
+        # Connections are cached per thread and re-opened after a fork.
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return connection
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _compress_json(value):
+        return zlib.compress(json.dumps(value).encode('utf-8'), 6)
+
+    @staticmethod
+    def _decompress_json(blob):
+        if blob is None:
+            return None
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+    def add_document(self, filename, text, word_count, analysis_result, metadata):
+        connection = self._connect()
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO documents (filename, word_count, created_at) VALUES (?, ?, ?)",
+                (filename, word_count or 0, time.time())
+            )
+            numeric_id = cursor.lastrowid
+            connection.execute(
+                "INSERT INTO document_bodies (document_id, metadata, analysis_result) VALUES (?, ?, ?)",
+                (
+                    numeric_id,
+                    json.dumps(metadata) if metadata is not None else None,
+                    self._compress_json(analysis_result)
+                )
+            )
+            text = text or ''
+            connection.executemany(
+                "INSERT INTO document_text_blocks (document_id, block_index, text) VALUES (?, ?, ?)",
+                (
+                    (numeric_id, block_index, zlib.compress(text[start:start + TEXT_BLOCK_CHARS].encode('utf-8'), 6))
+                    for block_index, start in enumerate(range(0, len(text), TEXT_BLOCK_CHARS))
+                )
+            )
+        return format_document_id(numeric_id)
+
+    def count(self):
+        row = self._connect().execute("SELECT COUNT(*) FROM documents").fetchone()
+        return row[0] if row else 0
+
+    def list_documents(self):
+        rows = self._connect().execute(
+            "SELECT id, filename, word_count FROM documents ORDER BY id"
+        ).fetchall()
+        return [
+            {
+                'id': format_document_id(numeric_id),
+                'filename': filename,
+                'word_count': word_count
+            }
+            for numeric_id, filename, word_count in rows
+        ]
+
+    def _read_text(self, numeric_id):
+        rows = self._connect().execute(
+            "SELECT text FROM document_text_blocks WHERE document_id = ? ORDER BY block_index",
+            (numeric_id,)
+        ).fetchall()
+        return "".join(zlib.decompress(blob).decode('utf-8') for blob, in rows)
+
+    def _read_text_blocks(self, numeric_id, block_indices):
+        """Return {block_index: text} for the requested blocks of one document."""
+        blocks = {}
+        block_indices = sorted(block_indices)
+        connection = self._connect()
+        for offset in range(0, len(block_indices), SQLITE_MAX_BATCH):
+            batch = block_indices[offset:offset + SQLITE_MAX_BATCH]
+            placeholders = ",".join("?" for _ in batch)
+            for block_index, blob in connection.execute(
+                f"SELECT block_index, text FROM document_text_blocks "
+                f"WHERE document_id = ? AND block_index IN ({placeholders})",
+                [numeric_id, *batch]
+            ):
+                blocks[block_index] = zlib.decompress(blob).decode('utf-8')
+        return blocks
+
+    def get_text(self, doc_id):
+        numeric_id = parse_document_id(doc_id)
+        if numeric_id is None:
+            return None
+        exists = self._connect().execute("SELECT 1 FROM documents WHERE id = ?", (numeric_id,)).fetchone()
+        return self._read_text(numeric_id) if exists else None
+
+    def get_document(self, doc_id):
+        numeric_id = parse_document_id(doc_id)
+        if numeric_id is None:
+            return None
+        row = self._connect().execute(
+            """
+            SELECT d.filename, d.word_count, b.metadata, b.analysis_result
+            FROM documents d
+            LEFT JOIN document_bodies b ON b.document_id = d.id
+            WHERE d.id = ?
+            """,
+            (numeric_id,)
+        ).fetchone()
+        if not row:
+            return None
+        filename, word_count, metadata_json, analysis_blob = row
+        return {
+            'id': doc_id,
+            'filename': filename,
+            'word_count': word_count,
+            'text': self._read_text(numeric_id),
+            'metadata': json.loads(metadata_json) if metadata_json else None,
+            'analysis_result': self._decompress_json(analysis_blob)
+        }
+
+    def get_metadata(self, doc_id):
+        numeric_id = parse_document_id(doc_id)
+        if numeric_id is None:
+            return None
+        row = self._connect().execute(
+            "SELECT metadata FROM document_bodies WHERE document_id = ?",
+            (numeric_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def index_document(self, doc_id, sentences, postings):
+        numeric_id = parse_document_id(doc_id)
+        if numeric_id is None:
+            return
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO sentence_spans (document_id, sentence_id, start_offset, length) VALUES (?, ?, ?, ?)",
+                ((numeric_id, sentence_id, start, len(text)) for sentence_id, start, text in sentences)
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO postings (token, document_id, positions) VALUES (?, ?, ?)",
+                ((token, numeric_id, positions.tobytes()) for token, positions in postings.items())
+            )
+
+    def get_postings(self, token):
+        rows = self._connect().execute(
+            "SELECT document_id, positions FROM postings WHERE token = ? ORDER BY document_id",
+            (token,)
+        ).fetchall()
+        results = []
+        for numeric_id, blob in rows:
+            positions = array('l')
+            positions.frombytes(blob)
+            results.append((format_document_id(numeric_id), positions))
+        return results
+
+    def get_sentences(self, doc_id, sentence_ids):
+        numeric_id = parse_document_id(doc_id)
+        if numeric_id is None or not sentence_ids:
+            return []
+        spans = []
+        connection = self._connect()
+        for offset in range(0, len(sentence_ids), SQLITE_MAX_BATCH):
+            batch = list(sentence_ids[offset:offset + SQLITE_MAX_BATCH])
+            placeholders = ",".join("?" for _ in batch)
+            spans.extend(connection.execute(
+                f"SELECT sentence_id, start_offset, length FROM sentence_spans "
+                f"WHERE document_id = ? AND sentence_id IN ({placeholders})",
+                [numeric_id, *batch]
+            ).fetchall())
+        if not spans:
+            return []
+        spans.sort()
+
+        # Only the blocks that hold a requested sentence are read and decompressed.
+        needed_blocks = set()
+        for _sentence_id, start, length in spans:
+            needed_blocks.update(text_blocks_for_span(start, length))
+        blocks = self._read_text_blocks(numeric_id, needed_blocks)
+
+        sentences = []
+        for sentence_id, start, length in spans:
+            block_range = text_blocks_for_span(start, length)
+            window = "".join(blocks.get(block_index, '') for block_index in block_range)
+            sentences.append((sentence_id, slice_sentence(window, start - block_range.start * TEXT_BLOCK_CHARS, length)))
+        return sentences
+
+
+_store_lock = threading.Lock()
+_store = None
+
+
+def create_document_store(backend=None, path=None):
+    backend = (backend or DOCUMENT_STORE_BACKEND or 'sqlite').strip().lower()
+    if backend == 'memory':
+        return InMemoryDocumentStore()
+    if backend != 'sqlite':
+        logging.warning("Unknown DOCUMENT_STORE backend %r; falling back to sqlite", backend)
+    return SQLiteDocumentStore(path or DOCUMENT_STORE_PATH)
+
+
+def get_document_store():
+    """Return the process-wide document store configured via DOCUMENT_STORE."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_document_store()
+    return _store
+
+
+def set_document_store(store):
+    """Swap the active store (e.g. an InMemoryDocumentStore in tests)."""
+    global _store
+    with _store_lock:
+        _store = store
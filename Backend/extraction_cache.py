@@ -0,0 +1,129 @@
+"""Disk-backed, size-bounded cache for extracted document text."""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+
+try:
+    from .constants import EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES
+    from .metrics import count_extraction_cache_event
+except ImportError:
+    from constants import EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES
+    from metrics import count_extraction_cache_event
+
+
+_CACHE_SUFFIX = ".json.gz"
+
+
+def is_enabled():
+    return bool(EXTRACTION_CACHE_DIR) and EXTRACTION_CACHE_MAX_BYTES is not None
+
+
+def fingerprint_bytes(file_bytes):
+    """Return the SHA-256 hex digest identifying a document's raw bytes."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def build_cache_key(fingerprint, page_limit):
+    limit_label = "all" if page_limit is None or page_limit <= 0 else str(int(page_limit))
+    return f"{fingerprint}-{limit_label}"
+
+
+def _entry_path(cache_key):
+    return os.path.join(EXTRACTION_CACHE_DIR, cache_key + _CACHE_SUFFIX)
+
+
+def get_cached_extraction(cache_key):
+    """
+    Return (text, metadata) for a cached extraction or None on a miss.
+
+    A hit refreshes the entry's modification time so eviction stays LRU.
+    """
+    if not is_enabled():
+        return None
+
+    path = _entry_path(cache_key)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            entry = json.load(handle)
+        os.utime(path, None)
+    except FileNotFoundError:
+        count_extraction_cache_event("miss")
+        return None
+    except Exception as cache_error:
+        logging.warning("Ignoring unreadable extraction cache entry %s: %s", cache_key, cache_error)
+        count_extraction_cache_event("error")
+        count_extraction_cache_event("miss")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+    count_extraction_cache_event("hit")
+    return entry.get("text"), entry.get("metadata")
+
+
+def store_extraction(cache_key, text, metadata):
+    """Persist an extraction result and evict least recently used entries past the size bound."""
+    if not is_enabled() or not text:
+        return
+
+    path = _entry_path(cache_key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(EXTRACTION_CACHE_DIR, exist_ok=True)
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=5) as handle:
+            json.dump({"text": text, "metadata": metadata}, handle)
+        os.replace(tmp_path, path)
+        count_extraction_cache_event("store")
+    except Exception as cache_error:
+        logging.warning("Failed to store extraction cache entry %s: %s", cache_key, cache_error)
+        count_extraction_cache_event("error")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+
+    evict_to_limit(EXTRACTION_CACHE_MAX_BYTES)
+
+
+def evict_to_limit(max_bytes):
+    """Delete the oldest entries (by access time) until the cache fits into max_bytes."""
+    if max_bytes is None:
+        return
+
+    entries = []
+    total_size = 0
+    try:
+        with os.scandir(EXTRACTION_CACHE_DIR) as iterator:
+            for item in iterator:
+                if not item.name.endswith(_CACHE_SUFFIX):
+                    continue
+                try:
+                    stat_result = item.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat_result.st_mtime, stat_result.st_size, item.path))
+                total_size += stat_result.st_size
+    except FileNotFoundError:
+        return
+
+    if total_size <= max_bytes:
+        return
+
+    entries.sort()
+    for _mtime, size, path in entries:
+        if total_size <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
+        count_extraction_cache_event("eviction")
+
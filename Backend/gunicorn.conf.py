@@ -0,0 +1,38 @@
+"""Gunicorn settings, loaded automatically when gunicorn starts in the Backend directory."""
+
+import glob
+import os
+import sys
+import tempfile
+
+# Gunicorn loads this file by path, so the hooks import backend modules from its directory.
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Workers and their pool processes must all see this before prometheus_client
+# is imported, or /metrics reports only the worker that happens to answer.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "trendalyze-metrics")
+)
+
+
+def on_starting(server):
+    # Samples left by a previous run would otherwise be merged into /metrics.
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for stale_file in glob.glob(os.path.join(multiproc_dir, "*.db")):
+            os.remove(stale_file)
+
+    # Import heavy dependencies once in the master so every forked worker
+    # (recycled often via --max-requests) starts with them already loaded.
+    if os.environ.get("PRELOAD_HEAVY_MODULES", "").strip().lower() in {"1", "true", "yes"}:
+        from lazy_imports import warm_up
+        warm_up()
+
+
+def child_exit(server, worker):
+    from metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,243 @@
+"""SQLite-backed background jobs for long-running document analyses."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from .analysis_pipeline import run_analysis
+    from .constants import (
+        ANALYSIS_JOB_WORKERS,
+        JOB_QUEUE_PATH,
+        JOB_SPOOL_DIR,
+        JOB_STALE_SECONDS,
+    )
+except ImportError:
+    from analysis_pipeline import run_analysis
+    from constants import (
+        ANALYSIS_JOB_WORKERS,
+        JOB_QUEUE_PATH,
+        JOB_SPOOL_DIR,
+        JOB_STALE_SECONDS,
+    )
+
+
+PROGRESS_WRITE_INTERVAL_SECONDS = 0.5
+
+_executor_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def _ensure_schema(connection):
+    # The journal mode and table persist in the file, so each process sets them up once.
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                status TEXT NOT NULL,
+                pages_done INTEGER NOT NULL DEFAULT 0,
+                pages_total INTEGER,
+                result BLOB,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                owner_pid INTEGER
+            )
+            """
+        )
+        _schema_ready = True
+
+
+def _connect():
+    connection = sqlite3.connect(JOB_QUEUE_PATH, timeout=30)
+    if not _schema_ready:
+        _ensure_schema(connection)
+    return connection
+
+
+def _pid_alive(pid):
+    if not pid:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _update_job(job_id, **fields):
+    fields['updated_at'] = time.time()
+    assignments = ", ".join(f"{column} = ?" for column in fields)
+    connection = _connect()
+    try:
+        with connection:
+            connection.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                [*fields.values(), job_id]
+            )
+    finally:
+        connection.close()
+
+
+def _get_executor():
+    # One pool per gunicorn worker; a forked child must not reuse its parent's pool.
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(max_workers=ANALYSIS_JOB_WORKERS or 1)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def enqueue_analysis_job(filename, file_bytes, user_keywords, disable_limits=False, streaming=False, profile=None):
+    """Spool the upload to disk, record a queued job and hand it to the process pool."""
+    job_id = uuid.uuid4().hex
+    os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+    spool_path = os.path.join(JOB_SPOOL_DIR, f"{job_id}{os.path.splitext(filename)[1].lower()}")
+    with open(spool_path, 'wb') as spool_file:
+        spool_file.write(file_bytes)
+
+    now = time.time()
+    connection = _connect()
+    try:
+        with connection:
+            connection.execute(
+                """
+                INSERT INTO jobs (id, filename, status, created_at, updated_at, owner_pid)
+                VALUES (?, ?, 'queued', ?, ?, ?)
+                """,
+                (job_id, filename, now, now, os.getpid())
+            )
+    finally:
+        connection.close()
+
+    _get_executor().submit(
+        run_analysis_job,
+        job_id,
+        filename,
+        spool_path,
+        user_keywords,
+        disable_limits,
+        streaming,
+        profile
+    )
+    logging.info("Queued analysis job %s for %s (%s bytes)", job_id, filename, len(file_bytes))
+    return job_id
+
+
+def run_analysis_job(job_id, filename, spool_path, user_keywords, disable_limits=False, streaming=False, profile=None):
+    """Process-pool entry point: run the full pipeline and record progress and result."""
+    last_write = 0.0
+
+    def report_progress(pages_done, pages_total):
+        nonlocal last_write
+        now = time.monotonic()
+        if pages_done < pages_total and now - last_write < PROGRESS_WRITE_INTERVAL_SECONDS:
+            return
+        last_write = now
+        _update_job(job_id, pages_done=pages_done, pages_total=pages_total)
+
+    try:
+        _update_job(job_id, status='running', owner_pid=os.getpid())
+        with open(spool_path, 'rb') as file_stream:
+            response_payload = run_analysis(
+                filename,
+                file_stream,
+                user_keywords,
+                disable_limits=disable_limits,
+                streaming=streaming,
+                progress_callback=report_progress,
+                profile=profile
+            )
+        _update_job(
+            job_id,
+            status='done',
+            result=zlib.compress(json.dumps(response_payload).encode('utf-8'), 6)
+        )
+        logging.info("Analysis job %s finished", job_id)
+    except ValueError as validation_error:
+        _update_job(job_id, status='failed', error=str(validation_error))
+    except Exception:
+        logging.exception("Analysis job %s failed", job_id)
+        _update_job(job_id, status='failed', error='Internal server error')
+    finally:
+        try:
+            os.remove(spool_path)
+        except OSError:
+            pass
+
+
+def is_job_interrupted(status, updated_at, owner_pid):
+    """
+    True when a job can no longer finish.
+
+    owner_pid is the gunicorn worker that queued the job (its pool dies with
+    it) until the pool process running the job takes over. A queued job may
+    wait behind long ones for any time, so only its owner's exit counts. A
+    running job reports progress, so it is also given up after
+    JOB_STALE_SECONDS without an update.
+    """
+    if status == 'queued':
+        return not _pid_alive(owner_pid)
+    if status == 'running':
+        if not _pid_alive(owner_pid):
+            return True
+        return bool(JOB_STALE_SECONDS) and time.time() - updated_at > JOB_STALE_SECONDS
+    return False
+
+
+def get_job(job_id):
+    """Return the job status dict (including the result once done) or None if unknown."""
+    connection = _connect()
+    try:
+        row = connection.execute(
+            """
+            SELECT id, filename, status, pages_done, pages_total, result, error, created_at, updated_at, owner_pid
+            FROM jobs WHERE id = ?
+            """,
+            (job_id,)
+        ).fetchone()
+    finally:
+        connection.close()
+    if not row:
+        return None
+
+    job_id, filename, status, pages_done, pages_total, result_blob, error, created_at, updated_at, owner_pid = row
+    if is_job_interrupted(status, updated_at, owner_pid):
+        status = 'failed'
+        error = 'Job was interrupted before it finished'
+
+    job = {
+        'id': job_id,
+        'filename': filename,
+        'status': status,
+        'progress': {
+            'pagesDone': pages_done,
+            'pagesTotal': pages_total
+        },
+        'createdAt': created_at,
+        'updatedAt': updated_at
+    }
+    if status == 'done' and result_blob is not None:
+        job['result'] = json.loads(zlib.decompress(result_blob).decode('utf-8'))
+    if error:
+        job['error'] = error
+    return job
@@ -1,5 +1,7 @@
 """Utilities for working with keywords in the analysis pipeline."""
 
+from array import array
+from bisect import bisect_right
 import re
 
 try:
@@ -8,6 +10,9 @@ except ImportError:
     from constants import STRIP_CHARS
 
 
+WORD_PATTERN = re.compile(r'\b\w[\w\-_/]*\b')
+
+
 def tokenize_keyword(keyword):
     return [
         part.strip(STRIP_CHARS)
@@ -16,29 +21,48 @@ def tokenize_keyword(keyword):
     ]
 
 
+def keyword_pattern_body(tokens):
+    """Regex source for the token sequence, without the leading (?<!\\w) boundary."""
+    separator = r'(?:\s+|[-_/]+)'
+    return separator.join(re.escape(token) for token in tokens) + r'(?!\w)'
+
+
 def compile_keyword_pattern(tokens):
     if not tokens:
         return None
-    separator = r'(?:\s+|[-_/]+)'
-    pattern = r'(?<!\w)' + separator.join(re.escape(token) for token in tokens) + r'(?!\w)'
-    return re.compile(pattern, re.IGNORECASE)
+    return re.compile(r'(?<!\w)' + keyword_pattern_body(tokens), re.IGNORECASE)
+
+
+def build_word_offsets(text):
+    """
+    Return (starts, ends) offset arrays for every word in text.
 
+    Compact ``array('l')`` buffers replace a list of ``re.Match`` objects so
+    snippet lookups can bisect without holding one object per word.
+    """
+    starts = array('l')
+    ends = array('l')
+    for match in WORD_PATTERN.finditer(text):
+        start, end = match.span()
+        starts.append(start)
+        ends.append(end)
+    return starts, ends
 
-def build_snippet(text, start, end, word_spans, window=5):
-    def index_at_or_after(position):
-        for idx, match in enumerate(word_spans):
-            if match.start() <= position < match.end():
-                return idx
-            if match.start() > position:
-                return idx
-        return len(word_spans)
 
-    start_idx = index_at_or_after(start)
-    end_idx = index_at_or_after(end)
+def build_snippet(text, start, end, word_offsets, window=5):
+    word_starts, word_ends = word_offsets
+
+    # Spans are sorted and disjoint, so the first word ending after a position
+    # either contains it or is the next word to its right.
+    start_idx = bisect_right(word_ends, start)
+    end_idx = bisect_right(word_ends, end)
 
     left_start = max(0, start_idx - window)
-    left_words = [m.group(0) for m in word_spans[left_start:start_idx]]
-    right_words = [m.group(0) for m in word_spans[end_idx:end_idx + window]]
+    left_words = [text[word_starts[idx]:word_ends[idx]] for idx in range(left_start, start_idx)]
+    right_words = [
+        text[word_starts[idx]:word_ends[idx]]
+        for idx in range(end_idx, min(end_idx + window, len(word_ends)))
+    ]
 
     keyword_text = text[start:end].strip()
     snippet_parts = []
@@ -0,0 +1,51 @@
+"""Deferred imports for heavy third-party dependencies."""
+
+import importlib
+import logging
+import time
+from functools import lru_cache
+
+
+# Modules that dominate worker start-up time; loaded on first use instead of at import.
+HEAVY_MODULES = (
+    "numpy",
+    "fitz",
+    "PyPDF2",
+    "pdfminer.high_level",
+    "docx",
+    "textblob",
+    "wordcloud",
+    "boto3",
+    "botocore.config",
+)
+
+
+def import_module(name):
+    """Import a required dependency on first use (sys.modules caches later calls)."""
+    return importlib.import_module(name)
+
+
+@lru_cache(maxsize=None)
+def import_optional(name):
+    """Import an optional dependency, returning None when it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def warm_up(modules=HEAVY_MODULES):
+    """
+    Import the heavy dependencies eagerly.
+
+    Call this in the gunicorn master (see gunicorn.conf.py) so forked workers
+    inherit the loaded modules instead of importing them on their first request.
+    Returns {module: seconds or None if unavailable}.
+    """
+    timings = {}
+    for name in modules:
+        started = time.perf_counter()
+        module = import_optional(name)
+        timings[name] = round(time.perf_counter() - started, 4) if module is not None else None
+    logging.info("Preloaded heavy modules: %s", timings)
+    return timings
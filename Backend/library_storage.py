@@ -0,0 +1,326 @@
+"""Access to the document library in OCI Object Storage (S3-compatible API)."""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+
+try:
+    from .constants import (
+        LIBRARY_LISTING_CACHE_SIZE,
+        LIBRARY_LISTING_STALE_SECONDS,
+        LIBRARY_LISTING_TTL_SECONDS,
+        LIBRARY_RANGE_BLOCK_SIZE,
+        LIBRARY_S3_MAX_POOL_CONNECTIONS,
+        LIBRARY_SPOOL_MAX_BYTES,
+    )
+    from .lazy_imports import import_module
+except ImportError:
+    from constants import (
+        LIBRARY_LISTING_CACHE_SIZE,
+        LIBRARY_LISTING_STALE_SECONDS,
+        LIBRARY_LISTING_TTL_SECONDS,
+        LIBRARY_RANGE_BLOCK_SIZE,
+        LIBRARY_S3_MAX_POOL_CONNECTIONS,
+        LIBRARY_SPOOL_MAX_BYTES,
+    )
+    from lazy_imports import import_module
+
+
+LIBRARY_REQUIRED_ENV = (
+    "OCI_BUCKET",
+    "PAR_BASE_URL",
+    "OCI_REGION",
+    "OCI_NAMESPACE",
+    "OCI_S3_ACCESS_KEY",
+    "OCI_S3_SECRET_KEY",
+)
+
+
+def get_missing_library_env():
+    return [var for var in LIBRARY_REQUIRED_ENV if not os.environ.get(var)]
+
+
+_client_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+_listing_lock = threading.Lock()
+_listings = OrderedDict()
+_refreshing = set()
+
+
+# S3-compatible OCI API helper (Oracle Object Storage)
+def create_s3_client():
+    region = os.environ["OCI_REGION"]
+    namespace = os.environ["OCI_NAMESPACE"]
+    access_key = os.environ["OCI_S3_ACCESS_KEY"]
+    secret_key = os.environ["OCI_S3_SECRET_KEY"]
+    endpoint = f"https://{namespace}.compat.objectstorage.{region}.oraclecloud.com"
+    boto3 = import_module("boto3")
+    botocore_config = import_module("botocore.config")
+    return boto3.client(
+        "s3",
+        region_name=region,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        endpoint_url=endpoint,
+        config=botocore_config.Config(
+            signature_version="s3v4",
+            max_pool_connections=LIBRARY_S3_MAX_POOL_CONNECTIONS or 10
+        )
+    )
+
+
+def get_s3_client():
+    """
+    Return this process's shared S3 client.
+
+    boto3 clients are thread-safe and keep a pool of HTTPS connections, so one
+    client per process avoids a new TLS handshake per request. A forked child
+    builds its own client instead of sharing its parent's sockets.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = create_s3_client()
+            _client_pid = os.getpid()
+        return _client
+
+
+def is_library_pdf(key):
+    return key.lower().endswith(".pdf")
+
+
+def fetch_library_listing(prefix=''):
+    """List every PDF under prefix from the bucket, sorted by name."""
+    bucket = os.environ["OCI_BUCKET"]
+    par_base = os.environ["PAR_BASE_URL"].rstrip('/')
+    s3 = get_s3_client()
+
+    objects = []
+    kwargs = {
+        "Bucket": bucket,
+        "Prefix": prefix
+    }
+
+    while True:
+        resp = s3.list_objects_v2(**kwargs)
+        for item in resp.get("Contents", []):
+            key = item["Key"]
+            if not is_library_pdf(key):
+                continue
+            # Build URL via bucket PAR
+            url = f"{par_base}/{quote(key)}"
+            objects.append({
+                "key": key,
+                "name": key.split('/')[-1],
+                "size": item.get("Size", 0),
+                "last_modified": item.get("LastModified").isoformat() if item.get("LastModified") else None,
+                "url": url
+            })
+
+        if resp.get("IsTruncated"):
+            kwargs["ContinuationToken"] = resp.get("NextContinuationToken")
+        else:
+            break
+
+    objects.sort(key=lambda x: x["name"].lower())
+    return objects
+
+
+def _store_listing(prefix, items):
+    etag = hashlib.sha256(json.dumps(items, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+    entry = {'items': items, 'etag': etag, 'fetched_at': time.monotonic()}
+    with _listing_lock:
+        _listings[prefix] = entry
+        _listings.move_to_end(prefix)
+        # Prefixes come from clients, so the cache is bounded: expired entries go first, then the least recent.
+        max_age = max(LIBRARY_LISTING_TTL_SECONDS or 0, LIBRARY_LISTING_STALE_SECONDS or 0)
+        for cached_prefix, cached_entry in list(_listings.items()):
+            expired = entry['fetched_at'] - cached_entry['fetched_at'] >= max_age
+            if expired and cached_prefix != prefix and cached_prefix not in _refreshing:
+                del _listings[cached_prefix]
+        while len(_listings) > max(1, LIBRARY_LISTING_CACHE_SIZE or 1):
+            _listings.popitem(last=False)
+    return entry
+
+
+def _refresh_listing_in_background(prefix):
+    try:
+        _store_listing(prefix, fetch_library_listing(prefix))
+    except Exception as refresh_error:
+        logging.warning("Background library refresh for prefix %r failed: %s", prefix, refresh_error)
+    finally:
+        with _listing_lock:
+            _refreshing.discard(prefix)
+
+
+def get_library_listing(prefix=''):
+    """
+    Return {'items', 'etag', 'fetched_at'} for prefix from the per-process cache.
+
+    Entries younger than LIBRARY_LISTING_TTL_SECONDS are served as is. Older
+    entries, up to LIBRARY_LISTING_STALE_SECONDS, are served while one
+    background thread refreshes them. Anything older is listed synchronously.
+    """
+    ttl = LIBRARY_LISTING_TTL_SECONDS
+    if not ttl or ttl <= 0:
+        return _store_listing(prefix, fetch_library_listing(prefix))
+
+    with _listing_lock:
+        entry = _listings.get(prefix)
+        if entry is not None:
+            _listings.move_to_end(prefix)
+        age = time.monotonic() - entry['fetched_at'] if entry else None
+        if entry is not None and age < ttl:
+            return entry
+        serve_stale = entry is not None and age < max(ttl, LIBRARY_LISTING_STALE_SECONDS or 0)
+        if serve_stale and prefix not in _refreshing:
+            _refreshing.add(prefix)
+            threading.Thread(
+                target=_refresh_listing_in_background,
+                args=(prefix,),
+                name="library-refresh",
+                daemon=True
+            ).start()
+    if serve_stale:
+        return entry
+    return _store_listing(prefix, fetch_library_listing(prefix))
+
+
+def is_missing_object_error(error):
+    """True for the botocore ClientError raised when a key does not exist."""
+    code = str(getattr(error, 'response', {}).get('Error', {}).get('Code', ''))
+    return code in ('404', 'NoSuchKey', 'NotFound')
+
+
+def head_library_object(key, s3=None):
+    """Return {'size': ..., 'etag': ...} for a library object."""
+    response = (s3 or get_s3_client()).head_object(Bucket=os.environ["OCI_BUCKET"], Key=key)
+    return {
+        'size': response.get('ContentLength', 0),
+        'etag': (response.get('ETag') or '').strip('"')
+    }
+
+
+def download_library_object(key, s3=None):
+    """
+    Stream a library object into a spooled temporary file and return it rewound.
+
+    Objects up to LIBRARY_SPOOL_MAX_BYTES stay in memory; larger ones spill to
+    disk instead of being held as one bytes object while they download.
+    """
+    response = (s3 or get_s3_client()).get_object(Bucket=os.environ["OCI_BUCKET"], Key=key)
+    body = response["Body"]
+    spool = tempfile.SpooledTemporaryFile(max_size=LIBRARY_SPOOL_MAX_BYTES)
+    try:
+        while True:
+            chunk = body.read(1024 * 1024)
+            if not chunk:
+                break
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    finally:
+        body.close()
+    spool.seek(0)
+    return spool
+
+
+class LibraryObjectReader(io.RawIOBase):
+    """
+    Seekable, read-only view of a library object backed by ranged GETs.
+
+    Reads are served from fixed-size blocks fetched on demand and kept for the
+    lifetime of the reader, so a PDF parser that jumps between the trailer,
+    cross-reference table and a few pages only downloads those regions.
+    """
+
+    def __init__(self, key, size, s3=None, block_size=None):
+        super().__init__()
+        self.key = key
+        self.size = size
+        self.block_size = max(4096, block_size or LIBRARY_RANGE_BLOCK_SIZE or 256 * 1024)
+        self.bytes_fetched = 0
+        self.requests = 0
+        self._s3 = s3 or get_s3_client()
+        self._bucket = os.environ["OCI_BUCKET"]
+        self._blocks = {}
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def _fetch_blocks(self, first_block, last_block):
+        start = first_block * self.block_size
+        end = min(self.size, (last_block + 1) * self.block_size) - 1
+        response = self._s3.get_object(Bucket=self._bucket, Key=self.key, Range=f"bytes={start}-{end}")
+        body = response["Body"]
+        try:
+            data = body.read()
+        finally:
+            body.close()
+        self.requests += 1
+        self.bytes_fetched += len(data)
+        for block in range(first_block, last_block + 1):
+            offset = (block - first_block) * self.block_size
+            self._blocks[block] = data[offset:offset + self.block_size]
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast('B')
+        if self._position >= self.size or not len(view):
+            return 0
+        end = min(self.size, self._position + len(view))
+        first_block = self._position // self.block_size
+        last_block = (end - 1) // self.block_size
+
+        # Fetch each run of missing blocks with a single ranged request.
+        block = first_block
+        while block <= last_block:
+            if block in self._blocks:
+                block += 1
+                continue
+            run_end = block
+            while run_end + 1 <= last_block and run_end + 1 not in self._blocks:
+                run_end += 1
+            self._fetch_blocks(block, run_end)
+            block = run_end + 1
+
+        written = 0
+        position = self._position
+        while position < end:
+            block, offset = divmod(position, self.block_size)
+            chunk = self._blocks[block][offset:offset + (end - position)]
+            view[written:written + len(chunk)] = chunk
+            written += len(chunk)
+            position += len(chunk)
+        self._position = position
+        return written
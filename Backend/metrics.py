@@ -0,0 +1,249 @@
+"""Prometheus metrics and opt-in per-request profiles for extraction and analysis stages.
+
+prometheus_client is optional: without it every metric is a no-op and
+/metrics reports that metrics are unavailable. Under gunicorn, set
+PROMETHEUS_MULTIPROC_DIR so each worker (and each pool process) writes its
+samples to files in that directory and /metrics aggregates all of them.
+
+time_stage() feeds both the stage histogram and, when a request opted in via
+profile_stages(), that request's breakdown in processingSummary.timings.
+"""
+
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    from .lazy_imports import import_module, import_optional
+except ImportError:
+    from lazy_imports import import_module, import_optional
+
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+EXTRACTION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+PROFILE_MODES = ('timings', 'memory')
+
+_prometheus = import_optional("prometheus_client")
+_active_profile = ContextVar('stage_profile', default=None)
+
+
+class _NoOpMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, amount):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+
+if _prometheus is not None:
+    EXTRACTION_SECONDS = _prometheus.Histogram(
+        'trendalyze_extraction_seconds',
+        'Text extraction time per document, by the engine that produced the text.',
+        ['engine'],
+        buckets=EXTRACTION_BUCKETS
+    )
+    STAGE_SECONDS = _prometheus.Histogram(
+        'trendalyze_analysis_stage_seconds',
+        'Analysis time per document and stage.',
+        ['stage'],
+        buckets=STAGE_BUCKETS
+    )
+    PAGE_SAMPLED_DOCUMENTS = _prometheus.Counter(
+        'trendalyze_page_sampled_documents',
+        'Analyzed documents whose pages were sampled because of MAX_PDF_PAGES.'
+    )
+    WORD_BUDGET_TRUNCATIONS = _prometheus.Counter(
+        'trendalyze_word_budget_truncations',
+        'Analyzed documents reduced to the word budget.'
+    )
+    PDFMINER_SKIPS = _prometheus.Counter(
+        'trendalyze_pdfminer_fallback_skips',
+        'PDFs without PyPDF2 text that were not sent to pdfminer.',
+        ['reason']
+    )
+    EXTRACTION_CACHE_EVENTS = _prometheus.Counter(
+        'trendalyze_extraction_cache_events',
+        'Extraction cache lookups and writes, by outcome (hit, miss, store, eviction, error).',
+        ['event']
+    )
+else:
+    EXTRACTION_SECONDS = STAGE_SECONDS = _NoOpMetric()
+    PAGE_SAMPLED_DOCUMENTS = WORD_BUDGET_TRUNCATIONS = PDFMINER_SKIPS = _NoOpMetric()
+    EXTRACTION_CACHE_EVENTS = _NoOpMetric()
+
+
+def is_enabled():
+    return _prometheus is not None
+
+
+class StageProfile:
+    """
+    Wall time and, in "memory" mode, tracemalloc peak of each stage in one request.
+
+    Peaks are measured above the traced memory at stage start. Nested stages
+    (word_budget inside prepare) are supported: the outer stage's peak is kept
+    across the tracemalloc.reset_peak() of the inner one. Repeated stages are
+    summed and their peak is the largest of the calls.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.trace_memory = mode == 'memory'
+        self.total_seconds = None
+        self._stages = {}
+        self._frames = []
+
+    @contextmanager
+    def measure(self, stage):
+        # Created on entry so stages are listed in the order they started.
+        entry = self._stages.setdefault(stage, {'stage': stage, 'seconds': 0.0, 'calls': 0})
+        frame = None
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._frames:
+                self._frames[-1]['peak'] = max(self._frames[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame = {'start': current, 'peak': current}
+            self._frames.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry['seconds'] += time.perf_counter() - started
+            entry['calls'] += 1
+            if frame is not None:
+                self._frames.pop()
+                stage_peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                entry['peak_bytes'] = max(entry.get('peak_bytes', 0), stage_peak - frame['start'])
+                if self._frames:
+                    self._frames[-1]['peak'] = max(self._frames[-1]['peak'], stage_peak)
+
+    def summary(self):
+        stages = []
+        for entry in self._stages.values():
+            stage = {'stage': entry['stage'], 'seconds': round(entry['seconds'], 4), 'calls': entry['calls']}
+            if 'peak_bytes' in entry:
+                stage['peakMemoryMb'] = round(entry['peak_bytes'] / 2**20, 2)
+            stages.append(stage)
+        return {
+            'mode': self.mode,
+            'totalSeconds': round(self.total_seconds or 0.0, 4),
+            'stages': stages
+        }
+
+
+def parse_profile_mode(value):
+    """Map a request's ``profile`` field to a PROFILE_MODES entry, or None when not requested."""
+    mode = str(value or '').strip().lower()
+    if mode in {'1', 'true', 'yes'}:
+        return 'timings'
+    return mode if mode in PROFILE_MODES else None
+
+
+@contextmanager
+def profile_stages(mode):
+    """
+    Collect a StageProfile of the enclosed block when mode is in PROFILE_MODES.
+
+    Yields None when profiling is off or an enclosing block already profiles,
+    so only the outermost caller attaches the result. "memory" mode starts
+    tracemalloc for the duration, which slows allocation-heavy stages.
+    """
+    if mode not in PROFILE_MODES or _active_profile.get() is not None:
+        yield None
+        return
+    profile = StageProfile(mode)
+    started_tracing = profile.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    token = _active_profile.set(profile)
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.total_seconds = time.perf_counter() - started
+        _active_profile.reset(token)
+        if started_tracing:
+            tracemalloc.stop()
+
+
+@contextmanager
+def record_stage(stage):
+    """Add the enclosed block to the active StageProfile only (no histogram)."""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    with profile.measure(stage):
+        yield
+
+
+def attach_stage_profile(response_payload, profile):
+    """Return response_payload with processingSummary.timings added (a copy, the stored payload is untouched)."""
+    if profile is None or response_payload is None:
+        return response_payload
+    response_payload = dict(response_payload)
+    processing_summary = dict(response_payload.get('processingSummary') or {})
+    processing_summary['timings'] = profile.summary()
+    response_payload['processingSummary'] = processing_summary
+    return response_payload
+
+
+@contextmanager
+def time_stage(stage):
+    """Observe the wall time of the enclosed block in trendalyze_analysis_stage_seconds (and the active profile)."""
+    started = time.perf_counter()
+    try:
+        with record_stage(stage):
+            yield
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - started)
+
+
+def observe_extraction(engine, started):
+    """Record an extraction that began at time.perf_counter() value started."""
+    EXTRACTION_SECONDS.labels(engine=engine).observe(time.perf_counter() - started)
+
+
+def count_document_limits(page_selection_meta, budget_info):
+    """Count page sampling and word-budget truncation once per analyzed document."""
+    if isinstance(page_selection_meta, dict) and page_selection_meta.get('sampled'):
+        PAGE_SAMPLED_DOCUMENTS.inc()
+    if (budget_info or {}).get('truncated'):
+        WORD_BUDGET_TRUNCATIONS.inc()
+
+
+def count_pdfminer_skip(reason):
+    PDFMINER_SKIPS.labels(reason=reason).inc()
+
+
+def count_extraction_cache_event(event, amount=1):
+    EXTRACTION_CACHE_EVENTS.labels(event=event).inc(amount)
+
+
+def render_metrics():
+    """
+    Return (body, content_type) in the Prometheus text format, or None without prometheus_client.
+
+    In multiprocess mode a fresh registry collects the files of every process;
+    otherwise this process's default registry is exported.
+    """
+    if _prometheus is None:
+        return None
+    registry = _prometheus.REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = _prometheus.CollectorRegistry()
+        import_module("prometheus_client.multiprocess").MultiProcessCollector(registry)
+    return _prometheus.generate_latest(registry), _prometheus.CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """Drop a finished worker's live-gauge files (gunicorn child_exit hook)."""
+    if _prometheus is not None and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        import_module("prometheus_client.multiprocess").mark_process_dead(pid)
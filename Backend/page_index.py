@@ -0,0 +1,47 @@
+"""Offset-to-page lookups over extracted page spans."""
+
+from bisect import bisect_right
+
+
+class PageIndex:
+    """
+    Map character offsets back to page numbers with a binary search.
+
+    Built once per document from the ``pages`` metadata produced during
+    extraction (dicts with ``number``, ``start`` and ``end``). Offsets that fall
+    outside every span (page separators, text past the last page) resolve to
+    the last page, matching the previous linear lookup.
+    """
+
+    __slots__ = ("_starts", "_ends", "_numbers")
+
+    def __init__(self, pages):
+        spans = sorted(
+            (
+                (page.get('start', 0), page.get('end', page.get('start', 0)), page.get('number'))
+                for page in (pages or [])
+                if page and 'number' in page
+            ),
+            key=lambda span: span[0]
+        )
+        self._starts = [span[0] for span in spans]
+        self._ends = [span[1] for span in spans]
+        self._numbers = [span[2] for span in spans]
+
+    @classmethod
+    def from_metadata(cls, text_metadata):
+        pages = []
+        if text_metadata and isinstance(text_metadata, dict):
+            pages = text_metadata.get('pages') or []
+        return cls(pages if isinstance(pages, list) else [])
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def page_for_offset(self, offset):
+        if not self._numbers:
+            return None
+        position = bisect_right(self._starts, offset) - 1
+        if position >= 0 and offset < self._ends[position]:
+            return self._numbers[position]
+        return self._numbers[-1]
@@ -0,0 +1,122 @@
+"""Inverted index over uploaded documents for the /search endpoint."""
+
+from array import array
+import re
+
+try:
+    from .constants import STRIP_CHARS
+    from .keyword_utils import compile_keyword_pattern, tokenize_keyword
+except ImportError:
+    from constants import STRIP_CHARS
+    from keyword_utils import compile_keyword_pattern, tokenize_keyword
+
+
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+')
+_WHITESPACE_WORD_PATTERN = re.compile(r'\S+')
+_WORD_CHARS_PATTERN = re.compile(r'\w+')
+_SUBPART_SPLIT_PATTERN = re.compile(r'[-_/\s]+')
+
+
+def iter_sentence_spans(text):
+    """Yield (start, end) spans matching re.split on the sentence boundary pattern."""
+    position = 0
+    for boundary in SENTENCE_BOUNDARY_PATTERN.finditer(text):
+        yield position, boundary.start()
+        position = boundary.end()
+    yield position, len(text)
+
+
+def index_tokens_for_word(word):
+    """
+    Return the index terms for one whitespace-delimited word.
+
+    Mirrors analyze_document (lowercase, STRIP_CHARS, -_/ sub-parts) and also
+    adds plain \\w+ runs so keywords next to other punctuation are still found.
+    """
+    stripped = word.lower().strip(STRIP_CHARS)
+    if not stripped:
+        return set()
+    tokens = {stripped}
+    for part in _SUBPART_SPLIT_PATTERN.split(stripped):
+        part = part.strip(STRIP_CHARS)
+        if part:
+            tokens.add(part)
+    tokens.update(_WORD_CHARS_PATTERN.findall(stripped))
+    return tokens
+
+
+def build_search_index(text):
+    """
+    Tokenize a document once at upload time.
+
+    Returns (sentences, postings): ``sentences`` is a list of
+    (sentence_id, start_offset, sentence_text), where start_offset is where the
+    stripped sentence_text begins in text, and ``postings`` maps each token
+    to a flat ``array('l')`` of (sentence_id, char_offset) pairs.
+    """
+    sentences = []
+    postings = {}
+    if not text:
+        return sentences, postings
+
+    for start, end in iter_sentence_spans(text):
+        sentence = text[start:end]
+        if not sentence.strip():
+            continue
+        sentence_id = len(sentences)
+        stripped = sentence.strip()
+        sentences.append((sentence_id, start + len(sentence) - len(sentence.lstrip()), stripped))
+        for word_match in _WHITESPACE_WORD_PATTERN.finditer(sentence):
+            offset = start + word_match.start()
+            for token in index_tokens_for_word(word_match.group(0)):
+                positions = postings.get(token)
+                if positions is None:
+                    positions = postings[token] = array('l')
+                positions.append(sentence_id)
+                positions.append(offset)
+    return sentences, postings
+
+
+def search_keyword(store, keyword):
+    """
+    Return {doc_id: [(sentence_id, offset, sentence_text), ...]} for a keyword.
+
+    Posting lists of all keyword tokens are intersected per sentence, then each
+    candidate sentence is verified with compile_keyword_pattern so multi-token
+    keywords behave like phrase queries in analyze_document.
+    """
+    tokens = tokenize_keyword(keyword)
+    pattern = compile_keyword_pattern(tokens)
+    if not pattern:
+        return {}
+
+    candidates = None
+    first_offsets = None
+    for token in dict.fromkeys(tokens):
+        token_hits = {}
+        for doc_id, positions in store.get_postings(token):
+            for idx in range(0, len(positions), 2):
+                token_hits.setdefault((doc_id, positions[idx]), positions[idx + 1])
+        if first_offsets is None:
+            first_offsets = token_hits
+            candidates = set(token_hits)
+        else:
+            candidates &= token_hits.keys()
+        if not candidates:
+            return {}
+
+    sentence_ids_by_doc = {}
+    for doc_id, sentence_id in candidates:
+        sentence_ids_by_doc.setdefault(doc_id, []).append(sentence_id)
+
+    results = {}
+    for doc_id, sentence_ids in sentence_ids_by_doc.items():
+        sentence_texts = store.get_sentences(doc_id, sorted(sentence_ids))
+        hits = [
+            (sentence_id, first_offsets.get((doc_id, sentence_id)), sentence_text)
+            for sentence_id, sentence_text in sentence_texts
+            if pattern.search(sentence_text)
+        ]
+        if hits:
+            results[doc_id] = hits
+    return results
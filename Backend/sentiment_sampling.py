@@ -0,0 +1,230 @@
+"""
+Page-sampled sentiment scoring with a bounded number of characters and a time budget.
+
+Only texts over the sentiment character limit are sampled; shorter ones are
+scored whole by analysis_service.analyze_sentiment_safe.
+
+TextBlob calls cannot be interrupted, so the time budget only limits which
+pages start scoring: a sample already running when it expires finishes on a
+discarded pool thread. SENTIMENT_MAX_SAMPLE_CHARS caps every sample so that
+leftover work stays small.
+"""
+
+import logging
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+try:
+    from .constants import (
+        SENTIMENT_MAX_SAMPLE_CHARS,
+        SENTIMENT_SAMPLE_PAGES,
+        SENTIMENT_TIME_BUDGET_SECONDS,
+        SENTIMENT_WORKERS,
+    )
+    from .lazy_imports import import_module
+    from .sampling_utils import select_evenly_spaced_indices
+except ImportError:
+    from constants import (
+        SENTIMENT_MAX_SAMPLE_CHARS,
+        SENTIMENT_SAMPLE_PAGES,
+        SENTIMENT_TIME_BUDGET_SECONDS,
+        SENTIMENT_WORKERS,
+    )
+    from lazy_imports import import_module
+    from sampling_utils import select_evenly_spaced_indices
+
+
+MIN_SAMPLE_CHARS = 500
+
+_executor_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+
+
+def _get_executor():
+    # TextBlob holds the GIL, so threads mostly give us a deadline rather than
+    # parallel speed-up; they avoid importing TextBlob again in another process.
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=SENTIMENT_WORKERS or 1,
+                thread_name_prefix="sentiment"
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _discard_executor(executor):
+    # Queued samples are dropped; running ones finish on the old threads while new requests get a fresh pool.
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def sample_chars_per_page(char_budget, sample_count=SENTIMENT_SAMPLE_PAGES):
+    """Split the overall character budget across the sampled pages, at most SENTIMENT_MAX_SAMPLE_CHARS each."""
+    per_page_chars = max(MIN_SAMPLE_CHARS, char_budget // max(1, sample_count or 1)) if char_budget else None
+    if SENTIMENT_MAX_SAMPLE_CHARS:
+        per_page_chars = min(per_page_chars or SENTIMENT_MAX_SAMPLE_CHARS, SENTIMENT_MAX_SAMPLE_CHARS)
+    return per_page_chars
+
+
+def clip_sample(text, max_chars):
+    """First max_chars characters of text, cut back to a word boundary when possible."""
+    text = (text or '').strip()
+    if not max_chars or len(text) <= max_chars:
+        return text
+    clipped = text[:max_chars]
+    boundary = clipped.rfind(' ')
+    if boundary > max_chars // 2:
+        clipped = clipped[:boundary]
+    return clipped.rstrip()
+
+
+def select_sentiment_samples(text, pages, char_budget, sample_count=SENTIMENT_SAMPLE_PAGES):
+    """
+    Pick up to sample_count evenly spaced (page_number, sample_text) pairs.
+
+    Page spans from the extraction metadata are used when the document has more
+    than one page. Single-page documents (DOCX, TXT) are cut into evenly spaced
+    windows instead, labelled with the page number of the whole document; a
+    text within char_budget is covered completely by windows of at most
+    SENTIMENT_MAX_SAMPLE_CHARS.
+    """
+    text = text or ''
+    per_page_chars = sample_chars_per_page(char_budget, sample_count)
+    spans = [
+        page for page in (pages or [])
+        if page and page.get('end', 0) > page.get('start', 0)
+    ]
+
+    if len(spans) > 1:
+        samples = []
+        for index in select_evenly_spaced_indices(len(spans), sample_count):
+            page = spans[index]
+            sample = clip_sample(text[max(0, page['start']):page['end']], per_page_chars)
+            if sample:
+                samples.append((page.get('number'), sample))
+        return samples, len(spans)
+
+    page_number = spans[0].get('number') if spans else None
+    if len(text) <= min(char_budget or len(text), SENTIMENT_MAX_SAMPLE_CHARS or len(text)):
+        sample = text.strip()
+        return ([(page_number, sample)] if sample else []), len(spans)
+
+    if not char_budget or len(text) <= char_budget:
+        per_page_chars = SENTIMENT_MAX_SAMPLE_CHARS
+        window_count = math.ceil(len(text) / per_page_chars)
+    else:
+        window_count = max(1, sample_count or 1)
+    stride = len(text) // window_count
+    samples = []
+    for index in range(window_count):
+        start = index * stride
+        if start:
+            # Start on a word boundary rather than mid-word.
+            next_space = text.find(' ', start, start + 200)
+            start = next_space + 1 if next_space != -1 else start
+        sample = clip_sample(text[start:start + per_page_chars], per_page_chars)
+        if sample:
+            samples.append((page_number, sample))
+    return samples, len(spans)
+
+
+def _score_sample(sample_text):
+    sentiment = import_module("textblob").TextBlob(sample_text).sentiment
+    return sentiment.polarity, sentiment.subjectivity
+
+
+def score_sentiment_samples(samples, time_budget=SENTIMENT_TIME_BUDGET_SECONDS):
+    """
+    Score samples on the sentiment pool and return (sentiment, scored, timed_out, error).
+
+    sentiment holds the character-weighted mean polarity and subjectivity plus a
+    per-page list. When the time budget runs out, samples still queued are
+    cancelled and the pool is discarded without waiting; samples already
+    running cannot be stopped and finish in the background. Either way they
+    are left out of the aggregate.
+    """
+    executor = _get_executor()
+    futures = {executor.submit(_score_sample, sample): (page, sample) for page, sample in samples}
+    done, not_done = wait(futures, timeout=time_budget or None)
+    if not_done:
+        _discard_executor(executor)
+
+    pages = []
+    weighted_polarity = 0.0
+    weighted_subjectivity = 0.0
+    total_chars = 0
+    error = None
+    # Report pages in document order regardless of completion order.
+    for future, (page_number, sample) in futures.items():
+        if future not in done:
+            continue
+        try:
+            polarity, subjectivity = future.result()
+        except Exception as exc:
+            logging.warning("Sentiment analysis failed for page %s: %s", page_number, exc)
+            error = str(exc)
+            continue
+        pages.append({'page': page_number, 'polarity': polarity, 'subjectivity': subjectivity})
+        weighted_polarity += polarity * len(sample)
+        weighted_subjectivity += subjectivity * len(sample)
+        total_chars += len(sample)
+
+    sentiment = {
+        'polarity': weighted_polarity / total_chars if total_chars else 0.0,
+        'subjectivity': weighted_subjectivity / total_chars if total_chars else 0.0,
+        'pages': pages
+    }
+    return sentiment, len(pages), bool(not_done), error
+
+
+def build_sentiment_sampling(char_budget, samples, total_pages, scored, timed_out, error=None):
+    sampled_chars = sum(len(sample) for _, sample in samples)
+    sampling = {
+        'mode': 'pages',
+        'sampled': len(samples) > 1 or total_pages > len(samples),
+        'maxChars': char_budget,
+        'maxCharsPerPage': sample_chars_per_page(char_budget),
+        'sampledChars': sampled_chars,
+        'totalPages': total_pages,
+        'samplePages': len(samples),
+        'scoredPages': scored,
+        'timedOut': timed_out
+    }
+    if error:
+        sampling['error'] = error
+    return sampling
+
+
+def analyze_sentiment_samples(samples, total_pages, char_budget):
+    if not samples:
+        return {'polarity': 0.0, 'subjectivity': 0.0, 'pages': []}, build_sentiment_sampling(
+            char_budget, samples, total_pages, 0, False
+        )
+    sentiment, scored, timed_out, error = score_sentiment_samples(samples)
+    if timed_out:
+        logging.warning(
+            "Sentiment time budget of %ss exhausted after %s of %s pages",
+            SENTIMENT_TIME_BUDGET_SECONDS,
+            scored,
+            len(samples)
+        )
+    return sentiment, build_sentiment_sampling(char_budget, samples, total_pages, scored, timed_out, error)
+
+
+def analyze_sentiment_sampled(text, pages, char_budget):
+    """
+    Sentiment over evenly spaced page samples; returns (sentiment, sentiment_sampling).
+
+    Covers the whole document with roughly char_budget characters in total,
+    instead of scoring only its first char_budget characters.
+    """
+    samples, total_pages = select_sentiment_samples(text, pages, char_budget)
+    return analyze_sentiment_samples(samples, total_pages, char_budget)
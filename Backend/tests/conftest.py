@@ -0,0 +1,30 @@
+"""Shared test setup: Backend on sys.path, throwaway storage paths and a PDF builder."""
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# constants.py reads these at import time, so they are set before any Backend module loads.
+_STATE_DIR = tempfile.mkdtemp(prefix="trendalyze-tests-")
+os.environ.setdefault("DOCUMENT_STORE", "memory")
+os.environ.setdefault("EXTRACTION_CACHE_DIR", os.path.join(_STATE_DIR, "extraction-cache"))
+os.environ.setdefault("EXTRACTION_CACHE_MAX_BYTES", "none")  # Tests reuse the same PDFs across paths
+os.environ.setdefault("WORDCLOUD_CACHE_DIR", os.path.join(_STATE_DIR, "wordclouds"))
+os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(_STATE_DIR, "jobs.sqlite3"))
+os.environ.setdefault("JOB_SPOOL_DIR", os.path.join(_STATE_DIR, "job-spool"))
+
+import pytest  # noqa: E402
+
+from benchmarks.pipeline import build_page_texts, build_pdf  # noqa: E402
+
+
+@pytest.fixture
+def make_pdf():
+    """Build a deterministic text PDF: make_pdf(pages, density=0.002, seed=1, image_seed=None)."""
+    def factory(pages, density=0.002, seed=1, image_seed=None):
+        return build_pdf(build_page_texts(pages, density, seed), image_seed=image_seed)
+    return factory
@@ -0,0 +1,52 @@
+"""In-memory stand-in for the boto3 S3 client calls library_storage makes."""
+
+import io
+import re
+
+_RANGE_PATTERN = re.compile(r"bytes=(\d+)-(\d+)")
+
+
+class FakeClientError(Exception):
+    """Shaped like botocore's ClientError as far as is_missing_object_error looks."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}}
+
+
+class FakeS3Client:
+    def __init__(self, objects=None, page_size=1000):
+        self.objects = dict(objects or {})
+        self.page_size = page_size
+        self.range_requests = []
+        self.full_downloads = 0
+        self.list_calls = 0
+
+    def _lookup(self, Bucket, Key):
+        if Key not in self.objects:
+            raise FakeClientError('404' if Bucket else 'NoSuchBucket')
+        return self.objects[Key]
+
+    def head_object(self, Bucket, Key):
+        data = self._lookup(Bucket, Key)
+        return {'ContentLength': len(data), 'ETag': f'"etag-{len(data)}"'}
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self._lookup(Bucket, Key)
+        if Range is None:
+            self.full_downloads += 1
+            return {'Body': io.BytesIO(data), 'ContentLength': len(data)}
+        start, end = (int(value) for value in _RANGE_PATTERN.fullmatch(Range).groups())
+        self.range_requests.append((start, end))
+        chunk = data[start:end + 1]
+        return {'Body': io.BytesIO(chunk), 'ContentLength': len(chunk)}
+
+    def list_objects_v2(self, Bucket, Prefix='', ContinuationToken=None):
+        self.list_calls += 1
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + self.page_size]
+        response = {'Contents': [{'Key': key, 'Size': len(self.objects[key])} for key in page]}
+        if start + self.page_size < len(keys):
+            response.update({'IsTruncated': True, 'NextContinuationToken': str(start + self.page_size)})
+        return response
@@ -0,0 +1,128 @@
+import io
+import json
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import analysis_pipeline
+import app as app_module
+import batch_analysis
+from fake_s3 import FakeS3Client
+from library_storage import LIBRARY_REQUIRED_ENV
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def fresh_pool(monkeypatch):
+    """A pool forked after the test's patches, shut down afterwards."""
+    monkeypatch.setattr(batch_analysis, "_executor", None)
+    yield
+    if batch_analysis._executor is not None:
+        batch_analysis._executor.shutdown(wait=True)
+
+
+def read_lines(response):
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_streams_one_line_per_document_and_a_corpus_summary(client, make_pdf, fresh_pool):
+    files = [
+        (io.BytesIO(make_pdf(3, density=0.03, seed=1)), 'a.pdf'),
+        (io.BytesIO(make_pdf(2, density=0.03, seed=2)), 'b.pdf'),
+        (io.BytesIO(b"We use Blockchain for customs. Robotics pilots stopped."), 'c.txt'),
+        (io.BytesIO(b"not a pdf"), 'broken.pdf'),
+    ]
+    response = client.post(
+        '/analyze-batch',
+        data={'files': files, 'buzzwords': 'Blockchain, Robotics'},
+        content_type='multipart/form-data'
+    )
+    lines = read_lines(response)
+
+    documents = [line for line in lines if line['type'] == 'document']
+    assert sorted(line['filename'] for line in documents) == ['a.pdf', 'b.pdf', 'broken.pdf', 'c.txt']
+    assert [line['completed'] for line in documents] == [1, 2, 3, 4]
+    failed = [line for line in documents if line['status'] == 'failed']
+    assert [line['filename'] for line in failed] == ['broken.pdf']
+
+    summary = lines[-1]
+    assert summary['type'] == 'summary'
+    assert summary['corpus']['documents'] == 3 and summary['corpus']['failed'] == 1
+    for label in ('Blockchain', 'Robotics'):
+        assert summary['corpus']['frequencies'][label] == sum(
+            line['result']['frequencies'][label] for line in documents if line['status'] == 'done'
+        )
+    assert [name for name in os.listdir(batch_analysis.JOB_SPOOL_DIR) if name.startswith('batch-')] == []
+
+
+def test_batch_reads_library_keys_from_object_storage(client, make_pdf, monkeypatch, fresh_pool):
+    for name in LIBRARY_REQUIRED_ENV:
+        monkeypatch.setenv(name, "test")
+    s3 = FakeS3Client({'reports/2024.pdf': make_pdf(2, density=0.03)})
+    monkeypatch.setattr(analysis_pipeline, "get_s3_client", lambda: s3)
+
+    lines = read_lines(client.post('/analyze-batch', json={'libraryKeys': ['reports/2024.pdf'], 'buzzwords': 'AI'}))
+    assert lines[0]['library_key'] == 'reports/2024.pdf' and lines[0]['status'] == 'done'
+    assert lines[0]['filename'] == '2024.pdf'
+    assert lines[-1]['corpus']['documents'] == 1
+
+
+def test_batch_rejects_unsupported_and_oversized_requests(client, monkeypatch):
+    assert client.post('/analyze-batch', json={'buzzwords': 'AI'}).status_code == 400
+    response = client.post('/analyze-batch', json={'libraryKeys': ['notes.docx']})
+    assert response.status_code == 400 and response.get_json()['documents'] == ['notes.docx']
+    monkeypatch.setattr(app_module, "BATCH_MAX_DOCUMENTS", 2)
+    assert client.post('/analyze-batch', json={'libraryKeys': 'a.pdf,b.pdf,c.pdf'}).status_code == 400
+
+
+class BrokenAfterFirstExecutor:
+    """Completes the first item and fails the rest the way a pool with a killed child does."""
+
+    def __init__(self):
+        self.submitted = 0
+        self.shut_down = False
+
+    def submit(self, fn, item, *args):
+        future = Future()
+        self.submitted += 1
+        if self.submitted == 1:
+            future.set_result({'filename': item['filename'], 'status': 'done', 'result': {'frequencies': {'ai': 2}}})
+        else:
+            future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_reports_failed_documents_and_a_summary(monkeypatch, tmp_path):
+    executor = BrokenAfterFirstExecutor()
+    monkeypatch.setattr(batch_analysis, "_executor", executor)
+    monkeypatch.setattr(batch_analysis, "_executor_pid", batch_analysis.os.getpid())
+    spool = tmp_path / "upload.pdf"
+    spool.write_bytes(b"%PDF")
+    items = [
+        {'filename': 'a.pdf'},
+        {'filename': 'b.pdf', 'spool_path': str(spool)},
+        {'library_key': 'reports/c.pdf'},
+    ]
+
+    lines = [json.loads(line) for line in batch_analysis.iter_batch_results(items, ['ai'])]
+
+    documents = [line for line in lines if line['type'] == 'document']
+    assert len(documents) == 3
+    assert sorted(line['status'] for line in documents) == ['done', 'failed', 'failed']
+    assert {line['filename'] for line in documents if line['status'] == 'failed'} == {'b.pdf', 'c.pdf'}
+    assert lines[-1]['type'] == 'summary'
+    assert lines[-1]['corpus']['documents'] == 1 and lines[-1]['corpus']['failed'] == 2
+    assert not spool.exists()
+    # The broken pool is dropped so the next batch starts a fresh one.
+    assert executor.shut_down and batch_analysis._executor is None
@@ -0,0 +1,35 @@
+import argparse
+import io
+
+import pytest
+
+from benchmarks import pipeline
+from document_processing import extract_document
+
+
+def normalized_words(text):
+    return text.replace('\f', ' ').split()
+
+
+@pytest.mark.parametrize("file_format", pipeline.FORMATS)
+def test_generated_documents_extract_to_their_page_texts(file_format):
+    if file_format == 'docx':
+        pytest.importorskip("docx")
+    pages = pipeline.build_page_texts(3, pipeline.DENSITIES['dense'], seed=4)
+    file_bytes = pipeline.generate_file({'format': file_format, 'pages': 3, 'density': 'dense', 'images': False}, 4)
+    text, _metadata = extract_document(f"corpus.{file_format}", io.BytesIO(file_bytes))
+    assert normalized_words(text) == normalized_words(" ".join(line for lines in pages for line in lines))
+
+
+def test_small_cases_agree_and_compare_flags_payload_changes(capsys):
+    args = argparse.Namespace(
+        formats=['pdf', 'txt'], pages=[3], densities=['dense'], image_pages=0, repeat=1, seed=21
+    )
+    results = {'cases': [pipeline.run_case(case, args) for case in pipeline.build_cases(args)]}
+    assert [case['name'] for case in results['cases']] == ['pdf-3p-dense', 'txt-3p-dense']
+    assert not any(case.get('mismatch') for case in results['cases'])
+
+    assert pipeline.compare(results, results) == []
+    baseline = {'cases': [dict(results['cases'][0], payload_sha256='0' * 64), results['cases'][1]]}
+    assert pipeline.compare(results, baseline) == ['pdf-3p-dense']
+    assert 'PAYLOAD CHANGED' in capsys.readouterr().out
@@ -0,0 +1,14 @@
+from analysis_service import build_keyword_specs, iter_lower_tokens, tokenize_lower_text
+from benchmarks.collocation_memory import build_document, keyword_collocations, legacy_collocations
+
+
+def test_keyword_driven_collocations_match_the_token_index():
+    text = build_document(20_000, 2_000, seed=3)
+    keyword_specs = build_keyword_specs(["cloud", "edge", "data", "driven", "term7", "machine learning", "absent"])
+    assert keyword_collocations(text, keyword_specs) == legacy_collocations(text, keyword_specs)
+
+
+def test_chunked_tokenization_matches_a_single_split():
+    text = build_document(5_000, 300, seed=8).lower() + "  trailing,  (words)  "
+    for chunk_size in (1, 7, 64, 10_000_000):
+        assert list(iter_lower_tokens(text, chunk_size)) == tokenize_lower_text(text), chunk_size
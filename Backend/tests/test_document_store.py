@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+
+from document_store import DocumentStore, InMemoryDocumentStore, SQLiteDocumentStore
+from search_index import build_search_index
+
+TEXT = "Ports adopt AI. Digital twin pilots grew! Cranes are electric now?"
+
+
+def test_document_store_is_abstract():
+    with pytest.raises(TypeError):
+        DocumentStore()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryDocumentStore()
+    return SQLiteDocumentStore(str(tmp_path / "documents.sqlite3"))
+
+
+def test_documents_round_trip(store):
+    analysis = {'frequencies': {'AI': 1}}
+    doc_id = store.add_document("ports.txt", TEXT, 11, analysis, {'pages': []})
+    store.add_document("empty.txt", "", 0, None, None)
+
+    assert store.count() == 2
+    assert store.list_documents()[0] == {'id': doc_id, 'filename': "ports.txt", 'word_count': 11}
+    assert store.get_text(doc_id) == TEXT
+    document = store.get_document(doc_id)
+    assert (document['text'], document['analysis_result'], document['metadata']) == (TEXT, analysis, {'pages': []})
+    assert store.get_document("doc_999") is None
+    assert store.get_text("not-an-id") is None
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "documents.sqlite3")
+    doc_id = SQLiteDocumentStore(path).add_document("ports.txt", TEXT, 11, {}, None)
+    other_worker = SQLiteDocumentStore(path)
+    assert [document['id'] for document in other_worker.list_documents()] == [doc_id]
+    assert other_worker.get_text(doc_id) == TEXT
+
+
+def test_sqlite_store_keeps_no_sentence_text(tmp_path):
+    path = str(tmp_path / "documents.sqlite3")
+    store = SQLiteDocumentStore(path)
+    doc_id = store.add_document("ports.txt", TEXT, 11, {}, None)
+    sentences, postings = build_search_index(TEXT)
+    store.index_document(doc_id, sentences, postings)
+
+    columns = [row[1] for row in sqlite3.connect(path).execute("PRAGMA table_info(sentence_spans)")]
+    assert columns == ["document_id", "sentence_id", "start_offset", "length"]
+    expected = [(sentence_id, text) for sentence_id, _start, text in sentences]
+    assert store.get_sentences(doc_id, [0, 1, 2]) == expected
+
+
+def test_sqlite_sentences_span_text_blocks(tmp_path, monkeypatch):
+    import document_store
+
+    monkeypatch.setattr(document_store, "TEXT_BLOCK_CHARS", 16)
+    store = SQLiteDocumentStore(str(tmp_path / "documents.sqlite3"))
+    doc_id = store.add_document("ports.txt", TEXT, 11, {}, None)
+    sentences, postings = build_search_index(TEXT)
+    store.index_document(doc_id, sentences, postings)
+
+    assert store.get_text(doc_id) == TEXT
+    assert store.get_document(doc_id)['text'] == TEXT
+    expected = [(sentence_id, text) for sentence_id, _start, text in sentences]
+    assert store.get_sentences(doc_id, [0, 1, 2]) == expected
+
+
+def test_sqlite_sentence_lookup_decompresses_only_needed_blocks(tmp_path, monkeypatch):
+    import zlib
+
+    import document_store
+
+    monkeypatch.setattr(document_store, "TEXT_BLOCK_CHARS", 64)
+    text = " ".join(f"Sentence number {index} mentions cranes." for index in range(100))
+    store = SQLiteDocumentStore(str(tmp_path / "documents.sqlite3"))
+    doc_id = store.add_document("long.txt", text, 500, {}, None)
+    sentences, postings = build_search_index(text)
+    store.index_document(doc_id, sentences, postings)
+
+    decompressed = []
+
+    class CountingZlib:
+        compress = staticmethod(zlib.compress)
+
+        @staticmethod
+        def decompress(data):
+            decompressed.append(len(data))
+            return zlib.decompress(data)
+
+    monkeypatch.setattr(document_store, "zlib", CountingZlib)
+    assert store.get_sentences(doc_id, [50]) == [(50, sentences[50][2])]
+    assert 1 <= len(decompressed) <= 2
+    assert len(text) // 64 > 10
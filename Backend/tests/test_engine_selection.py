@@ -0,0 +1,86 @@
+import io
+
+import pytest
+
+import app as app_module
+import document_processing
+from benchmarks.pipeline import build_pdf
+
+
+@pytest.fixture(autouse=True)
+def clear_engine_choices():
+    document_processing._engine_choices.clear()
+    yield
+    document_processing._engine_choices.clear()
+
+
+def test_choose_pdf_engine_prefers_fastest_near_best_yield():
+    probe = {
+        'pymupdf': {'words': 10, 'seconds': 0.01},
+        'pypdf2': {'words': 100, 'seconds': 0.05},
+        'pdfminer': {'words': 90, 'seconds': 0.02},
+    }
+    assert document_processing.choose_pdf_engine(probe) == 'pdfminer'
+    assert document_processing.choose_pdf_engine({'pypdf2': {'words': 0, 'seconds': 0.01}}) is None
+
+
+def test_probe_stops_at_first_engine_with_good_yield(make_pdf):
+    decision = document_processing.select_pdf_engine(make_pdf(6))
+    assert list(decision['probe']) == document_processing.available_pdf_engines(make_pdf(6), 6)[:1]
+    assert decision['engine'] == list(decision['probe'])[0]
+    assert decision['cached'] is False
+    assert document_processing.select_pdf_engine(make_pdf(6))['cached'] is True
+
+
+def test_selected_engine_matches_the_chain_output(make_pdf, monkeypatch):
+    monkeypatch.setattr(document_processing, "load_fitz", lambda: None)
+    pdf = make_pdf(6, density=0.03)
+    text, metadata = document_processing.extract_text_pdf_bytes(pdf, 4)
+    assert metadata['engine'] == metadata['engine_selection']['engine'] == 'pypdf2'
+
+    chain_text, chain_metadata, engine = document_processing.extract_text_pdf_chain(pdf, 4)
+    assert engine == 'pypdf2'
+    assert (text, metadata['pages']) == (chain_text, chain_metadata['pages'])
+
+
+def test_probe_without_text_falls_back_to_the_chain():
+    text, metadata = document_processing.extract_text_pdf_bytes(build_pdf([[""]] * 3), None)
+    assert not text.strip()
+    assert metadata['engine_selection']['engine'] is None
+    assert metadata['pages'] and metadata['page_selection']['total_pages'] == 3
+
+
+def test_analyze_reports_the_extraction_engine(make_pdf, monkeypatch):
+    client = app_module.app.test_client()
+
+    def analyze():
+        response = client.post(
+            '/analyze',
+            data={'file': (io.BytesIO(make_pdf(3, seed=24)), 'engine.pdf')},
+            content_type='multipart/form-data'
+        )
+        return response.get_json()
+
+    fastest = 'pymupdf' if document_processing.load_fitz() else 'pypdf2'
+    assert analyze()['extractionEngine'] == fastest
+    monkeypatch.setattr(document_processing, "PDF_ENGINE_SELECTION", "chain")
+    document_processing._engine_choices.clear()
+    assert analyze()['extractionEngine'] == fastest
+    assert document_processing._engine_choices == {}
+
+
+def test_pdfminer_is_not_probed_above_the_byte_limit(monkeypatch):
+    if document_processing.load_pdfminer_extract_text() is None:
+        pytest.skip("pdfminer.six is not installed")
+    # No engine finds text here, so every allowed engine is probed.
+    empty_pdf = build_pdf([""] * 5)
+    assert 'pdfminer' in document_processing.select_pdf_engine(empty_pdf)['probe']
+
+    document_processing._engine_choices.clear()
+    monkeypatch.setattr(document_processing, "PDF_PDFMINER_MAX_BYTES", len(empty_pdf) - 1)
+    assert 'pdfminer' not in document_processing.select_pdf_engine(empty_pdf)['probe']
+
+
+def test_pdfminer_is_not_probed_above_the_page_limit(make_pdf, monkeypatch):
+    monkeypatch.setattr(document_processing, "PDF_PDFMINER_MAX_PAGES", 4)
+    assert 'pdfminer' not in document_processing.available_pdf_engines(make_pdf(5), 5)
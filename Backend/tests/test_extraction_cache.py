@@ -0,0 +1,73 @@
+import io
+import os
+import time
+
+import pytest
+
+import document_processing
+import extraction_cache
+import metrics
+
+
+def cache_events(event):
+    if not metrics.is_enabled():
+        return 0.0
+    return metrics._prometheus.REGISTRY.get_sample_value(
+        'trendalyze_extraction_cache_events_total', {'event': event}
+    ) or 0.0
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    return tmp_path
+
+
+def test_repeat_extraction_is_served_from_cache(cache_dir, make_pdf, monkeypatch):
+    pdf = make_pdf(4)
+    text, metadata = document_processing.extract_text_pdf(io.BytesIO(pdf), return_metadata=True)
+    hits, misses = cache_events('hit'), cache_events('miss')
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("a cache hit must not extract again")
+
+    monkeypatch.setattr(document_processing, "extract_text_pdf_bytes", fail)
+    cached_text, cached_metadata = document_processing.extract_text_pdf(io.BytesIO(pdf), return_metadata=True)
+
+    assert (cached_text, cached_metadata) == (text, metadata)
+    if metrics.is_enabled():
+        assert (cache_events('hit'), cache_events('miss')) == (hits + 1, misses)
+
+
+def test_page_limit_is_part_of_the_key(cache_dir, make_pdf):
+    pdf = make_pdf(6)
+    full_text = document_processing.extract_text_pdf(io.BytesIO(pdf), page_limit_override=None)
+    _text, metadata = document_processing.extract_text_pdf(
+        io.BytesIO(pdf), return_metadata=True, page_limit_override=2
+    )
+    assert metadata["page_selection"]["processed_pages"] == 2
+    assert len(os.listdir(cache_dir)) == 2
+    assert document_processing.extract_text_pdf(io.BytesIO(pdf), page_limit_override=None) == full_text
+
+
+def test_evict_to_limit_drops_least_recently_used_entries(cache_dir):
+    for age, key in ((300, "old"), (200, "touched"), (100, "recent")):
+        extraction_cache.store_extraction(key, "x" * 2000, {"pages": 1})
+        path = cache_dir / f"{key}.json.gz"
+        os.utime(path, (time.time() - age, time.time() - age))
+    assert extraction_cache.get_cached_extraction("touched") is not None
+
+    kept_size = sum((cache_dir / f"{key}.json.gz").stat().st_size for key in ("touched", "recent"))
+    evictions = cache_events('eviction')
+    extraction_cache.evict_to_limit(kept_size)
+    if metrics.is_enabled():
+        assert cache_events('eviction') == evictions + 1
+    assert sorted(os.listdir(cache_dir)) == ["recent.json.gz", "touched.json.gz"]
+
+
+def test_cache_is_disabled_without_a_size_bound(cache_dir, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_MAX_BYTES", None)
+    extraction_cache.store_extraction("key", "text", {})
+    assert extraction_cache.get_cached_extraction("key") is None
+    assert os.listdir(cache_dir) == []
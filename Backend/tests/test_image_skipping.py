@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import document_processing
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def image_pdf(make_pdf):
+    return make_pdf(3, density=0.03, image_seed=5)
+
+
+def test_skipping_images_does_not_change_the_text(image_pdf):
+    reader = document_processing.open_pypdf2_reader(image_pdf)
+    expected, _ = document_processing.assemble_page_texts([0, 1, 2], [page.extract_text() for page in reader.pages])
+    text, _metadata, page_count = document_processing.extract_text_pypdf2(image_pdf, None)
+    assert page_count == 3
+    assert text == expected and text.strip()
+
+
+def test_images_are_replaced_without_loading_their_streams(image_pdf, monkeypatch):
+    reader = document_processing.open_pypdf2_reader(image_pdf)
+    generic = document_processing.load_pypdf2().generic
+    references = [
+        candidate
+        for page in reader.pages
+        for candidate in page["/Resources"]["/XObject"].values()
+    ]
+    assert len(references) == 3
+    assert {document_processing.peek_xobject_subtype(reader, reference) for reference in references} == {"/Image"}
+
+    loaded = []
+    original_get_object = reader.get_object
+    monkeypatch.setattr(reader, "get_object", lambda ref: loaded.append(ref) or original_get_object(ref))
+    visited = set()
+    skipped = sum(
+        document_processing.skip_image_xobjects(reader, page["/Resources"], visited) for page in reader.pages
+    )
+    assert skipped == 3
+    assert not {reference.idnum for reference in references} & {getattr(ref, "idnum", ref) for ref in loaded}
+    for page in reader.pages:
+        placeholder = next(iter(page["/Resources"]["/XObject"].values()))
+        assert isinstance(placeholder, generic.DictionaryObject) and "/Filter" not in placeholder
+
+
+def test_reading_an_image_pdf_stays_small_in_memory(image_pdf, tmp_path):
+    # A fresh interpreter, so background renders of earlier tests do not count towards the peak.
+    pdf_path = tmp_path / "images.pdf"
+    pdf_path.write_bytes(image_pdf)
+    script = textwrap.dedent(f"""
+        import tracemalloc
+        import document_processing
+
+        file_bytes = open({str(pdf_path)!r}, 'rb').read()
+        document_processing.load_pypdf2()
+        tracemalloc.start()
+        document_processing.extract_text_pypdf2(file_bytes, None)
+        print(tracemalloc.get_traced_memory()[1])
+    """)
+    completed = subprocess.run(
+        [sys.executable, '-c', script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    assert len(image_pdf) > 3 * 2**20
+    assert int(completed.stdout.split()[-1]) < len(image_pdf) / 4
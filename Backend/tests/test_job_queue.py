@@ -0,0 +1,121 @@
+import io
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import pytest
+
+import app as app_module
+import job_queue
+
+
+def insert_job(status, updated_at, owner_pid):
+    job_id = uuid.uuid4().hex
+    connection = job_queue._connect()
+    try:
+        with connection:
+            connection.execute(
+                """
+                INSERT INTO jobs (id, filename, status, created_at, updated_at, owner_pid)
+                VALUES (?, 'report.pdf', ?, ?, ?, ?)
+                """,
+                (job_id, status, updated_at, updated_at, owner_pid)
+            )
+    finally:
+        connection.close()
+    return job_id
+
+
+@pytest.fixture(scope="module")
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def post_analyze(client, pdf, **fields):
+    form = {'file': (io.BytesIO(pdf), 'report.pdf'), 'buzzwords': 'Blockchain', **fields}
+    return client.post('/analyze', data=form, content_type='multipart/form-data')
+
+
+def wait_for_job(client, status_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(status_url).get_json()
+        if job['status'] not in ('queued', 'running') or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_async_upload_runs_as_a_job_and_returns_the_synchronous_payload(client, make_pdf, monkeypatch):
+    monkeypatch.setattr(app_module, "ASYNC_ANALYSIS_MIN_BYTES", 1)
+    pdf = make_pdf(6, density=0.02)
+    queued = post_analyze(client, pdf, **{'async': 'true'})
+    assert queued.status_code == 202
+
+    job = wait_for_job(client, queued.get_json()['status_url'])
+    assert job['status'] == 'done'
+    assert job['progress'] == {'pagesDone': 6, 'pagesTotal': 6}
+    synchronous = post_analyze(client, pdf).get_json()
+    for field in ('frequencies', 'trends', 'pageMap', 'pageSelection'):
+        assert job['result'][field] == synchronous[field], field
+    assert os.listdir(job_queue.JOB_SPOOL_DIR) == []
+
+
+def test_small_uploads_stay_synchronous(client, make_pdf, monkeypatch):
+    monkeypatch.setattr(app_module, "ASYNC_ANALYSIS_MIN_BYTES", 10 * 1024 * 1024)
+    response = post_analyze(client, make_pdf(2), **{'async': 'true'})
+    assert response.status_code == 200
+    assert 'frequencies' in response.get_json()
+
+
+def test_unknown_job_is_404(client):
+    assert client.get('/jobs/does-not-exist').status_code == 404
+
+
+def test_long_wait_in_queue_is_not_reported_as_failed(monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_STALE_SECONDS", 60)
+    job_id = insert_job('queued', time.time() - 3600, job_queue.os.getpid())
+    assert job_queue.get_job(job_id)['status'] == 'queued'
+
+
+def test_queued_job_fails_once_its_owner_is_gone(dead_pid):
+    job_id = insert_job('queued', time.time(), dead_pid)
+    job = job_queue.get_job(job_id)
+    assert job['status'] == 'failed'
+    assert job['error'] == 'Job was interrupted before it finished'
+
+
+def test_running_job_without_progress_goes_stale(monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_STALE_SECONDS", 60)
+    stale = insert_job('running', time.time() - 3600, job_queue.os.getpid())
+    fresh = insert_job('running', time.time(), job_queue.os.getpid())
+    assert job_queue.get_job(stale)['status'] == 'failed'
+    assert job_queue.get_job(fresh)['status'] == 'running'
+
+
+def test_running_job_fails_when_its_pool_process_died(dead_pid):
+    assert job_queue.get_job(insert_job('running', time.time(), dead_pid))['status'] == 'failed'
+
+
+def test_schema_is_created_once_per_process(monkeypatch):
+    job_queue._connect().close()
+    statements = []
+    real_connect = job_queue.sqlite3.connect
+
+    def tracing_connect(*args, **kwargs):
+        connection = real_connect(*args, **kwargs)
+        connection.set_trace_callback(statements.append)
+        return connection
+
+    monkeypatch.setattr(job_queue.sqlite3, "connect", tracing_connect)
+    insert_job('queued', time.time(), os.getpid())
+    assert statements
+    assert not any("CREATE TABLE" in statement or "journal_mode" in statement for statement in statements)
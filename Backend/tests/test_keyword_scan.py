@@ -0,0 +1,56 @@
+import pytest
+
+from analysis_service import build_combined_keyword_regex, build_keyword_specs, iter_pattern_matches
+from benchmarks.keyword_scan import CHUNK_SIZES, KEYWORDS, OVERLAP, build_corpus
+
+PATTERN, _ = build_combined_keyword_regex(build_keyword_specs(KEYWORDS))
+
+
+def unchunked(text):
+    return [(m.start(), m.end(), m.lastgroup) for m in PATTERN.finditer(text)]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_chunked_scan_equals_unchunked_scan(chunk_size):
+    for seed in range(25):
+        text = build_corpus(300, seed)
+        assert list(iter_pattern_matches(PATTERN, text, chunk_size=chunk_size, overlap=OVERLAP)) == unchunked(text)
+
+
+def test_matches_spanning_a_chunk_boundary_are_reported_once():
+    chunk_size, overlap = 64, 20
+    keyword = "cloud computing"
+    # Slide the keyword across the first window's end and its accept-before point.
+    for offset in range(chunk_size - overlap - len(keyword) - 2, chunk_size + 2):
+        text = "x" * offset + " " + keyword + " " + "filler " * 40
+        matches = list(iter_pattern_matches(PATTERN, text, chunk_size=chunk_size, overlap=overlap))
+        assert matches == unchunked(text)
+        assert [text[start:end] for start, end, _ in matches] == [keyword]
+
+
+def test_resumed_window_does_not_match_inside_a_word():
+    chunk_size, overlap = 40, 4
+    for offset in range(chunk_size - 2 * overlap, chunk_size + 1):
+        text = "-" * offset + " xai aix " + "z " * 40 + "ai"
+        assert list(iter_pattern_matches(PATTERN, text, chunk_size=chunk_size, overlap=overlap)) == unchunked(text)
+
+
+def test_overlap_edge():
+    keyword = "machine-learning"
+    text_tail = " " + "filler " * 30
+    for overlap in (len(keyword) + 1, len(keyword), 1, 0, None):
+        chunk_size = max(48, 2 * (overlap or 1))
+        for offset in range(chunk_size - 2 * len(keyword), chunk_size + 1):
+            text = "y" * offset + " " + keyword + text_tail
+            matches = list(iter_pattern_matches(PATTERN, text, chunk_size=chunk_size, overlap=overlap))
+            starts = [start for start, _, _ in matches]
+            # Never reported twice, whatever the overlap.
+            assert starts == sorted(set(starts))
+            if overlap and overlap > len(keyword):
+                assert matches == unchunked(text)
+
+
+@pytest.mark.parametrize("chunk_size", [None, 0, -1, 10_000])
+def test_unchunked_settings_scan_in_one_pass(chunk_size):
+    text = build_corpus(200, 3)
+    assert list(iter_pattern_matches(PATTERN, text, chunk_size=chunk_size, overlap=OVERLAP)) == unchunked(text)
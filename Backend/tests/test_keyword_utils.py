@@ -0,0 +1,42 @@
+import random
+import re
+
+from keyword_utils import WORD_PATTERN, build_snippet, build_word_offsets, compile_keyword_pattern, tokenize_keyword
+
+
+def linear_snippet(text, start, end, word_spans, window=5):
+    """The match-list implementation build_snippet replaced."""
+    def index_at_or_after(position):
+        for idx, match in enumerate(word_spans):
+            if match.start() <= position < match.end():
+                return idx
+            if match.start() > position:
+                return idx
+        return len(word_spans)
+
+    start_idx = index_at_or_after(start)
+    end_idx = index_at_or_after(end)
+    left_words = [m.group(0) for m in word_spans[max(0, start_idx - window):start_idx]]
+    right_words = [m.group(0) for m in word_spans[end_idx:end_idx + window]]
+    parts = [part for part in (" ".join(left_words), text[start:end].strip(), " ".join(right_words)) if part]
+    snippet = re.sub(r'\s+', ' ', " ".join(parts).strip())
+    return f"... {snippet} ..." if snippet else ""
+
+
+def test_build_snippet_matches_the_linear_implementation():
+    rng = random.Random(5)
+    vocabulary = ["digital", "twin", "AI", "supply-chain", "e/mobility", "of", "the", "port"]
+    separators = [" ", "  ", ", ", ". ", "\n", " - "]
+    pattern = compile_keyword_pattern(tokenize_keyword("digital twin"))
+    compared = 0
+    for _ in range(200):
+        text = "".join(rng.choice(vocabulary) + rng.choice(separators) for _ in range(rng.randint(5, 80)))
+        offsets = build_word_offsets(text)
+        word_spans = list(WORD_PATTERN.finditer(text))
+        assert list(offsets[0]) == [match.start() for match in word_spans]
+        for match in pattern.finditer(text):
+            window = rng.randint(1, 6)
+            assert build_snippet(text, match.start(), match.end(), offsets, window) == \
+                linear_snippet(text, match.start(), match.end(), word_spans, window)
+            compared += 1
+    assert compared >= 20
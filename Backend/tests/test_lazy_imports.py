@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+from lazy_imports import HEAVY_MODULES, import_optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_ROOTS = sorted({name.split(".")[0] for name in HEAVY_MODULES} | {"matplotlib"})
+
+
+def loaded_heavy_modules(statement):
+    probe = (
+        f"import json, sys; {statement}; "
+        f"print(json.dumps(sorted(name for name in {HEAVY_ROOTS!r} if name in sys.modules)))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_importing_the_app_loads_no_heavy_dependency():
+    assert loaded_heavy_modules("import app") == []
+
+
+def test_warm_up_preloads_the_installed_heavy_dependencies():
+    installed = sorted(name for name in HEAVY_ROOTS if name != "matplotlib" and import_optional(name) is not None)
+    loaded = loaded_heavy_modules("import lazy_imports; lazy_imports.warm_up()")
+    assert set(installed) <= set(loaded)
+
+
+def test_import_optional_returns_none_for_missing_modules():
+    assert import_optional("trendalyze_module_that_does_not_exist") is None
@@ -0,0 +1,101 @@
+import io
+
+import pytest
+
+import analysis_pipeline
+import app as app_module
+import document_processing
+import library_storage
+from library_storage import LIBRARY_REQUIRED_ENV, LibraryObjectReader
+from fake_s3 import FakeS3Client
+
+PAGE_LIMIT = 20
+BLOCK_SIZE = 16 * 1024
+LARGE_KEY = "reports/large.pdf"
+
+
+@pytest.fixture
+def large_pdf(make_pdf):
+    return make_pdf(400)
+
+
+@pytest.fixture
+def library_env(monkeypatch):
+    for name in LIBRARY_REQUIRED_ENV:
+        monkeypatch.setenv(name, "test")
+
+
+@pytest.fixture
+def fake_s3(monkeypatch, library_env, large_pdf):
+    client = FakeS3Client({LARGE_KEY: large_pdf})
+    monkeypatch.setattr(analysis_pipeline, "get_s3_client", lambda: client)
+    monkeypatch.setattr(analysis_pipeline, "MAX_PDF_PAGES", PAGE_LIMIT)
+    monkeypatch.setattr(document_processing, "MAX_PDF_PAGES", PAGE_LIMIT)
+    monkeypatch.setattr(analysis_pipeline, "LIBRARY_RANGED_MIN_BYTES", 1)
+    monkeypatch.setattr(library_storage, "LIBRARY_RANGE_BLOCK_SIZE", BLOCK_SIZE)
+    return client
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_ranged_reader_matches_the_object_bytes(library_env, large_pdf):
+    s3 = FakeS3Client({LARGE_KEY: large_pdf})
+    reader = LibraryObjectReader(LARGE_KEY, len(large_pdf), s3, block_size=4096)
+    reader.seek(10_000)
+    assert reader.read(9_000) == large_pdf[10_000:19_000]
+    reader.seek(-100, io.SEEK_END)
+    assert reader.read() == large_pdf[-100:]
+    # Blocks are fetched once and reused.
+    requests = reader.requests
+    reader.seek(12_000)
+    reader.read(1_000)
+    assert reader.requests == requests
+
+
+def test_sampled_stream_fetches_few_ranges_and_matches_full_download(library_env, large_pdf, monkeypatch):
+    s3 = FakeS3Client({LARGE_KEY: large_pdf})
+    reader = LibraryObjectReader(LARGE_KEY, len(large_pdf), s3, block_size=BLOCK_SIZE)
+    text, metadata = document_processing.extract_text_pdf_sampled_stream(reader, PAGE_LIMIT)
+
+    monkeypatch.setattr(document_processing, "load_fitz", lambda: None)
+    full_text, full_metadata = document_processing.extract_text_pdf_bytes(large_pdf, PAGE_LIMIT)
+    assert text == full_text
+    assert metadata["pages"] == full_metadata["pages"]
+    assert metadata["page_selection"]["processed_pages"] == PAGE_LIMIT
+
+    # Trailer and cross-reference table, then roughly one range per sampled page.
+    assert reader.requests <= 2 * PAGE_LIMIT + 8
+    assert reader.bytes_fetched < len(large_pdf) / 2
+    assert s3.full_downloads == 0
+
+
+def test_analyze_library_uses_ranged_reads_for_large_objects(client, fake_s3):
+    response = client.post('/analyze-library', json={'key': LARGE_KEY, 'buzzwords': 'data'})
+    assert response.status_code == 200
+    ranged_payload = response.get_json()
+    assert fake_s3.full_downloads == 0
+    assert 0 < len(fake_s3.range_requests) <= 2 * PAGE_LIMIT + 8
+    assert ranged_payload["pageSelection"]["processed_pages"] == PAGE_LIMIT
+
+
+def test_analyze_library_ranged_and_download_paths_agree(client, fake_s3, monkeypatch):
+    # Force the same engine on the download path so both read identical text.
+    monkeypatch.setattr(document_processing, "load_fitz", lambda: None)
+    monkeypatch.setattr(document_processing, "load_pdfminer_extract_text", lambda: None)
+    ranged = client.post('/analyze-library', json={'key': LARGE_KEY, 'buzzwords': 'data'}).get_json()
+
+    monkeypatch.setattr(analysis_pipeline, "LIBRARY_RANGED_MIN_BYTES", None)
+    downloaded = client.post('/analyze-library', json={'key': LARGE_KEY, 'buzzwords': 'data'}).get_json()
+    assert fake_s3.full_downloads == 1
+
+    for field in ("pageMap", "pageSelection", "frequencies"):
+        assert ranged[field] == downloaded[field]
+
+
+def test_analyze_library_returns_404_for_missing_key(client, fake_s3):
+    response = client.post('/analyze-library', json={'key': 'reports/missing.pdf'})
+    assert response.status_code == 404
+    assert fake_s3.range_requests == [] and fake_s3.full_downloads == 0
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+import app as app_module
+import library_storage
+from fake_s3 import FakeS3Client
+from library_storage import LIBRARY_REQUIRED_ENV
+
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    for name in LIBRARY_REQUIRED_ENV:
+        monkeypatch.setenv(name, "test")
+    objects = {f"reports/{index:03d}.pdf": b"%PDF" for index in range(7)}
+    objects["reports/notes.txt"] = b"skip me"
+    s3 = FakeS3Client(objects, page_size=3)
+    monkeypatch.setattr(library_storage, "get_s3_client", lambda: s3)
+    monkeypatch.setattr(library_storage, "_listings", library_storage.OrderedDict())
+    monkeypatch.setattr(library_storage, "_refreshing", set())
+    return s3
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_listing_follows_continuation_tokens_and_keeps_only_pdfs(fake_s3):
+    items = library_storage.fetch_library_listing("reports/")
+    assert [item['name'] for item in items] == [f"{index:03d}.pdf" for index in range(7)]
+    assert fake_s3.list_calls == 3
+
+
+def test_fresh_listing_is_served_from_cache(fake_s3):
+    first = library_storage.get_library_listing("reports/")
+    assert library_storage.get_library_listing("reports/") is first
+    assert fake_s3.list_calls == 3
+
+
+def test_stale_listing_is_served_while_refreshed_in_background(fake_s3, monkeypatch):
+    entry = library_storage.get_library_listing("reports/")
+    entry['fetched_at'] -= library_storage.LIBRARY_LISTING_TTL_SECONDS + 1
+    fake_s3.objects["reports/new.pdf"] = b"%PDF"
+
+    assert library_storage.get_library_listing("reports/") is entry
+    deadline = time.monotonic() + 5
+    while library_storage._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    refreshed = library_storage.get_library_listing("reports/")
+    assert refreshed is not entry and len(refreshed['items']) == 8
+    assert refreshed['etag'] != entry['etag']
+
+
+def test_library_endpoint_pages_and_answers_if_none_match(client, fake_s3):
+    response = client.get('/library?prefix=reports/&offset=2&limit=3')
+    payload = response.get_json()
+    assert [item['name'] for item in payload['items']] == ["002.pdf", "003.pdf", "004.pdf"]
+    assert payload['total'] == 7 and payload['next_offset'] == 5
+
+    cached = client.get(
+        '/library?prefix=reports/&offset=2&limit=3',
+        headers={'If-None-Match': response.headers['ETag']}
+    )
+    assert cached.status_code == 304 and cached.data == b''
+
+    unpaged = client.get('/library?prefix=reports/').get_json()
+    assert set(unpaged) == {'items'} and len(unpaged['items']) == 7
+    assert client.get('/library?limit=many').status_code == 400
+
+
+def test_listing_cache_keeps_at_most_the_configured_prefixes(monkeypatch):
+    monkeypatch.setattr(library_storage, "LIBRARY_LISTING_CACHE_SIZE", 3)
+    monkeypatch.setattr(library_storage, "_listings", library_storage.OrderedDict())
+    fetched = []
+    monkeypatch.setattr(library_storage, "fetch_library_listing", lambda prefix='': fetched.append(prefix) or [])
+
+    for prefix in ("a/", "b/", "c/"):
+        library_storage.get_library_listing(prefix)
+    library_storage.get_library_listing("a/")  # Served from cache and now most recent.
+    for index in range(20):
+        library_storage.get_library_listing(f"client-{index}/")
+
+    assert len(library_storage._listings) == 3
+    assert fetched.count("a/") == 1
+
+
+def test_expired_listings_are_dropped_on_insert(monkeypatch):
+    monkeypatch.setattr(library_storage, "_listings", library_storage.OrderedDict())
+    monkeypatch.setattr(library_storage, "fetch_library_listing", lambda prefix='': [])
+    old_entry = library_storage._store_listing("old/", [])
+    old_entry['fetched_at'] -= library_storage.LIBRARY_LISTING_STALE_SECONDS + 1
+    library_storage._store_listing("new/", [])
+    assert list(library_storage._listings) == ["new/"]
@@ -0,0 +1,66 @@
+import io
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import app as app_module
+import metrics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not metrics.is_enabled(), reason="prometheus_client not installed")
+
+
+def sample(name, **labels):
+    return metrics._prometheus.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_analysis_records_extraction_and_stage_histograms(make_pdf):
+    client = app_module.app.test_client()
+    extractions = sample('trendalyze_extraction_seconds_count', engine='pymupdf')
+    keyword_stage = sample('trendalyze_analysis_stage_seconds_count', stage='keyword_matching')
+
+    response = client.post(
+        '/analyze',
+        data={'file': (io.BytesIO(make_pdf(3, seed=22)), 'metrics.pdf'), 'buzzwords': 'Robotics'},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 200
+    assert sample('trendalyze_extraction_seconds_count', engine='pymupdf') == extractions + 1
+    assert sample('trendalyze_analysis_stage_seconds_count', stage='keyword_matching') == keyword_stage + 1
+
+    exported = client.get('/metrics')
+    assert exported.status_code == 200
+    body = exported.get_data(as_text=True)
+    assert 'trendalyze_extraction_seconds_bucket{engine="pymupdf"' in body
+    assert 'trendalyze_analysis_stage_seconds_count{stage="keyword_matching"}' in body
+
+
+def test_multiprocess_mode_aggregates_every_process(tmp_path):
+    script = textwrap.dedent("""
+        import multiprocessing
+        import metrics
+
+        def observe():
+            metrics.count_pdfminer_skip('too_large')
+
+        children = [multiprocessing.Process(target=observe) for _ in range(3)]
+        for child in children:
+            child.start()
+        for child in children:
+            child.join()
+        body, _ = metrics.render_metrics()
+        print(body.decode('utf-8'))
+    """)
+    completed = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path)),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert 'trendalyze_pdfminer_fallback_skips_total{reason="too_large"} 3.0' in completed.stdout
@@ -0,0 +1,22 @@
+import random
+
+from benchmarks.page_lookup import build_page_map, linear_page_for_offset
+from page_index import PageIndex
+
+
+def test_page_index_agrees_with_the_linear_lookup():
+    random.seed(4)
+    pages, total_chars = build_page_map(60, 400)
+    index = PageIndex(pages)
+    for offset in list(range(0, total_chars + 50, 7)) + [page['start'] for page in pages]:
+        assert index.page_for_offset(offset) == linear_page_for_offset(pages, offset), offset
+
+
+def test_offsets_outside_every_span_resolve_to_the_last_page():
+    index = PageIndex.from_metadata({'pages': [
+        {'number': 3, 'start': 0, 'end': 10},
+        {'number': 8, 'start': 11, 'end': 20},
+    ]})
+    assert index.page_for_offset(10) == 8  # Page separator
+    assert index.page_for_offset(500) == 8
+    assert PageIndex.from_metadata(None).page_for_offset(5) is None
@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import document_processing
+
+
+def test_assemble_page_texts_records_spans_of_the_joined_text():
+    text, spans = document_processing.assemble_page_texts([0, 4, 7], ["alpha", "", "omega"])
+    assert text == "alpha\n\nomega"
+    assert [(span["number"], text[span["start"]:span["end"]]) for span in spans] == [
+        (1, "alpha"), (5, ""), (8, "omega")
+    ]
+
+
+@pytest.mark.parametrize("engine", ["pymupdf", "pypdf2"])
+def test_parallel_extraction_matches_sequential(engine, make_pdf, monkeypatch):
+    if engine == "pymupdf" and document_processing.load_fitz() is None:
+        pytest.skip("PyMuPDF is not installed")
+    if engine == "pypdf2":
+        monkeypatch.setattr(document_processing, "load_fitz", lambda: None)
+    pdf = make_pdf(9, density=0.02)
+    monkeypatch.setattr(document_processing, "PDF_PARALLEL_MIN_PAGES", 2)
+
+    monkeypatch.setattr(document_processing, "PDF_EXTRACTION_WORKERS", None)
+    sequential = document_processing.extract_text_pdf_bytes(pdf, 6)
+
+    calls = []
+    parallel_extract = document_processing.extract_page_texts_parallel
+    monkeypatch.setattr(
+        document_processing,
+        "extract_page_texts_parallel",
+        lambda *args, **kwargs: calls.append(args[0]) or parallel_extract(*args, **kwargs)
+    )
+    monkeypatch.setattr(document_processing, "PDF_EXTRACTION_WORKERS", 3)
+    parallel = document_processing.extract_text_pdf_bytes(pdf, 6)
+
+    assert calls[0] == engine
+    # engine_selection differs (probe timings, cache hit), the extraction itself must not.
+    assert parallel[0] == sequential[0]
+    assert parallel[1]["pages"] == sequential[1]["pages"]
+    assert [span["number"] for span in parallel[1]["pages"]] == [1, 3, 4, 6, 7, 9]
+
+
+def test_parallel_extraction_reuses_one_pool_and_ships_a_spool_path(make_pdf, monkeypatch):
+    monkeypatch.setattr(document_processing, "load_fitz", lambda: None)
+    monkeypatch.setattr(document_processing, "PDF_EXTRACTION_WORKERS", 2)
+    pdf = make_pdf(4, density=0.02)
+    expected = document_processing.read_page_texts_pypdf2(
+        document_processing.open_pypdf2_reader(pdf), [0, 1, 2, 3]
+    )
+
+    shard_sources = []
+
+    class RecordingExecutor:
+        def map(self, function, engines, sources, shards):
+            shard_sources.extend(sources)
+            return map(function, engines, sources, shards)
+
+    executor = RecordingExecutor()
+    executors = []
+    monkeypatch.setattr(document_processing, "_get_executor", lambda: executors.append(executor) or executor)
+
+    for _ in range(2):
+        assert document_processing.extract_page_texts_parallel("pypdf2", pdf, [0, 1, 2, 3]) == expected
+
+    assert executors == [executor, executor]
+    assert shard_sources and all(isinstance(source, str) for source in shard_sources)
+    assert not any(os.path.exists(source) for source in shard_sources)
+
+
+def test_pool_executor_is_created_once_per_process(monkeypatch):
+    monkeypatch.setattr(document_processing, "_executor", None)
+    first = document_processing._get_executor()
+    try:
+        assert document_processing._get_executor() is first
+    finally:
+        first.shutdown()
+        monkeypatch.setattr(document_processing, "_executor", None)
+
+
+def test_pool_workers_extract_serially(monkeypatch):
+    monkeypatch.setattr(document_processing, "PDF_EXTRACTION_WORKERS", 4)
+    monkeypatch.setattr(document_processing, "PDF_PARALLEL_MIN_PAGES", 2)
+    assert document_processing.should_extract_in_parallel(100)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as pool:
+        assert pool.submit(document_processing.should_extract_in_parallel, 100).result() is False
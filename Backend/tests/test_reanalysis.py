@@ -0,0 +1,78 @@
+import io
+import random
+import re
+
+import pytest
+
+import analysis_pipeline
+import app as app_module
+from analysis_service import build_combined_keyword_regex, build_keyword_specs
+from keyword_utils import compile_keyword_pattern
+
+KEYWORD_SECTIONS = ('frequencies', 'densities', 'kwic', 'collocations')
+REUSED_SECTIONS = ('sentiment', 'readability', 'trends', 'trendInsights')
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def upload(client, pdf, buzzwords, **fields):
+    form = {'file': (io.BytesIO(pdf), 'report.pdf'), 'buzzwords': buzzwords, **fields}
+    response = client.post('/analyze', data=form, content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_reanalysis_matches_a_fresh_analysis_with_the_new_keywords(client, make_pdf, cached):
+    pdf = make_pdf(4, density=0.03)
+    original = upload(client, pdf, "Blockchain")
+    if not cached:
+        analysis_pipeline._prepared_documents.clear()
+
+    response = client.post(f"/documents/{original['document_id']}/reanalyze", json={'buzzwords': "Robotics, twin"})
+    assert response.status_code == 200
+    reanalyzed = response.get_json()
+    fresh = upload(client, pdf, "Robotics, twin")
+
+    assert reanalyzed['processingSummary']['reanalysis'] == {'tokenizationCached': cached}
+    for section in KEYWORD_SECTIONS:
+        assert reanalyzed[section] == fresh[section], section
+    for section in REUSED_SECTIONS:
+        assert reanalyzed[section] == original[section], section
+
+
+def test_streamed_and_unknown_documents_cannot_be_reanalyzed(client, make_pdf):
+    streamed = upload(client, make_pdf(2), "Blockchain", analysisMode='streaming')
+    analysis_pipeline._prepared_documents.clear()
+    assert client.post(f"/documents/{streamed['document_id']}/reanalyze", json={'buzzwords': "AI"}).status_code == 409
+    assert client.post("/documents/doc_999999/reanalyze", json={'buzzwords': "AI"}).status_code == 404
+
+
+def test_combined_regex_finds_the_same_matches_as_a_plain_alternation():
+    specs = build_keyword_specs(["Digital Twin", "AI", "e-mobility", "twin", "data/analytics"])
+    combined, group_to_label = build_combined_keyword_regex(specs)
+    plain = re.compile(
+        "|".join(f"(?P<kw{idx}>{compile_keyword_pattern(spec['tokens']).pattern})" for idx, spec in enumerate(specs)),
+        re.IGNORECASE
+    )
+    rng = random.Random(1)
+    words = ["digital", "twin", "ai", "AI-based", "e-mobility", "emobility", "data", "analytics", "x", "Twins"]
+    text = " ".join(rng.choice(words) + rng.choice([" ", "/", "-", ", "]) for _ in range(3000))
+
+    def matches(pattern):
+        return [(match.span(), group_to_label[match.lastgroup]) for match in pattern.finditer(text)]
+
+    assert matches(combined) == matches(plain)
+
+
+def test_pool_processes_do_not_keep_prepared_documents():
+    # Job and batch pools call run_analysis without remember_prepared.
+    text = b"Digital twin pilots and AI tooling expanded across the port. " * 40
+    payload = analysis_pipeline.run_analysis("notes.txt", io.BytesIO(text), ["AI"])
+    assert analysis_pipeline._get_prepared_document(payload['document_id']) is None
+
+    payload = analysis_pipeline.run_analysis("notes.txt", io.BytesIO(text), ["AI"], remember_prepared=True)
+    assert analysis_pipeline._get_prepared_document(payload['document_id']) is not None
@@ -0,0 +1,59 @@
+import re
+
+import pytest
+
+from document_store import InMemoryDocumentStore, SQLiteDocumentStore
+from keyword_utils import compile_keyword_pattern, tokenize_keyword
+from search_index import build_search_index, search_keyword
+
+DOCUMENTS = [
+    "Ports adopt AI. The digital twin of the terminal went live!  Twin cranes, digital gates.",
+    "\n  Digital-twin pilots grew?  We stopped using blockchain.\n\nAI/ML tooling expanded.",
+    "Nothing relevant here. Only cranes and yards.",
+]
+KEYWORDS = ["digital twin", "AI", "blockchain", "twin cranes", "ml", "absent"]
+
+
+def linear_search(documents, keyword):
+    """The per-request scan the index replaced: every sentence of every document."""
+    pattern = compile_keyword_pattern(tokenize_keyword(keyword))
+    results = {}
+    for doc_id, text in documents.items():
+        hits = [sentence.strip() for sentence in re.split(r'(?<=[.!?])\s+', text)
+                if sentence.strip() and pattern.search(sentence)]
+        if hits:
+            results[doc_id] = hits
+    return results
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = InMemoryDocumentStore() if request.param == "memory" else SQLiteDocumentStore(
+        str(tmp_path / "documents.sqlite3")
+    )
+    for index, text in enumerate(DOCUMENTS):
+        doc_id = store.add_document(f"doc{index}.txt", text, len(text.split()), {}, None)
+        store.index_document(doc_id, *build_search_index(text))
+    return store
+
+
+@pytest.mark.parametrize("keyword", KEYWORDS)
+def test_index_matches_a_linear_scan(store, keyword):
+    documents = {document['id']: store.get_text(document['id']) for document in store.list_documents()}
+    hits = search_keyword(store, keyword)
+    assert {doc_id: [hit[2] for hit in doc_hits] for doc_id, doc_hits in hits.items()} == \
+        linear_search(documents, keyword)
+
+
+def test_multi_token_keywords_are_phrase_queries(store):
+    # "twin" and "cranes" share a sentence in the first document but are adjacent only once.
+    hits = search_keyword(store, "twin cranes")
+    assert [hit[2] for doc_hits in hits.values() for hit in doc_hits] == ["Twin cranes, digital gates."]
+
+
+def test_hit_offsets_point_at_the_first_token(store):
+    for doc_id, doc_hits in search_keyword(store, "digital twin").items():
+        text = store.get_text(doc_id)
+        for _sentence_id, offset, sentence in doc_hits:
+            assert text[offset:].lower().startswith("digital")
+            assert text.find(sentence) <= offset
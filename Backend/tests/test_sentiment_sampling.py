@@ -0,0 +1,143 @@
+import io
+import threading
+import time
+
+import pytest
+
+import app as app_module
+import sentiment_sampling
+from sampling_utils import select_evenly_spaced_indices
+
+
+def build_paged_text(page_count, page_text="good steady growth in the port " * 40):
+    parts, pages, offset = [], [], 0
+    for number in range(1, page_count + 1):
+        text = f"page {number} {page_text}"
+        pages.append({'number': number, 'start': offset, 'end': offset + len(text)})
+        parts.append(text)
+        offset += len(text) + 1
+    return "\n".join(parts), pages
+
+
+def test_multi_page_samples_are_evenly_spaced_within_the_budget():
+    text, pages = build_paged_text(100)
+    samples, total_pages = sentiment_sampling.select_sentiment_samples(text, pages, 6000, sample_count=5)
+    assert total_pages == 100
+    assert [page for page, _ in samples] == [index + 1 for index in select_evenly_spaced_indices(100, 5)]
+    assert all(sample.startswith(f"page {page} ") for page, sample in samples)
+    assert all(len(sample) <= 1200 for _, sample in samples)
+
+
+def test_single_page_text_is_scored_whole_or_in_windows():
+    short = "a calm and positive report " * 10
+    samples, _ = sentiment_sampling.select_sentiment_samples(short, None, 20000, sample_count=4)
+    assert samples == [(None, short.strip())]
+
+    long_text = " ".join(f"word{index}" for index in range(20000))
+    samples, _ = sentiment_sampling.select_sentiment_samples(long_text, None, 8000, sample_count=4)
+    assert len(samples) == 4
+    assert samples[0][1].startswith("word0 ") and not samples[-1][1].startswith("word0 ")
+    assert sum(len(sample) for _, sample in samples) <= 8000
+
+
+def test_aggregate_is_weighted_by_sample_length(monkeypatch):
+    scores = {"long": (0.5, 0.2), "short": (-1.0, 1.0)}
+    monkeypatch.setattr(sentiment_sampling, "_score_sample", lambda sample: scores[sample.split()[0]])
+    samples = [(1, "long " * 30), (2, "short " * 10)]
+    sentiment, scored, timed_out, error = sentiment_sampling.score_sentiment_samples(samples, time_budget=None)
+    assert (scored, timed_out, error) == (2, False, None)
+    assert [page['page'] for page in sentiment['pages']] == [1, 2]
+    weights = [len(samples[0][1]), len(samples[1][1])]
+    expected = (0.5 * weights[0] - 1.0 * weights[1]) / sum(weights)
+    assert sentiment['polarity'] == pytest.approx(expected)
+
+
+def test_analyze_reports_page_sampling_for_full_and_streaming_runs(make_pdf):
+    client = app_module.app.test_client()
+    pdf = make_pdf(30)
+    payloads = []
+    for mode in ('full', 'streaming'):
+        response = client.post(
+            '/analyze',
+            data={'file': (io.BytesIO(pdf), 'report.pdf'), 'analysisMode': mode, 'wordBudgetMode': 'disabled'},
+            content_type='multipart/form-data'
+        )
+        payloads.append(response.get_json())
+
+    for payload in payloads:
+        sampling = payload['processingSummary']['sentimentSampling']
+        assert sampling['mode'] == 'pages' and sampling['sampled'] is True
+        assert sampling['totalPages'] == 30
+        assert sampling['samplePages'] == sampling['scoredPages'] == sentiment_sampling.SENTIMENT_SAMPLE_PAGES
+        assert [page['page'] for page in payload['sentiment']['pages']] == [
+            index + 1 for index in select_evenly_spaced_indices(30, sentiment_sampling.SENTIMENT_SAMPLE_PAGES)
+        ]
+    assert payloads[1]['processingSummary']['streaming'] is True
+    assert payloads[0]['sentiment']['polarity'] == pytest.approx(payloads[1]['sentiment']['polarity'])
+
+
+def test_every_sample_is_capped(monkeypatch):
+    monkeypatch.setattr(sentiment_sampling, "SENTIMENT_MAX_SAMPLE_CHARS", 1000)
+    text = "steady growth and good results " * 600  # about 18,600 characters, within the budget
+    samples, _ = sentiment_sampling.select_sentiment_samples(text, None, 20000, sample_count=4)
+    assert len(samples) > 4
+    assert all(len(sample) <= 1000 for _, sample in samples)
+    # Within the budget the windows still cover the whole text.
+    assert sum(len(sample) for _, sample in samples) >= len(text.strip()) * 0.95
+
+    pages = [{'number': 1, 'start': 0, 'end': len(text)}, {'number': 2, 'start': len(text), 'end': 2 * len(text)}]
+    samples, _ = sentiment_sampling.select_sentiment_samples(text * 2, pages, None, sample_count=2)
+    assert all(len(sample) <= 1000 for _, sample in samples)
+
+
+def test_time_budget_returns_without_waiting_for_running_samples(monkeypatch):
+    release = threading.Event()
+
+    def slow_score(sample_text):
+        release.wait(5)
+        return 0.5, 0.5
+
+    monkeypatch.setattr(sentiment_sampling, "_score_sample", slow_score)
+    monkeypatch.setattr(sentiment_sampling, "_executor", None)
+    executor = sentiment_sampling._get_executor()
+    samples = [(page, f"page {page} text") for page in range(1, 9)]
+
+    started = time.monotonic()
+    sentiment, scored, timed_out, _error = sentiment_sampling.score_sentiment_samples(samples, time_budget=0.2)
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert timed_out and scored == 0 and sentiment['pages'] == []
+    assert elapsed < 2
+    # The pool with the stuck threads is dropped; the next request gets a new one.
+    assert sentiment_sampling._get_executor() is not executor
+
+
+def test_text_within_the_limit_is_scored_whole_in_one_call(make_pdf, monkeypatch):
+    import analysis_service
+
+    calls = []
+    real_textblob = analysis_service.import_module("textblob").TextBlob
+
+    class RecordingTextBlobModule:
+        @staticmethod
+        def TextBlob(text):
+            calls.append(text)
+            return real_textblob(text)
+
+    monkeypatch.setattr(analysis_service, "import_module", lambda name: RecordingTextBlobModule)
+    monkeypatch.setattr(sentiment_sampling, "_score_sample", lambda sample: pytest.fail("sampled a short text"))
+    client = app_module.app.test_client()
+    pdf = make_pdf(3)
+    for mode in ('full', 'streaming'):
+        response = client.post(
+            '/analyze',
+            data={'file': (io.BytesIO(pdf), 'report.pdf'), 'analysisMode': mode, 'wordBudgetMode': 'disabled'},
+            content_type='multipart/form-data'
+        )
+        payload = response.get_json()
+        assert payload['processingSummary']['sentimentSampling']['sampled'] is False
+        assert payload['sentiment']['polarity'] == pytest.approx(real_textblob(calls[-1]).sentiment.polarity)
+    assert len(calls) == 2
+    assert 0 < len(calls[0]) <= analysis_service.SENTIMENT_CHAR_LIMIT
+    assert calls[0] == calls[1]
@@ -0,0 +1,83 @@
+import io
+import tracemalloc
+
+import pytest
+
+import app as app_module
+import constants
+from document_store import get_document_store
+from metrics import StageProfile, parse_profile_mode, profile_stages, time_stage
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def analyze(client, pdf, **fields):
+    form = {'file': (io.BytesIO(pdf), 'profile.pdf'), 'buzzwords': 'Robotics', **fields}
+    response = client.post('/analyze', data=form, content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_timings_profile_lists_stages_in_order(client, make_pdf):
+    payload = analyze(client, make_pdf(3), profile='timings')
+    timings = payload['processingSummary']['timings']
+    stages = [entry['stage'] for entry in timings['stages']]
+    assert timings['mode'] == 'timings'
+    assert stages[:3] == ['extraction', 'prepare', 'keyword_matching']
+    assert {'collocations', 'sentiment', 'trends', 'wordcloud', 'store'} <= set(stages)
+    assert all('peakMemoryMb' not in entry for entry in timings['stages'])
+    assert timings['totalSeconds'] >= sum(entry['seconds'] for entry in timings['stages'] if entry['stage'] != 'word_budget')
+
+    stored = get_document_store().get_document(payload['document_id'])
+    assert 'timings' not in stored['analysis_result']['processingSummary']
+    assert 'timings' not in analyze(client, make_pdf(3))['processingSummary']
+
+
+def test_word_budget_is_nested_in_prepare(client, make_pdf):
+    default_limit = constants.get_max_words_analysis()
+    constants.set_max_words_analysis(500)
+    try:
+        payload = analyze(client, make_pdf(3), profile='timings')
+    finally:
+        constants.set_max_words_analysis(default_limit)
+    stages = {entry['stage']: entry for entry in payload['processingSummary']['timings']['stages']}
+    assert list(stages)[:3] == ['extraction', 'prepare', 'word_budget']
+    assert stages['word_budget']['seconds'] <= stages['prepare']['seconds']
+
+
+def test_memory_profile_reports_peaks_and_stops_tracing(client, make_pdf):
+    payload = analyze(client, make_pdf(3), profile='memory')
+    stages = payload['processingSummary']['timings']['stages']
+    assert all(entry['peakMemoryMb'] >= 0 for entry in stages)
+    assert not tracemalloc.is_tracing()
+
+
+def test_nested_stage_peak_is_kept_by_the_outer_stage():
+    with profile_stages('memory') as profile:
+        with time_stage('outer'):
+            with time_stage('inner'):
+                block = bytearray(8 * 2**20)
+                del block
+    peaks = {entry['stage']: entry['peakMemoryMb'] for entry in profile.summary()['stages']}
+    assert peaks['inner'] >= 8
+    assert peaks['outer'] >= peaks['inner']
+
+
+def test_only_the_outermost_block_profiles():
+    with profile_stages('timings') as outer:
+        with profile_stages('timings') as inner:
+            with time_stage('keyword_matching'):
+                pass
+    assert inner is None
+    assert isinstance(outer, StageProfile)
+    assert [entry['calls'] for entry in outer.summary()['stages']] == [1]
+
+
+@pytest.mark.parametrize("value, mode", [
+    ('timings', 'timings'), ('MEMORY', 'memory'), ('true', 'timings'), ('', None), ('cpu', None), (None, None)
+])
+def test_parse_profile_mode(value, mode):
+    assert parse_profile_mode(value) == mode
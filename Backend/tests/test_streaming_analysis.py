@@ -0,0 +1,77 @@
+import io
+
+import pytest
+
+import analysis_pipeline
+import app as app_module
+import constants
+import document_processing
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def analyze(client, pdf, **fields):
+    form = {'file': (io.BytesIO(pdf), 'report.pdf'), 'buzzwords': 'Blockchain, Robotics', **fields}
+    response = client.post('/analyze', data=form, content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_streaming_mode_matches_full_extraction(client, make_pdf):
+    pdf = make_pdf(5, density=0.03)
+    full = analyze(client, pdf, wordBudgetMode='disabled')
+    streamed = analyze(client, pdf, wordBudgetMode='disabled', analysisMode='streaming')
+
+    assert streamed['processingSummary']['streaming'] is True
+    for field in ('frequencies', 'densities', 'collocations', 'trends', 'readability', 'pageMap', 'pageSelection'):
+        assert streamed[field] == full[field], field
+    # Snippets stop at page boundaries when streaming, so only the match positions are compared.
+    for keyword, entries in full['kwic'].items():
+        def positions(kwic_entries):
+            return sorted((entry['start'], entry['end'], entry['page']) for entry in kwic_entries)
+        assert positions(streamed['kwic'][keyword]) == positions(entries), keyword
+
+
+def test_streaming_mode_splits_the_word_budget_across_pages(client, make_pdf):
+    default_limit = constants.get_max_words_analysis()
+    constants.set_max_words_analysis(900)
+    try:
+        streamed = analyze(client, make_pdf(6), analysisMode='streaming')
+    finally:
+        constants.set_max_words_analysis(default_limit)
+    budget = streamed['processingSummary']['wordBudget']
+    assert budget['truncated'] is True
+    assert budget['processedWords'] <= 900 < budget['originalWords']
+
+
+def test_iter_pdf_pages_reports_pymupdf_when_installed(make_pdf):
+    if document_processing.load_fitz() is None:
+        pytest.skip("PyMuPDF is not installed")
+    pages, selection, engine = document_processing.iter_pdf_pages(io.BytesIO(make_pdf(3)))
+    assert engine == "pymupdf"
+    assert [number for number, _ in pages] == [1, 2, 3]
+    assert selection["processed_pages"] == 3
+
+
+def test_iter_pdf_pages_reports_pypdf2_without_pymupdf(make_pdf, monkeypatch):
+    monkeypatch.setattr(document_processing, "load_fitz", lambda: None)
+    pages, _selection, engine = document_processing.iter_pdf_pages(io.BytesIO(make_pdf(3)))
+    assert engine == "pypdf2"
+    assert all(text.strip() for _, text in pages)
+
+
+def test_streaming_payload_reports_the_engine_that_read_the_pages(make_pdf, monkeypatch):
+    opened = []
+    iter_pdf_pages = analysis_pipeline.iter_pdf_pages
+
+    def spy(*args, **kwargs):
+        result = iter_pdf_pages(*args, **kwargs)
+        opened.append(result[2])
+        return result
+
+    monkeypatch.setattr(analysis_pipeline, "iter_pdf_pages", spy)
+    payload = analysis_pipeline.analyze_pdf_streaming("doc.pdf", io.BytesIO(make_pdf(4)), ["data"])
+    assert payload["extractionEngine"] == opened[0]
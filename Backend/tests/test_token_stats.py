@@ -0,0 +1,38 @@
+import random
+from collections import Counter
+
+from token_stats import TokenArray, compute_percentages
+
+
+def build_tokens(count, seed):
+    rng = random.Random(seed)
+    vocabulary = ["ai", "digital", "twin", "port", "the", "of", "cranes", "blockchain", "x", "supply-chain"]
+    return [rng.choice(vocabulary) for _ in range(count)]
+
+
+def test_token_array_statistics_match_python_lists():
+    tokens = build_tokens(5000, seed=2)
+    array = TokenArray.from_tokens(tokens)
+
+    assert len(array) == len(tokens)
+    assert array.vocabulary == list(dict.fromkeys(tokens))
+    assert array.syllable_estimate() == sum(len(word) // 3 for word in tokens)
+    assert dict(zip(array.vocabulary, array.counts().tolist())) == Counter(tokens)
+
+
+def test_neighbor_counts_match_counter_most_common():
+    tokens = build_tokens(3000, seed=7)
+    array = TokenArray.from_tokens(tokens)
+    keyword_ids = [array.vocabulary.index("twin"), array.vocabulary.index("ai")]
+    positions = array.positions_of(keyword_ids)
+    assert positions.tolist() == [idx for idx, token in enumerate(tokens) if token in ("twin", "ai")]
+
+    for offset in (-1, 1):
+        neighbors = [tokens[idx + offset] for idx in positions if 0 <= idx + offset < len(tokens)]
+        assert array.neighbor_counts(positions, offset) == Counter(neighbors).most_common(3)
+
+
+def test_compute_percentages_rounds_like_python():
+    counts = [0, 1, 7, 33, 250]
+    assert compute_percentages(counts, 777) == [round(count / 777 * 100, 2) for count in counts]
+    assert compute_percentages(counts, 0) == [0] * len(counts)
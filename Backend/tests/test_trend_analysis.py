@@ -0,0 +1,41 @@
+from benchmarks.trend_status import build_sentences, legacy_classify_trend_status
+from trend_analysis import TrendTermMatcher, analyze_trends, classify_trend_status
+
+
+def test_precompiled_classifier_matches_the_per_pattern_loop():
+    sentences = build_sentences(2000, seed=3) + [
+        "Künstliche Intelligenz wird eingesetzt.",
+        "Die Blockchain-Lösung wurde abgelöst.",
+        "Der Einsatz von Robotik wird geprüft.",
+        "Cloud Computing is no longer used.",
+        "Plain sentence without any signal.",
+    ]
+    for sentence in sentences:
+        assert classify_trend_status(sentence) == legacy_classify_trend_status(sentence), sentence
+
+
+def substring_term_indices(terms, lowered):
+    return [idx for idx, term in enumerate(terms) if term.lower() in lowered]
+
+
+def test_matcher_finds_every_term_a_substring_scan_finds():
+    terms = ["data analytics", "big data analytics", "big data", "AI", "ai ethics", "twin", "digital twin", "z"]
+    matcher = TrendTermMatcher(terms)
+    sentences = build_sentences(500, seed=9) + [
+        "big data analytics and ai ethics boards",
+        "our digital twin uses big data",
+        "",
+    ]
+    for sentence in sentences:
+        lowered = sentence.lower()
+        assert matcher.find_term_indices(lowered) == substring_term_indices(terms, lowered), sentence
+
+
+def test_custom_term_lists_group_mentions_per_trend():
+    sentences = ["We use Digital Twin models.", "We stopped the digital twin project.", "Robots everywhere."]
+    results, insights = analyze_trends(sentences, ["digital twin", "twin", "robots"])
+    assert [(result['trend'], result['count']) for result in results] == [
+        ("digital twin", 2), ("twin", 2), ("robots", 1)
+    ]
+    assert insights[0]['status_counts']['using'] == 1
+    assert insights[0]['status_counts']['discontinued'] == 1
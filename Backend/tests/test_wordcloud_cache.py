@@ -0,0 +1,83 @@
+import os
+import time
+
+import pytest
+
+import app as app_module
+import wordcloud_renderer
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class IdleExecutor:
+    """Accepts render jobs and never runs them, like a busy background thread."""
+
+    def submit(self, fn, *args):
+        return None
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(wordcloud_renderer, "WORDCLOUD_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_identical_frequencies_share_one_image_url(cache_dir):
+    url = wordcloud_renderer.request_wordcloud({'ai': 3, 'robotics': 1, 'blockchain': 0})
+    assert url == wordcloud_renderer.request_wordcloud({'robotics': 1, 'ai': 3})
+    assert url.startswith("/wordcloud/") and url.endswith(".png")
+    assert wordcloud_renderer.request_wordcloud({'ai': 0}) is None
+
+
+def test_endpoint_serves_the_png_even_before_the_background_render(client, cache_dir, monkeypatch):
+    monkeypatch.setattr(wordcloud_renderer, "_get_executor", IdleExecutor)
+    url = wordcloud_renderer.request_wordcloud({'ai': 3, 'robotics': 1})
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == "image/png"
+    assert response.data.startswith(PNG_SIGNATURE)
+    assert "immutable" in response.headers["Cache-Control"]
+
+
+def test_unknown_or_malformed_keys_are_404(client, cache_dir):
+    assert client.get(f"/wordcloud/{'0' * 64}.png").status_code == 404
+    assert client.get("/wordcloud/..%2Fsecrets.png").status_code == 404
+
+
+def write_entry(cache_dir, key, size, age):
+    for extension in ('.png', '.json'):
+        path = cache_dir / f"{key}{extension}"
+        path.write_bytes(b"x" * size)
+        os.utime(path, (time.time() - age, time.time() - age))
+
+
+def test_evict_to_limit_removes_least_recently_used_entries(cache_dir):
+    old_key, recent_key, touched_key = "a" * 64, "b" * 64, "c" * 64
+    write_entry(cache_dir, old_key, 1000, age=300)
+    write_entry(cache_dir, recent_key, 1000, age=100)
+    write_entry(cache_dir, touched_key, 1000, age=200)
+    (cache_dir / "unrelated.txt").write_bytes(b"x" * 5000)
+
+    # Serving an image counts as a use.
+    assert wordcloud_renderer.get_wordcloud_image_path(touched_key)
+
+    wordcloud_renderer.evict_to_limit(4000)
+    remaining = sorted(name for name in os.listdir(cache_dir))
+    assert remaining == sorted([
+        f"{recent_key}.json", f"{recent_key}.png",
+        f"{touched_key}.json", f"{touched_key}.png",
+        "unrelated.txt",
+    ])
+
+
+def test_evict_to_limit_keeps_pending_renders(cache_dir, monkeypatch):
+    key = "d" * 64
+    write_entry(cache_dir, key, 1000, age=0)
+    monkeypatch.setattr(wordcloud_renderer, "_pending", {key})
+    wordcloud_renderer.evict_to_limit(10)
+    assert (cache_dir / f"{key}.json").exists()
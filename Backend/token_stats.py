@@ -0,0 +1,92 @@
+"""Token-id arrays for vectorized per-document statistics."""
+
+try:
+    from .lazy_imports import import_module
+except ImportError:
+    from lazy_imports import import_module
+
+
+class TokenArray:
+    """
+    A document's tokens as NumPy int32 ids into a vocabulary of unique words.
+
+    Each token costs four bytes instead of a reference to a Python string, and
+    per-word work (lengths, sub-part expansion) is done once per vocabulary entry.
+    Ids are assigned in order of first appearance.
+    """
+
+    __slots__ = ('ids', 'vocabulary', '_counts')
+
+    def __init__(self, ids, vocabulary):
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self._counts = None
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        np = import_module("numpy")
+        vocabulary_ids = {}
+        ids = np.fromiter(
+            (vocabulary_ids.setdefault(token, len(vocabulary_ids)) for token in tokens),
+            dtype=np.int32
+        )
+        return cls(ids, list(vocabulary_ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def counts(self):
+        """Number of occurrences of each vocabulary entry."""
+        if self._counts is None:
+            np = import_module("numpy")
+            self._counts = np.bincount(self.ids, minlength=len(self.vocabulary))
+        return self._counts
+
+    def syllable_estimate(self):
+        """Sum of len(word) // 3 over all tokens, the heuristic used for readability."""
+        if not self.vocabulary:
+            return 0
+        np = import_module("numpy")
+        lengths = np.fromiter(
+            (len(word) for word in self.vocabulary),
+            dtype=np.int64,
+            count=len(self.vocabulary)
+        )
+        return int(((lengths // 3) * self.counts()).sum())
+
+    def positions_of(self, vocabulary_ids):
+        """Sorted token positions whose id is one of vocabulary_ids."""
+        np = import_module("numpy")
+        if not vocabulary_ids:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(np.isin(self.ids, np.asarray(vocabulary_ids, dtype=np.int32)))
+
+    def neighbor_counts(self, positions, offset, limit=3):
+        """
+        Most common words at positions + offset as [(word, count), ...].
+
+        Ties are broken by first occurrence, matching Counter.most_common on the
+        neighbors listed in position order.
+        """
+        np = import_module("numpy")
+        neighbor_positions = positions + offset
+        neighbor_positions = neighbor_positions[
+            (neighbor_positions >= 0) & (neighbor_positions < len(self.ids))
+        ]
+        if not neighbor_positions.size:
+            return []
+        unique_ids, first_seen, counts = np.unique(
+            self.ids[neighbor_positions],
+            return_index=True,
+            return_counts=True
+        )
+        order = np.lexsort((first_seen, -counts))[:limit]
+        return [(self.vocabulary[unique_ids[i]], int(counts[i])) for i in order]
+
+
+def compute_percentages(counts, total):
+    """Vectorized round(count / total * 100, 2) for a sequence of counts."""
+    np = import_module("numpy")
+    if total <= 0:
+        return [0] * len(counts)
+    return np.round(np.asarray(counts, dtype=np.float64) / total * 100, 2).tolist()
@@ -1,6 +1,7 @@
 """Trend-specific analysis utilities."""
 
-from collections import Counter
+from collections import Counter, deque
+from functools import lru_cache
 import re
 import unicodedata
 
@@ -14,16 +15,30 @@ def normalize_to_ascii(text):
     return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
 
 
+def compile_status_patterns(status_patterns):
+    """Fold each status's pattern list into one precompiled alternation."""
+    return [
+        (status, re.compile("|".join(f"(?:{pattern})" for pattern in patterns)))
+        for status, patterns in status_patterns.items()
+        if patterns
+    ]
+
+
+COMPILED_STATUS_PATTERNS = compile_status_patterns(TREND_STATUS_PATTERNS)
+
+
 def classify_trend_status(sentence):
     lowered = sentence.lower()
-    normalized = normalize_to_ascii(lowered)
-    candidates = {lowered, normalized}
-
-    for status, patterns in TREND_STATUS_PATTERNS.items():
-        for pattern in patterns:
-            for candidate in candidates:
-                if re.search(pattern, candidate):
-                    return status
+    candidates = (lowered,)
+    if not lowered.isascii():
+        normalized = normalize_to_ascii(lowered)
+        if normalized != lowered:
+            candidates = (lowered, normalized)
+
+    for status, pattern in COMPILED_STATUS_PATTERNS:
+        for candidate in candidates:
+            if pattern.search(candidate):
+                return status
     return 'unspecified'
 
 
@@ -63,45 +78,155 @@ def build_trend_summary(trend, status_counts):
     return f"The company {joined}."
 
 
-def analyze_trends(sentences):
-    trend_results = []
-    trend_insights = []
-
-    for trend in TREND_TERMS:
-        trend_lower = trend.lower()
-        mentions = []
+class TrendTermMatcher:
+    """
+    Find every trend term contained in a lowered sentence in a single pass.
+
+    A combined regex acts as a cheap C-level prefilter (most sentences mention
+    no trend at all); sentences that pass are walked once through an
+    Aho-Corasick automaton, which also reports overlapping terms such as
+    "data analytics" inside "big data analytics".
+    """
+
+    def __init__(self, trend_terms):
+        self.terms = [term.lower() for term in trend_terms]
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._terminal = [False]
+
+        for term_idx, term in enumerate(self.terms):
+            if not term:
+                continue
+            state = 0
+            for char in term:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._terminal.append(False)
+                state = next_state
+            self._output[state].append(term_idx)
+            self._terminal[state] = True
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._prefilter = re.compile(self._trie_pattern(0)) if self._goto[0] else None
+
+    def _trie_pattern(self, state):
+        """
+        Render the trie below state as a regex with shared prefixes.
+
+        Python's re does not factor plain alternations, so a flat "a|b|c" over
+        hundreds of terms is tried term by term at every position. A node that
+        completes a term ends the pattern early: the prefilter only needs to
+        know whether some term occurs.
+        """
+        if self._terminal[state]:
+            return ""
+        branches = [
+            re.escape(char) + self._trie_pattern(next_state)
+            for char, next_state in sorted(self._goto[state].items())
+        ]
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    def find_term_indices(self, lowered):
+        """Return the sorted indices of all terms occurring in the lowered text."""
+        if self._prefilter is None or not self._prefilter.search(lowered):
+            return []
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = set()
+        state = 0
+        for char in lowered:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return sorted(found)
+
+
+@lru_cache(maxsize=32)
+def get_trend_matcher(trend_terms):
+    return TrendTermMatcher(trend_terms)
+
+
+class TrendAccumulator:
+    """Collect trend mentions sentence by sentence so callers can stream text."""
+
+    def __init__(self, trend_terms=None):
+        self.trend_terms = list(TREND_TERMS if trend_terms is None else trend_terms)
+        self._matcher = get_trend_matcher(tuple(self.trend_terms))
+        self._mentions = [[] for _ in self.trend_terms]
+
+    def add_sentence(self, sentence):
+        term_indices = self._matcher.find_term_indices(sentence.lower())
+        if not term_indices:
+            return
+        status = classify_trend_status(sentence)
+        stripped = sentence.strip()
+        for idx in term_indices:
+            self._mentions[idx].append({
+                'sentence': stripped,
+                'status': status
+            })
+
+    def add_sentences(self, sentences):
         for sentence in sentences:
-            if trend_lower in sentence.lower():
-                status = classify_trend_status(sentence)
-                mentions.append({
-                    'sentence': sentence.strip(),
-                    'status': status
-                })
-
-        if not mentions:
-            continue
-
-        status_counts = Counter(m['status'] for m in mentions)
-        status_counts_full = {
-            status: status_counts.get(status, 0)
-            for status in TREND_STATUS_ORDER
-        }
-        summary = build_trend_summary(trend, status_counts_full)
-
-        trend_results.append({
-            'trend': trend,
-            'count': len(mentions),
-            'contexts': [m['sentence'] for m in mentions],
-            'status_counts': status_counts_full,
-            'summary': summary
-        })
-
-        trend_insights.append({
-            'trend': trend,
-            'summary': summary,
-            'total_mentions': len(mentions),
-            'status_counts': status_counts_full,
-            'evidence': mentions
-        })
-
-    return trend_results, trend_insights
+            self.add_sentence(sentence)
+
+    def results(self):
+        trend_results = []
+        trend_insights = []
+
+        for trend, mentions in zip(self.trend_terms, self._mentions):
+            if not mentions:
+                continue
+
+            status_counts = Counter(m['status'] for m in mentions)
+            status_counts_full = {
+                status: status_counts.get(status, 0)
+                for status in TREND_STATUS_ORDER
+            }
+            summary = build_trend_summary(trend, status_counts_full)
+
+            trend_results.append({
+                'trend': trend,
+                'count': len(mentions),
+                'contexts': [m['sentence'] for m in mentions],
+                'status_counts': status_counts_full,
+                'summary': summary
+            })
+
+            trend_insights.append({
+                'trend': trend,
+                'summary': summary,
+                'total_mentions': len(mentions),
+                'status_counts': status_counts_full,
+                'evidence': mentions
+            })
+
+        return trend_results, trend_insights
+
+
+def analyze_trends(sentences, trend_terms=None):
+    accumulator = TrendAccumulator(trend_terms)
+    accumulator.add_sentences(sentences)
+    return accumulator.results()
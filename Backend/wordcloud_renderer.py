@@ -0,0 +1,183 @@
+"""Background word cloud rendering with a content-addressed PNG cache."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .constants import WORDCLOUD_CACHE_DIR, WORDCLOUD_CACHE_MAX_BYTES
+    from .lazy_imports import import_module
+    from .metrics import time_stage
+except ImportError:
+    from constants import WORDCLOUD_CACHE_DIR, WORDCLOUD_CACHE_MAX_BYTES
+    from lazy_imports import import_module
+    from metrics import time_stage
+
+
+WORDCLOUD_URL_PREFIX = "/wordcloud/"
+_KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+_executor_lock = threading.Lock()
+_executor = None
+_pending = set()
+
+
+def wordcloud_key(nonzero_freq):
+    """Hash of the nonzero frequency dict; identical inputs share one image."""
+    canonical = json.dumps(sorted(nonzero_freq.items()), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def is_valid_key(key):
+    return bool(key) and bool(_KEY_PATTERN.match(key))
+
+
+def _image_path(key):
+    return os.path.join(WORDCLOUD_CACHE_DIR, f"{key}.png")
+
+
+def _frequencies_path(key):
+    return os.path.join(WORDCLOUD_CACHE_DIR, f"{key}.json")
+
+
+def _touch(path):
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def evict_to_limit(max_bytes):
+    """
+    Delete the least recently used images with their frequency files until the cache fits into max_bytes.
+
+    An entry's age is the newest mtime of its two files; serving an image
+    refreshes it, like extraction_cache does on a hit.
+    """
+    if max_bytes is None:
+        return
+
+    entries = {}
+    total_size = 0
+    try:
+        with os.scandir(WORDCLOUD_CACHE_DIR) as iterator:
+            for item in iterator:
+                key, extension = os.path.splitext(item.name)
+                if extension not in ('.png', '.json') or not is_valid_key(key):
+                    continue
+                try:
+                    stat_result = item.stat()
+                except FileNotFoundError:
+                    continue
+                entry = entries.setdefault(key, [0.0, 0])
+                entry[0] = max(entry[0], stat_result.st_mtime)
+                entry[1] += stat_result.st_size
+                total_size += stat_result.st_size
+    except FileNotFoundError:
+        return
+
+    if total_size <= max_bytes:
+        return
+
+    for key, (_mtime, size) in sorted(entries.items(), key=lambda entry: entry[1][0]):
+        if total_size <= max_bytes:
+            break
+        with _executor_lock:
+            if key in _pending:
+                continue
+        for path in (_image_path(key), _frequencies_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        total_size -= size
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wordcloud")
+        return _executor
+
+
+def render_wordcloud(key):
+    """Render the PNG for a stored frequency dict; returns the image path or None."""
+    image_path = _image_path(key)
+    if os.path.exists(image_path):
+        return image_path
+    try:
+        with open(_frequencies_path(key), encoding='utf-8') as handle:
+            frequencies = json.load(handle)
+    except FileNotFoundError:
+        return None
+
+    with time_stage('wordcloud_render'):
+        wc = import_module("wordcloud").WordCloud(width=800, height=400, background_color='white')
+        wc.generate_from_frequencies(frequencies)
+        tmp_path = f"{image_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        wc.to_image().save(tmp_path, format='PNG')
+        os.replace(tmp_path, image_path)
+    evict_to_limit(WORDCLOUD_CACHE_MAX_BYTES)
+    return image_path
+
+
+def _render_in_background(key):
+    try:
+        render_wordcloud(key)
+    except Exception as render_error:
+        logging.warning("Word cloud rendering failed for %s: %s", key, render_error)
+    finally:
+        with _executor_lock:
+            _pending.discard(key)
+
+
+def request_wordcloud(freq):
+    """
+    Schedule rendering for the nonzero frequencies and return the image URL path.
+
+    Returns None when there is nothing to draw. The frequencies are written next
+    to the image so any worker can render on demand if the background render has
+    not finished by the time the client asks for it.
+    """
+    nonzero_freq = {k: v for k, v in freq.items() if v > 0}
+    if not nonzero_freq:
+        return None
+
+    key = wordcloud_key(nonzero_freq)
+    url = f"{WORDCLOUD_URL_PREFIX}{key}.png"
+    if os.path.exists(_image_path(key)):
+        _touch(_image_path(key))
+        return url
+
+    os.makedirs(WORDCLOUD_CACHE_DIR, exist_ok=True)
+    frequencies_path = _frequencies_path(key)
+    if not os.path.exists(frequencies_path):
+        tmp_path = f"{frequencies_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(nonzero_freq, handle, ensure_ascii=False)
+        os.replace(tmp_path, frequencies_path)
+
+    with _executor_lock:
+        if key in _pending:
+            return url
+        _pending.add(key)
+    # After marking it pending, so this entry is not evicted before it renders.
+    evict_to_limit(WORDCLOUD_CACHE_MAX_BYTES)
+    _get_executor().submit(_render_in_background, key)
+    return url
+
+
+def get_wordcloud_image_path(key):
+    """Return the PNG path for key, rendering synchronously if it is not cached yet."""
+    if not is_valid_key(key):
+        return None
+    image_path = _image_path(key)
+    if os.path.exists(image_path):
+        _touch(image_path)
+        return image_path
+    return render_wordcloud(key)
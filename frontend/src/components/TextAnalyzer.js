@@ -1,5 +1,6 @@
 import React, { useMemo, useState } from 'react';
 import '../TextAnalyzer.css';
+import { getApiBase } from '../utils/apiBase';
 
 const TREND_STATUS_ORDER = ['using', 'evaluating', 'discontinued', 'unspecified'];
 const TREND_STATUS_LABELS = {
@@ -188,6 +189,8 @@ const TextAnalyzer = ({
 
   const { image, kwic, collocations, frequencies, densities, sentiment, readability, trends, trendInsights } = analysisResult;
   const insights = trendInsights || [];
+  // The backend returns a relative /wordcloud/<hash>.png URL that lives on the API host.
+  const imageSrc = typeof image === 'string' && image.startsWith('/') ? `${getApiBase()}${image}` : image;
 
   const frequencyEntries = frequencies ? Object.entries(frequencies) : [];
   const positiveFrequencyEntries = frequencyEntries.filter(([, value]) => value > 0);
@@ -360,7 +363,7 @@ const TextAnalyzer = ({
           <div className="wordcloud-section">
             {image ? (
               <div className="wordcloud-container">
-                <img src={image} alt="Word Cloud Visualization" className="wordcloud-image" />
+                <img src={imageSrc} alt="Word Cloud Visualization" className="wordcloud-image" />
                 <p className="wordcloud-caption">
                   Visual representation of keyword frequencies in your document
                 </p>